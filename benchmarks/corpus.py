@@ -0,0 +1,217 @@
+"""
+Deterministic synthetic log corpora for the benchmarks.
+
+Shapes
+------
+``plain``
+    ``logging``-style single-line entries, mostly INFO.
+``traceback``
+    Like ``plain`` but one entry in ten is an ERROR with a multi-line
+    Python traceback.
+``json``
+    JSON-lines entries of about 2 KB each (nested objects, long strings).
+
+A ``tree`` is a directory of many small files nested a few levels deep, for
+:meth:`LogDirectory.list_files`.
+
+The same name, size, shape and seed always produce the same bytes, so
+results from different machines or releases compare.  Generating runs at
+roughly 15 MB/s (a 10 GB file takes minutes), so files are kept between runs;
+a ``manifest.json`` records what was generated with which seed::
+
+    python -m benchmarks.corpus --out /tmp/lv-corpus --sizes 1M,100M,1G --tree 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+SHAPES = ("plain", "traceback", "json")
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_BATCH_ENTRIES = 2000
+_EPOCH = datetime(2026, 1, 1)
+
+_LOGGERS = ["app.web", "app.db", "app.auth", "app.worker", "payments.api", "payments.ledger"]
+_MESSAGES = [
+    "GET /api/items/{n} took {ms}ms status=200",
+    "POST /api/orders/{n} took {ms}ms status=201",
+    "cache miss for key user:{n}",
+    "user {n} logged in from 10.0.{a}.{b}",
+    "job {n} finished in {ms}ms",
+    "retrying connection to db-{a} (attempt {b})",
+]
+# Rare on purpose: the filtered-search benchmark looks for it.
+_RARE = "upstream timeout after {ms}ms talking to billing-{a}"
+_TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    '  File "/srv/app/handlers.py", line {a}, in handle\n'
+    "    result = self.process(request)\n"
+    '  File "/srv/app/service.py", line {b}, in process\n'
+    "    raise ConnectionError(\"connection refused\")\n"
+    "ConnectionError: connection refused"
+)
+
+
+def parse_size(text: str) -> int:
+    """``"10M"`` -> bytes."""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return str(size)
+
+
+def _entries(shape: str, rng: random.Random, start: int, count: int = _BATCH_ENTRIES) -> List[str]:
+    """Return *count* entries (with trailing newlines)."""
+    out = []
+    rnd = rng.random  # int(rnd() * n) is several times faster than randrange(n)
+    second, prefix = -1, ""
+    for i in range(start, start + count):
+        # four entries a second; format each second once
+        if i // 4 != second:
+            second = i // 4
+            prefix = f"{_EPOCH + timedelta(seconds=second):%Y-%m-%d %H:%M:%S}"
+        millis = i % 4 * 250
+        stamp = f"{prefix},{millis:03d}"
+        values = {"n": int(rnd() * 100000), "ms": int(rnd() * 2000), "a": int(rnd() * 256), "b": int(rnd() * 256)}
+        roll = rnd()
+        if shape == "json":
+            record = {
+                "ts": prefix.replace(" ", "T") + (f".{millis * 1000:06d}" if millis else ""),
+                "level": "error" if roll < 0.05 else "info",
+                "logger": _LOGGERS[int(rnd() * len(_LOGGERS))],
+                "msg": (_RARE if roll < 0.001 else _MESSAGES[int(rnd() * len(_MESSAGES))]).format(**values),
+                "user_id": values["n"],
+                "duration_ms": values["ms"],
+                "http": {"status": 500 if roll < 0.05 else 200, "path": f"/api/items/{values['n']}"},
+                "payload": "x" * (1500 + int(rnd() * 500)),
+            }
+            out.append(json.dumps(record) + "\n")
+            continue
+        level = "INFO"
+        message = _MESSAGES[int(rnd() * len(_MESSAGES))].format(**values)
+        if roll < 0.001:
+            level, message = "WARNING", _RARE.format(**values)
+        elif shape == "traceback" and roll < 0.1:
+            level, message = "ERROR", "request failed\n" + _TRACEBACK.format(**values)
+        elif roll < 0.02:
+            level = "ERROR"
+        out.append(f"{stamp} - {_LOGGERS[int(rnd() * len(_LOGGERS))]} - {level}: {message}\n")
+    return out
+
+
+def generate_file(path: str, size: int, shape: str, seed: int = 0) -> None:
+    """Write *size* bytes (rounded up to whole entries) of *shape* to *path*."""
+    rng = random.Random(f"{seed}:{shape}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    written = 0
+    index = 0
+    with open(path, "wb") as fh:
+        while written < size:
+            batch = _entries(shape, rng, index)
+            index += len(batch)
+            data = "".join(batch).encode("utf-8")
+            if written + len(data) > size:  # last batch: stop after the entry crossing *size*
+                data = b""
+                for entry in batch:
+                    data += entry.encode("utf-8")
+                    if written + len(data) >= size:
+                        break
+            fh.write(data)
+            written += len(data)
+
+
+def generate_tree(root: str, files: int, seed: int = 0, depth: int = 3, fanout: int = 8) -> None:
+    """Write *files* small log files into a tree *depth* directories deep."""
+    rng = random.Random(f"{seed}:tree")
+    for i in range(files):
+        parts = [f"d{(i // fanout ** level) % fanout}" for level in range(depth)]
+        suffix = rng.choice([".log", ".log.1", ".log.2.gz", ".txt"])
+        path = os.path.join(root, *parts, f"service{i}{suffix}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = "".join(_entries("plain", rng, i, rng.randrange(1, 20))).encode("utf-8")
+        if suffix.endswith(".gz"):
+            data = gzip.compress(data, mtime=0)
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+
+def ensure_corpus(
+    out: str,
+    sizes: List[int],
+    shapes: List[str] = list(SHAPES),
+    tree: int = 0,
+    seed: int = 0,
+    tree_depth: int = 3,
+) -> Dict[str, dict]:
+    """Generate whatever of the corpus is missing under *out*; return the manifest.
+
+    The manifest maps each file (or ``tree``) name relative to *out* to
+    ``{"shape", "size", "seed"}`` (plus ``"depth"`` for the tree); entries
+    generated with other parameters are regenerated.
+    """
+    os.makedirs(out, exist_ok=True)
+    manifest_path = os.path.join(out, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        manifest = {}
+    wanted = {
+        os.path.join("files", f"{shape}-{format_size(size)}.log"): {"shape": shape, "size": size, "seed": seed}
+        for shape in shapes
+        for size in sizes
+    }
+    if tree:
+        wanted["tree"] = {"shape": "tree", "size": tree, "seed": seed, "depth": tree_depth}
+    for name, spec in wanted.items():
+        path = os.path.join(out, name)
+        if manifest.get(name) == spec and os.path.exists(path):
+            continue
+        print(f"generating {name} ...", flush=True)
+        if spec["shape"] == "tree":
+            shutil.rmtree(path, ignore_errors=True)
+            generate_tree(path, spec["size"], seed, spec["depth"])
+        else:
+            generate_file(path, spec["size"], spec["shape"], seed)
+        manifest[name] = spec
+        with open(manifest_path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2, sort_keys=True)
+    return {name: manifest[name] for name in wanted}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--out", default=os.environ.get("LOG_VIEWER_CORPUS", "/tmp/python-log-viewer-corpus"))
+    parser.add_argument("--sizes", default="1M,100M", help="comma-separated, e.g. 1M,100M,1G,10G")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--tree", type=int, default=2000, help="files in the directory tree (0 = none)")
+    parser.add_argument("--tree-depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    ensure_corpus(
+        args.out,
+        [parse_size(s) for s in args.sizes.split(",") if s],
+        [s for s in args.shapes.split(",") if s],
+        args.tree,
+        args.seed,
+        args.tree_depth,
+    )
+    print(args.out)
+
+
+if __name__ == "__main__":
+    main()
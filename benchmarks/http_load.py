@@ -0,0 +1,334 @@
+"""
+End-to-end HTTP load test of the example apps in ``examples/``.
+
+Each app is started on a free localhost port with ``LOG_VIEWER_DIR`` pointing
+at a corpus from :mod:`benchmarks.corpus`.  Then *N* simulated browser tabs
+poll it like the UI does.  Each tab watches one file and, every
+``--interval`` seconds (±20 %), does one of these actions:
+
+========== ======= ====================================================
+action     weight  request
+========== ======= ====================================================
+refresh    70      ``/api/content?file=…&lines=100`` (the auto-refresh)
+page       10      the same, ``page=2…20``
+search     10      the same with ``search=`` one of a few terms
+level      5       the same with ``level=ERROR``
+files      5       ``/api/files``
+========== ======= ====================================================
+
+``--interval 0`` turns the tabs into a closed loop (each sends its next
+request as soon as the last one is answered) to find the saturation point.
+
+For every action the report has the p50/p95/p99 latency and the throughput
+of the load phase, plus the server's CPU time per request.  The CPU time is
+measured in a separate serial phase so each action gets its own CPU time,
+which the mixed load would not give; it covers the server process and its
+children (Linux only, from ``/proc``).  Clients run in a few processes so
+their own GIL does not skew the latencies::
+
+    python -m benchmarks.http_load --apps flask,fastapi,django --clients 50 --duration 30
+    python -m benchmarks.http_load --apps "uvicorn4=python -m uvicorn app:app --workers 4 --port {port}"
+
+An app is either one of ``flask``, ``fastapi``, ``django``, ``standalone``
+(``python -m python_log_viewer serve``) or ``NAME=COMMAND``; a custom command runs in ``examples/fastapi_example`` unless
+``NAME`` starts with ``flask`` or ``django``.  Nothing leaves localhost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.corpus import ensure_corpus, parse_size
+from benchmarks.run import percentile
+
+_EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+_PREFIX = "/logs"
+_AUTH = "Basic " + base64.b64encode(b"admin:admin").decode()
+_SEARCH_TERMS = ("upstream timeout", "connection refused", "user 4", "payments")
+
+# name -> (example directory, command)
+_APPS: Dict[str, Tuple[str, str]] = {
+    "flask": ("flask_example", "{python} -m flask --app app run --port {port} --no-reload --no-debugger"),
+    "fastapi": ("fastapi_example", "{python} -m uvicorn app:app --port {port} --log-level warning"),
+    "django": ("django_example", "{python} manage.py runserver {port} --noreload"),
+    "standalone": (
+        ".",
+        "{python} -m python_log_viewer serve --port {port} --prefix /logs --username admin --password admin",
+    ),
+}
+_ACTIONS = (("refresh", 70), ("page", 10), ("search", 10), ("level", 5), ("files", 5))
+
+
+# ---------------------------------------------------------------------------
+# Server process
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _app_spec(app: str) -> Tuple[str, str, str]:
+    """Return ``(name, example directory, command template)`` for *app*."""
+    if "=" in app:
+        name, command = app.split("=", 1)
+        folder = next((d for n, (d, _c) in _APPS.items() if name.startswith(n)), "fastapi_example")
+        return name, folder, command
+    if app not in _APPS:
+        raise SystemExit(f"unknown app {app!r}; use one of {', '.join(_APPS)} or NAME=COMMAND")
+    return (app, *_APPS[app])
+
+
+@contextmanager
+def serve(app: str, log_dir: str) -> Iterator[Tuple[subprocess.Popen, int]]:
+    """Start *app* against *log_dir*; yield ``(process, port)`` once it answers."""
+    _name, folder, command = _app_spec(app)
+    port = _free_port()
+    env = dict(os.environ, LOG_VIEWER_DIR=log_dir, PYTHONUNBUFFERED="1")
+    proc = subprocess.Popen(
+        shlex.split(command.format(python=shlex.quote(sys.executable), port=port)),
+        cwd=os.path.join(_EXAMPLES, folder),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{app} exited early:\n{proc.stderr.read().decode(errors='replace')}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                conn.request("GET", f"{_PREFIX}/api/files", headers={"Authorization": _AUTH})
+                if conn.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{app} did not answer on port {port}")
+            time.sleep(0.2)
+        yield proc, port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of *pid* and its descendants (Linux only)."""
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    times: Dict[int, float] = {}
+    tick = os.sysconf("SC_CLK_TCK")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as fh:
+                fields = fh.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[0] is field 3 (state): ppid is field 4, utime/stime 14/15
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        times[int(entry)] = (int(fields[11]) + int(fields[12])) / tick
+    total, stack = 0.0, [pid]
+    while stack:
+        current = stack.pop()
+        total += times.get(current, 0.0)
+        stack.extend(children.get(current, ()))
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+
+def _request(action: str, file: str, rng: random.Random) -> str:
+    if action == "files":
+        return f"{_PREFIX}/api/files"
+    path = f"{_PREFIX}/api/content?file={file}&lines=100"
+    if action == "page":
+        return f"{path}&page={rng.randint(2, 20)}"
+    if action == "search":
+        return f"{path}&search={rng.choice(_SEARCH_TERMS).replace(' ', '+')}"
+    if action == "level":
+        return f"{path}&level=ERROR"
+    return path
+
+
+def _fetch(conn: http.client.HTTPConnection, path: str) -> bool:
+    try:
+        conn.request("GET", path, headers={"Authorization": _AUTH})
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+    except (OSError, http.client.HTTPException):
+        conn.close()  # reconnects on the next request
+        return False
+
+
+def _tab(port: int, files: List[str], seed: int, stop_at: float, interval: float, out: list) -> None:
+    rng = random.Random(seed)
+    file = rng.choice(files)
+    names = [name for name, _w in _ACTIONS]
+    weights = [w for _n, w in _ACTIONS]
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    if interval:
+        time.sleep(rng.uniform(0, interval))  # tabs were not all opened at once
+    while time.monotonic() < stop_at:
+        action = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        ok = _fetch(conn, _request(action, file, rng))
+        out.append((action, time.perf_counter() - started, ok))
+        if interval:
+            time.sleep(max(0.0, interval * rng.uniform(0.8, 1.2) - (time.perf_counter() - started)))
+    conn.close()
+
+
+def _client_process(port: int, files: List[str], seeds: List[int], duration: float, interval: float) -> list:
+    """Run one thread per seed for *duration* seconds; return all samples."""
+    out: list = []
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=_tab, args=(port, files, seed, stop_at, interval, out), daemon=True)
+        for seed in seeds
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return out
+
+
+def load(port: int, files: List[str], clients: int, duration: float, interval: float, procs: int) -> list:
+    """Run *clients* tabs over *procs* processes; return ``(action, seconds, ok)`` samples."""
+    procs = max(1, min(procs, clients))
+    seeds = list(range(clients))
+    with get_context("spawn").Pool(procs) as pool:
+        parts = pool.starmap(
+            _client_process,
+            [(port, files, seeds[i::procs], duration, interval) for i in range(procs)],
+        )
+    return [sample for part in parts for sample in part]
+
+
+def cpu_per_request(proc: subprocess.Popen, port: int, files: List[str], samples: int) -> Dict[str, Optional[float]]:
+    """Serially send *samples* requests of each action; return CPU ms per request."""
+    rng = random.Random(0)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    result: Dict[str, Optional[float]] = {}
+    for action, _weight in _ACTIONS:
+        before = cpu_seconds(proc.pid)
+        for i in range(samples):
+            _fetch(conn, _request(action, files[i % len(files)], rng))
+        after = cpu_seconds(proc.pid)
+        result[action] = None if before is None or after is None else (after - before) * 1000 / samples
+    conn.close()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+def summarize(samples: list, duration: float, cpu: Dict[str, Optional[float]]) -> Dict[str, dict]:
+    by_action: Dict[str, list] = {}
+    for action, seconds, ok in samples:
+        by_action.setdefault(action, []).append((seconds, ok))
+    by_action["all"] = [(seconds, ok) for _a, seconds, ok in samples]
+    report = {}
+    for action in [name for name, _w in _ACTIONS] + ["all"]:
+        rows = by_action.get(action)
+        if not rows:
+            continue
+        latencies = [seconds for seconds, _ok in rows]
+        report[action] = {
+            "requests": len(rows),
+            "errors": sum(1 for _s, ok in rows if not ok),
+            "rps": round(len(rows) / duration, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "cpu_ms": None if cpu.get(action) is None else round(cpu[action], 2),
+        }
+    return report
+
+
+def print_report(name: str, report: Dict[str, dict]) -> None:
+    print(f"\n{name}")
+    print(f"  {'action':<9} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cpu ms/req':>11}")
+    for action, row in report.items():
+        cpu = f"{row['cpu_ms']:.2f}" if row["cpu_ms"] is not None else "-"
+        print(
+            f"  {action:<9} {row['requests']:>7} {row['errors']:>7} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {cpu:>11}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--apps", default="flask,fastapi,django", help="comma-separated; see the module docs")
+    parser.add_argument("--corpus", default=os.environ.get("LOG_VIEWER_CORPUS", "/tmp/python-log-viewer-corpus"))
+    parser.add_argument("--sizes", default="1M,100M")
+    parser.add_argument("--shapes", default="plain,traceback,json")
+    parser.add_argument("--clients", type=int, default=50, help="simulated browser tabs")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per app")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between a tab's requests (0 = closed loop)")
+    parser.add_argument("--client-procs", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--cpu-samples", type=int, default=20, help="serial requests per action for CPU time")
+    parser.add_argument("--json", metavar="FILE", help="also write the reports as JSON")
+    args = parser.parse_args(argv)
+
+    manifest = ensure_corpus(
+        args.corpus,
+        [parse_size(s) for s in args.sizes.split(",") if s],
+        [s for s in args.shapes.split(",") if s],
+    )
+    log_dir = os.path.join(args.corpus, "files")
+    files = sorted(os.path.basename(name) for name in manifest)
+
+    reports = {}
+    for app in [a.strip() for a in args.apps.split(",") if a.strip()]:
+        name = _app_spec(app)[0]
+        print(f"{name}: starting", flush=True)
+        with serve(app, log_dir) as (proc, port):
+            for action, _weight in _ACTIONS:  # warm caches before measuring
+                cpu_per_request(proc, port, files, 1)
+            cpu = cpu_per_request(proc, port, files, args.cpu_samples)
+            print(f"{name}: {args.clients} clients for {args.duration:g}s", flush=True)
+            samples = load(port, files, args.clients, args.duration, args.interval, args.client_procs)
+        reports[name] = summarize(samples, args.duration, cpu)
+        print_report(name, reports[name])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"clients": args.clients, "duration": args.duration, "interval": args.interval, "apps": reports},
+                fh, indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
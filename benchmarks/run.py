@@ -0,0 +1,240 @@
+"""
+Run the read benchmarks against a corpus from :mod:`benchmarks.corpus`.
+
+Cases
+-----
+``first_page``
+    ``read(lines=100)`` – the newest page, what the UI opens with.
+``deep_page``
+    ``read(lines=100, page=100)`` – 10 000 entries back from the end.
+``search``
+    ``read(search=...)`` for a rare term (about one entry in a thousand):
+    the first page of matches, found in the tail window.
+``search_all``
+    ``read(lines=0, search=...)`` – the same search over the whole file.
+``all``
+    ``read(lines=0)`` – every entry of the file.
+``listing``
+    ``LogDirectory.list_files()`` on the directory tree.
+
+``search_all`` and ``all`` read the whole file into memory and are skipped
+for files larger than ``--max-all``.
+
+Every case runs in a fresh process (one warm-up call, then ``--repeat``
+timed calls), so the reported peak RSS is that case's own and one case's
+caches do not help the next.  The page cache is *not* dropped: timings are
+for warm files.  ``MB/s`` is the file size over the median time, given only
+for the cases that read the whole file.
+
+Save a run as a baseline and later compare against it; a case whose median
+latency or peak RSS grew by more than ``--threshold`` is reported as a
+regression and the exit status is 1::
+
+    python -m benchmarks.run --sizes 1M,100M --save baseline.json
+    python -m benchmarks.run --sizes 1M,100M --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import SHAPES, ensure_corpus, format_size, parse_size
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+_RARE_TERM = "upstream timeout"
+_FILE_CASES = ("first_page", "deep_page", "search", "search_all", "all")
+_SCANS_FILE = frozenset({"search_all", "all"})
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _call(case: str, root: str, name: str):
+    from python_log_viewer import LogDirectory, LogReader
+
+    log_dir = LogDirectory(root)
+    if case == "listing":
+        return lambda: log_dir.list_files()
+    reader = LogReader(log_dir)
+    kwargs = {
+        "first_page": {"lines": 100},
+        "deep_page": {"lines": 100, "page": 100},
+        "search": {"lines": 100, "search": _RARE_TERM},
+        "search_all": {"lines": 0, "search": _RARE_TERM},
+        "all": {"lines": 0},
+    }[case]
+    return lambda: reader.read(name, **kwargs)
+
+
+def _run_case(case: str, root: str, name: str, repeat: int) -> dict:
+    """Time one case (in the current process); see :func:`run_isolated`."""
+    call = _call(case, root, name)
+    result = call()  # warm-up
+    if isinstance(result, dict) and result.get("error"):
+        raise RuntimeError(f"{case} on {name}: {result['error']}")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return {"timings": timings, "rss_mb": _peak_rss_mb()}
+
+
+def run_isolated(case: str, root: str, name: str, repeat: int) -> dict:
+    """Run :func:`_run_case` in a fresh process and return its measurements."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_run_case, case, root, name, repeat).result()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of *values*."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(timings: List[float], size: int, scans_file: bool, rss_mb: Optional[float]) -> dict:
+    p50 = percentile(timings, 50)
+    return {
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mb_s": round(size / (1024 * 1024) / p50, 1) if scans_file and p50 > 0 else None,
+        "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+    }
+
+
+def run(corpus: str, manifest: Dict[str, dict], cases: List[str], repeat: int, max_all: int) -> Dict[str, dict]:
+    """Run *cases* on every file of *manifest*; return ``{case id: summary}``."""
+    results = {}
+    for name, spec in manifest.items():
+        if spec["shape"] == "tree":
+            jobs = [("listing", os.path.join(corpus, name), "")] if "listing" in cases else []
+        else:
+            root, base = os.path.split(os.path.join(corpus, name))
+            jobs = [
+                (case, root, base)
+                for case in _FILE_CASES
+                if case in cases and not (case in _SCANS_FILE and spec["size"] > max_all)
+            ]
+        for case, root, base in jobs:
+            case_id = f"{case}/{spec['shape']}-{format_size(spec['size'])}"
+            measured = run_isolated(case, root, base, repeat)
+            results[case_id] = summarize(
+                measured["timings"], spec["size"], case in _SCANS_FILE, measured["rss_mb"]
+            )
+            print(_row(case_id, results[case_id]), flush=True)
+    return results
+
+
+def _row(case_id: str, summary: dict) -> str:
+    mb_s = f"{summary['mb_s']:.1f}" if summary.get("mb_s") is not None else "-"
+    rss = f"{summary['rss_mb']:.1f}" if summary.get("rss_mb") is not None else "-"
+    return (
+        f"{case_id:<28} {summary['p50_ms']:>10.2f} {summary['p95_ms']:>10.2f} "
+        f"{summary['p99_ms']:>10.2f} {mb_s:>9} {rss:>9}"
+    )
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print *results* against *baseline*; return the ids of regressed cases.
+
+    A case regresses when its median latency or its peak RSS exceeds the
+    baseline's by more than *threshold* (a fraction).
+    """
+    regressions = []
+    print()
+    print(f"{'vs baseline':<28} {'p50 ms':>10} {'base':>10} {'change':>10} {'rss MB':>9} {'base':>9}")
+    for case_id, summary in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            print(f"{case_id:<28} {summary['p50_ms']:>10.2f} {'-':>10} {'new':>10}")
+            continue
+        change = summary["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        slower = change > threshold
+        fatter = (
+            summary.get("rss_mb") is not None
+            and base.get("rss_mb")
+            and summary["rss_mb"] / base["rss_mb"] - 1 > threshold
+        )
+        flags = [flag for flag, hit in (("SLOWER", slower), ("MORE MEMORY", fatter)) if hit]
+        if flags:
+            regressions.append(case_id)
+        print(
+            f"{case_id:<28} {summary['p50_ms']:>10.2f} {base['p50_ms']:>10.2f} {change:>+10.1%} "
+            f"{summary.get('rss_mb') or '-':>9} {base.get('rss_mb') or '-':>9}  {' '.join(flags)}".rstrip()
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--corpus", default=os.environ.get("LOG_VIEWER_CORPUS", "/tmp/python-log-viewer-corpus"))
+    parser.add_argument("--sizes", default="1M,100M", help="comma-separated, e.g. 1M,100M,1G,10G")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--tree", type=int, default=2000, help="files in the listing tree (0 = skip)")
+    parser.add_argument("--tree-depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", default=",".join(_FILE_CASES + ("listing",)))
+    parser.add_argument("--repeat", type=int, default=10, help="timed calls per case")
+    parser.add_argument("--max-all", default="1G", help="largest file for the whole-file cases")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    manifest = ensure_corpus(
+        args.corpus,
+        [parse_size(s) for s in args.sizes.split(",") if s],
+        [s for s in args.shapes.split(",") if s],
+        args.tree,
+        args.seed,
+        args.tree_depth,
+    )
+    print(f"{'case':<28} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'MB/s':>9} {'rss MB':>9}")
+    results = run(
+        args.corpus, manifest, [c for c in args.cases.split(",") if c],
+        max(1, args.repeat), parse_size(args.max_all),
+    )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                fh, indent=2, sort_keys=True,
+            )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,8 +27,9 @@ ROOT_URLCONF = "config.urls"
 # Log Viewer settings
 # ---------------------------------------------------------------------------
 
-# Point to the sample logs directory (one level up → examples/sample_logs/)
-LOG_VIEWER_DIR = os.path.join(BASE_DIR, "..", "sample_logs")
+# Point to the sample logs directory (one level up → examples/sample_logs/),
+# unless LOG_VIEWER_DIR is set in the environment
+LOG_VIEWER_DIR = os.environ.get("LOG_VIEWER_DIR", os.path.join(BASE_DIR, "..", "sample_logs"))
 
 # UI defaults (all optional — these are the defaults)
 LOG_VIEWER_AUTO_REFRESH = True
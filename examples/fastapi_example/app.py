@@ -17,8 +17,10 @@ from python_log_viewer.contrib.fastapi import create_log_viewer_router
 
 app = FastAPI(title="FastAPI + python-log-viewer example")
 
-# Point to the shared sample logs
-SAMPLE_LOGS = os.path.join(os.path.dirname(__file__), "..", "sample_logs")
+# Point to the shared sample logs (or LOG_VIEWER_DIR, e.g. a benchmark corpus)
+SAMPLE_LOGS = os.environ.get(
+    "LOG_VIEWER_DIR", os.path.join(os.path.dirname(__file__), "..", "sample_logs")
+)
 
 app.include_router(
     create_log_viewer_router(
@@ -16,8 +16,10 @@ from python_log_viewer.contrib.flask import create_log_viewer_blueprint
 
 app = Flask(__name__)
 
-# Point to the shared sample logs
-SAMPLE_LOGS = os.path.join(os.path.dirname(__file__), "..", "sample_logs")
+# Point to the shared sample logs (or LOG_VIEWER_DIR, e.g. a benchmark corpus)
+SAMPLE_LOGS = os.environ.get(
+    "LOG_VIEWER_DIR", os.path.join(os.path.dirname(__file__), "..", "sample_logs")
+)
 
 app.register_blueprint(
     create_log_viewer_blueprint(
@@ -170,6 +170,9 @@ _TEMPLATE = r"""<!DOCTYPE html>
     overflow: hidden;
   }
   .sidebar-header {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
     padding: 12px 14px 8px;
     font-size: 11px;
     font-weight: 600;
@@ -227,6 +230,14 @@ _TEMPLATE = r"""<!DOCTYPE html>
     line-height: 1.4;
     min-width: 0;
   }
+  .file-item.merge-selected {
+    background: rgba(210,168,255,0.1);
+    border-left-color: #d2a8ff;
+    color: #d2a8ff;
+  }
+  .sidebar-header .btn { padding: 2px 8px; font-size: 10px; text-transform: none; }
+  .sidebar-header .btn.active { border-color: #d2a8ff; color: #d2a8ff; }
+  .log-line .source-tag { color: #d2a8ff; margin-right: 6px; }
   .file-item .file-size {
     font-size: 11px;
     color: var(--text-muted);
@@ -317,6 +328,25 @@ _TEMPLATE = r"""<!DOCTYPE html>
   .log-line .timestamp { color: var(--text-muted); }
   .log-line .logger-name { color: #d2a8ff; }
   .log-line .highlight { background: rgba(210,153,34,0.3); border-radius: 2px; padding: 0 2px; }
+  .log-line[data-offset] { cursor: pointer; }
+  .log-line .entry-cut { color: var(--text-muted); font-style: italic; }
+  .log-line .repeat-count { color: var(--accent); font-weight: 600; margin-right: 6px; }
+  .log-line .pattern-count { display: inline-block; min-width: 70px; color: var(--accent); font-weight: 600; }
+  .log-line .entry-cut a { color: var(--accent); }
+  .log-line.context-target { outline: 1px solid var(--accent); background: rgba(88,166,255,0.12); }
+  .context-bar {
+    position: sticky;
+    top: -12px;
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    padding: 6px 0;
+    margin-bottom: 6px;
+    font-size: 12px;
+    color: var(--text-muted);
+    background: var(--bg);
+    border-bottom: 1px solid var(--border);
+  }
   .empty-state {
     display: flex;
     align-items: center;
@@ -411,7 +441,8 @@ _TEMPLATE = r"""<!DOCTYPE html>
   <button class="sidebar-toggle" id="sidebar-toggle" onclick="toggleSidebar()" title="Toggle sidebar">&#9776;</button>
   <h1>&#128203; Log Viewer</h1>
   <div class="controls">
-    <input type="text" id="search" placeholder="Search logs..." />
+    <input type="text" id="search" placeholder="Search logs..." title="Plain text, or a query: ERROR AND (timeout OR &quot;conn refused&quot;) AND NOT re:health.* level:error logger:app" />
+    <input type="text" id="field-filter" placeholder="Fields: status>=500" title="Filters on JSON-lines fields (or the fields of files with a format), e.g. level=error, duration_ms>500" />
     <select id="level-filter">
       <option value="">All Levels</option>
       <option value="DEBUG">DEBUG</option>
@@ -419,6 +450,14 @@ _TEMPLATE = r"""<!DOCTYPE html>
       <option value="WARNING">WARNING</option>
       <option value="ERROR">ERROR</option>
     </select>
+    <select id="time-range">
+      <option value="">All time</option>
+      <option value="15m">Last 15m</option>
+      <option value="1h">Last 1h</option>
+      <option value="6h">Last 6h</option>
+      <option value="24h">Last 24h</option>
+      <option value="7d">Last 7d</option>
+    </select>
     <select id="lines-limit">
       <option value="100" {{LINES_100_SELECTED}}>Last 100</option>
       <option value="250" {{LINES_250_SELECTED}}>Last 250</option>
@@ -434,6 +473,8 @@ _TEMPLATE = r"""<!DOCTYPE html>
       <option value="0" {{REFRESH_0_SELECTED}}>Manual Refresh</option>
     </select>
     <label><input type="checkbox" id="auto-scroll" {{AUTO_SCROLL_CHECKED}} /> Auto-scroll</label>
+    <label title="Show runs of repeated entries (differing only in numbers) once, with a count"><input type="checkbox" id="collapse-repeats" /> Collapse</label>
+    <label id="rotated-label" style="display:none;" title="Include rotated files (app.log.1, app.log.2.gz, ...)"><input type="checkbox" id="include-rotated" /> Rotated</label>
     <button class="btn" onclick="fetchLogs()">&#8635; Refresh</button>
     <button class="btn btn-warn" id="btn-clear" onclick="confirmAction('clear')" disabled>&#128465; Clear</button>
     <button class="btn btn-danger" id="btn-delete" onclick="confirmAction('delete')" disabled>&#10005; Delete</button>
@@ -449,7 +490,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
 
 <div class="main-layout">
   <aside class="sidebar" id="sidebar">
-    <div class="sidebar-header">Log Files</div>
+    <div class="sidebar-header">Log Files <button class="btn" id="btn-merge" onclick="toggleMergeMode()" title="Select several files and view them merged by timestamp">Merge</button></div>
     <div class="file-list" id="file-list">
       <div class="empty-state" style="padding:20px;font-size:12px;">Loading&hellip;</div>
     </div>
@@ -459,6 +500,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
     <div class="log-pane-header" id="log-pane-header" style="display:none;">
       <span class="file-icon">&#128196;</span>
       <span class="active-file-name" id="active-file-label"></span>
+      <button class="btn" style="margin-left:auto;" onclick="showPatterns()" title="Group the file's entries into message templates">Patterns</button>
     </div>
     <div id="log-container">
       <div class="empty-state" id="empty-state">Select a log file to view</div>
@@ -496,7 +538,12 @@ _TEMPLATE = r"""<!DOCTYPE html>
   const emptyState = document.getElementById('empty-state');
   const fileListEl = document.getElementById('file-list');
   const searchInput = document.getElementById('search');
+  const fieldFilter = document.getElementById('field-filter');
   const levelFilter = document.getElementById('level-filter');
+  const timeRange = document.getElementById('time-range');
+  const rotatedLabel = document.getElementById('rotated-label');
+  const includeRotatedCb = document.getElementById('include-rotated');
+  const collapseCb = document.getElementById('collapse-repeats');
   const linesLimit = document.getElementById('lines-limit');
   const refreshSelect = document.getElementById('refresh-interval');
   const autoScrollCb = document.getElementById('auto-scroll');
@@ -520,6 +567,38 @@ _TEMPLATE = r"""<!DOCTYPE html>
   let currentPage = 1;
   let totalPages = 1;
   let forceScrollToBottom = false;
+  let fileMeta = {};
+  let mergeMode = false;
+  let mergedFiles = [];
+  let mergeCursor = null;
+  // Cursor pagination: deeper pages are anchored on byte offsets so that
+  // lines appended meanwhile neither shift nor repeat entries.
+  let snapshotEnd = null;
+  let pageCursor = null;
+  let pageAnchor = null;
+  // First pages are requested with estimated totals; clicking the entry
+  // count asks for the exact one with the same parameters.
+  let totalEstimated = false;
+  let exactCountParams = null;
+  // Offset of the search hit whose surrounding entries are shown, or null.
+  let contextOffset = null;
+  // One key per tab: the server cancels this tab's previous query when a
+  // newer one arrives, and the browser aborts the superseded request.
+  const supersedeKey = Date.now().toString(36) + Math.random().toString(36).slice(2);
+  let inFlight = null;
+
+  function beginRequest(isRefresh) {
+    if (inFlight) {
+      if (isRefresh) return null;  // let the running query finish
+      inFlight.abort();
+    }
+    inFlight = new AbortController();
+    return inFlight;
+  }
+
+  function endRequest(ctrl) {
+    if (inFlight === ctrl) inFlight = null;
+  }
 
   function toggleSidebar() {
     sidebarEl.classList.toggle('open');
@@ -550,7 +629,8 @@ _TEMPLATE = r"""<!DOCTYPE html>
   function formatBytes(bytes) {
     if (bytes < 1024) return bytes + ' B';
     if (bytes < 1048576) return (bytes / 1024).toFixed(1) + ' KB';
-    return (bytes / 1048576).toFixed(1) + ' MB';
+    if (bytes < 1073741824) return (bytes / 1048576).toFixed(1) + ' MB';
+    return (bytes / 1073741824).toFixed(1) + ' GB';
   }
 
   function detectLevel(text) {
@@ -561,18 +641,43 @@ _TEMPLATE = r"""<!DOCTYPE html>
     return '';
   }
 
-  function formatLine(raw) {
+  // The search box takes plain text or a boolean query (sent as ``query``).
+  function isQuery(text) {
+    return /(^|\s)(AND|OR|NOT)(\s|$)|["()]|(^|\s)(re|level|logger):/.test(text);
+  }
+
+  function highlightTerms() {
     const search = searchInput.value.trim();
+    if (!search) return [];
+    if (!isQuery(search)) return [search];
+    // Plain terms and phrases of the query, except negated ones.
+    const terms = [];
+    const tokenRe = /(?:re|level|logger):(?:"(?:[^"\\]|\\.)*"|\S+)|"((?:[^"\\]|\\.)*)"|([^\s()"]+)/g;
+    let negated = false;
+    let m;
+    while ((m = tokenRe.exec(search)) !== null) {
+      const term = m[1] !== undefined ? m[1] : m[2];
+      if (term === 'NOT') { negated = true; continue; }
+      if (term && !negated && term !== 'AND' && term !== 'OR') terms.push(term);
+      negated = false;
+    }
+    return terms;
+  }
+
+  function highlight(html) {
+    const terms = highlightTerms();
+    if (!terms.length) return html;
+    const escaped = terms.map(t => t.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|');
+    return html.replace(new RegExp('(' + escaped + ')', 'gi'), '<span class="highlight">$1</span>');
+  }
+
+  function formatLine(raw) {
     let text = raw
       .replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;')
       .replace(/(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+)/g, '<span class="timestamp">$1</span>')
       .replace(/ - ([\w.]+)/g, ' - <span class="logger-name">$1</span>')
       .replace(/\b(INFO|WARNING|ERROR|DEBUG):/g, '<span class="level-tag">$1:</span>');
-    if (search) {
-      const escaped = search.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-      text = text.replace(new RegExp('(' + escaped + ')', 'gi'), '<span class="highlight">$1</span>');
-    }
-    return text;
+    return highlight(text);
   }
 
   function scrollToBottomNow() {
@@ -606,12 +711,14 @@ _TEMPLATE = r"""<!DOCTYPE html>
       }
 
       const groups = {};
+      fileMeta = {};
       data.files.forEach(f => {
+        fileMeta[f.name] = f;
         const sep = f.name.lastIndexOf('/');
         const folder = sep !== -1 ? f.name.substring(0, sep) : '';
         const fileName = sep !== -1 ? f.name.substring(sep + 1) : f.name;
         if (!groups[folder]) groups[folder] = [];
-        groups[folder].push({ full: f.name, display: fileName, size: f.size });
+        groups[folder].push({ full: f.name, display: fileName, size: f.size, compression: f.compression, usize: f.uncompressed_size, live: f.live, archive: f.archive });
       });
 
       let html = '';
@@ -626,10 +733,15 @@ _TEMPLATE = r"""<!DOCTYPE html>
             + '<div class="folder-children' + (isCollapsed ? ' collapsed' : '') + '">';
         }
         files.forEach(f => {
-          const cls = f.full === activeFile ? ' active' : '';
+          const cls = mergeMode
+            ? (mergedFiles.includes(f.full) ? ' merge-selected' : '')
+            : (f.full === activeFile ? ' active' : '');
           html += '<div class="file-item' + cls + '" data-file="' + f.full + '">'
             + '<span class="file-name">' + f.display + '</span>'
-            + '<span class="file-size">' + formatBytes(f.size) + '</span>'
+            + '<span class="file-size"' + (f.live ? ' title="in-process ring buffer"' : '')
+            + (f.compression || f.archive ? ' title="' + (f.archive ? 'columnar archive' : f.compression + ' compressed')
+                + (f.usize != null ? ', ' + formatBytes(f.usize) + ' uncompressed' : '') + '"' : '') + '>'
+            + formatBytes(f.size) + ((f.compression || f.archive) && f.usize != null ? ' / ' + formatBytes(f.usize) : '') + '</span>'
             + '</div>';
         });
         if (folder) {
@@ -637,8 +749,9 @@ _TEMPLATE = r"""<!DOCTYPE html>
         }
       });
       fileListEl.innerHTML = html;
+      updateRotatedToggle();
 
-      if (!activeFile && data.files.length) {
+      if (!activeFile && !mergeMode && data.files.length) {
         var urlFile = getFileFromURL();
         if (urlFile && data.files.some(function(f){ return f.name === urlFile; })) {
           selectFile(urlFile, false);
@@ -653,6 +766,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
 
   function selectFile(name, pushHistory) {
     if (pushHistory === undefined) pushHistory = true;
+    if (mergeMode) return toggleMergedFile(name);
     activeFile = name;
     currentPage = 1;
     document.querySelectorAll('.file-item').forEach(el => {
@@ -661,6 +775,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
     activeFileLabel.textContent = name;
     logPaneHeader.style.display = name ? 'flex' : 'none';
     updateActionButtons();
+    updateRotatedToggle();
     closeSidebar();
     if (pushHistory) {
       var newUrl = (BASE || '') + '/' + name.split('/').map(encodeURIComponent).join('/');
@@ -672,26 +787,232 @@ _TEMPLATE = r"""<!DOCTYPE html>
 
   fileListEl.addEventListener('click', (e) => {
     const item = e.target.closest('.file-item');
-    if (item) selectFile(item.dataset.file);
+    if (!item) return;
+    if (mergeMode) toggleMergedFile(item.dataset.file);
+    else selectFile(item.dataset.file);
   });
 
-  async function fetchLogs() {
+  function toggleMergeMode() {
+    mergeMode = !mergeMode;
+    document.getElementById('btn-merge').classList.toggle('active', mergeMode);
+    mergedFiles = mergeMode && activeFile ? [activeFile] : [];
+    mergeCursor = null;
+    currentPage = 1;
+    updateMergeState();
+    if (mergeMode || activeFile) {
+      showLogLoader();
+      fetchLogs();
+    } else {
+      container.innerHTML = '';
+      emptyState.style.display = 'flex';
+      emptyState.textContent = 'Select a log file to view';
+      container.appendChild(emptyState);
+      lineCountEl.textContent = '0';
+      document.getElementById('pagination').style.display = 'none';
+    }
+  }
+
+  function toggleMergedFile(name) {
+    const idx = mergedFiles.indexOf(name);
+    if (idx === -1) mergedFiles.push(name);
+    else mergedFiles.splice(idx, 1);
+    mergeCursor = null;
+    currentPage = 1;
+    updateMergeState();
+    showLogLoader();
+    fetchLogs();
+  }
+
+  function updateMergeState() {
+    document.querySelectorAll('.file-item').forEach(el => {
+      el.classList.toggle('active', !mergeMode && el.dataset.file === activeFile);
+      el.classList.toggle('merge-selected', mergeMode && mergedFiles.includes(el.dataset.file));
+    });
+    if (mergeMode) {
+      activeFileLabel.textContent = mergedFiles.length ? 'Merged: ' + mergedFiles.join(', ') : 'Select files to merge';
+      logPaneHeader.style.display = 'flex';
+    } else {
+      activeFileLabel.textContent = activeFile;
+      logPaneHeader.style.display = activeFile ? 'flex' : 'none';
+    }
+    updateActionButtons();
+  }
+
+  // Entries longer than this are cut by the server; the rest is linked.
+  const MAX_ENTRY_BYTES = 16384;
+
+  function truncatedByIndex(data) {
+    const cuts = {};
+    (data.truncated || []).forEach(t => { cuts[t.index] = t; });
+    return cuts;
+  }
+
+  function cutMarker(cut, file) {
+    if (!cut) return '';
+    let html = ' <span class="entry-cut">&hellip; ' + formatBytes(cut.length) + ' entry';
+    if (cut.offset !== null && cut.offset !== undefined) {
+      // rotated reads locate entries as [segment, offset]
+      const [segment, offset] = Array.isArray(cut.offset) ? cut.offset : [file, cut.offset];
+      const url = BASE + '/api/entry?' + new URLSearchParams({ file: segment, offset: offset }).toString().replace(/&/g, '&amp;');
+      html += ' &middot; <a href="' + url + '" target="_blank">full</a>'
+        + ' &middot; <a href="' + url + '&amp;format=json" target="_blank">JSON</a>';
+    }
+    return html + '</span>';
+  }
+
+  function repeatBadge(run) {
+    if (!run) return '';
+    const span = run.first && run.last ? run.first + ' \u2013 ' + run.last : '';
+    return '<span class="repeat-count" title="' + run.count + ' repeats ' + span + '">&times;' + run.count + '</span>';
+  }
+
+  // Files with a server-side format come back split into these columns.
+  const FORMAT_COLUMNS = 'timestamp,level,logger,message';
+
+  function formatColumns(columns, i) {
+    const value = name => (columns[name] ? columns[name][i] : null);
+    if (value('message') === null) return null;
+    const esc = v => String(v).replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;');
+    let html = '';
+    if (value('timestamp') !== null) html += '<span class="timestamp">' + esc(value('timestamp')) + '</span> ';
+    if (value('level') !== null) html += '<span class="level-tag">' + esc(value('level')) + '</span> ';
+    if (value('logger') !== null) html += '<span class="logger-name">' + esc(value('logger')) + '</span> ';
+    return html + highlight(esc(value('message')));
+  }
+
+  function renderMergedLine(line, source, cut) {
+    const lvl = detectLevel(line);
+    return '<div class="log-line' + (lvl ? ' level-' + lvl : '') + '">'
+      + '<span class="source-tag">[' + source + ']</span>' + formatLine(line) + cutMarker(cut, source) + '</div>';
+  }
+
+  async function fetchMerged(isRefresh) {
+    if (!mergedFiles.length) {
+      container.innerHTML = '';
+      emptyState.style.display = 'flex';
+      emptyState.textContent = 'Select files to merge';
+      container.appendChild(emptyState);
+      lineCountEl.textContent = '0';
+      totalPages = 1;
+      updatePagination();
+      return;
+    }
+    const ctrl = beginRequest(isRefresh);
+    if (!ctrl) return;
+    try {
+      const lines = parseInt(linesLimit.value);
+      const params = new URLSearchParams({ files: mergedFiles.join(','), lines: lines, page: currentPage, max_entry_bytes: MAX_ENTRY_BYTES, supersede: supersedeKey });
+      const level = levelFilter.value;
+      const search = searchInput.value.trim();
+      const fields = fieldFilter.value.trim();
+      if (level) params.set('level', level);
+      if (search) params.set(isQuery(search) ? 'query' : 'search', search);
+      if (fields) params.set('fields', fields);
+      // Live tail: on refresh of the newest page only ask for what was appended.
+      const tail = isRefresh && currentPage === 1 && mergeCursor && container.querySelector('.log-line');
+      if (tail) params.set('after', JSON.stringify(mergeCursor));
+
+      const resp = await fetch(BASE + '/api/merged?' + params.toString(), { signal: ctrl.signal });
+      const data = await resp.json();
+      if (data.cancelled) return;
+      if (data.error) { showToast(data.error, 'error'); return; }
+      mergeCursor = data.cursor;
+      const cuts = truncatedByIndex(data);
+      const scrollThreshold = 200;
+      const wasNearBottom = (container.scrollHeight - container.scrollTop - container.clientHeight) < scrollThreshold;
+
+      if (tail && !data.has_more) {
+        if (data.lines.length) {
+          container.insertAdjacentHTML('beforeend', data.lines.map((l, i) => renderMergedLine(l, data.sources[i], cuts[i])).join(''));
+          if (lines > 0) {
+            while (container.querySelectorAll('.log-line').length > lines) container.querySelector('.log-line').remove();
+          }
+          lineCountEl.textContent = container.querySelectorAll('.log-line').length + '+';
+        }
+      } else {
+        lineCountEl.textContent = data.total + (data.has_more || data.partial ? '+' : '');
+        lineCountEl.title = data.partial ? 'Partial results: only the newest part of the logs was scanned' : '';
+        lineCountEl.style.cursor = '';
+        totalEstimated = false;
+        exactCountParams = null;
+        totalPages = data.total_pages || 1;
+        currentPage = data.page || 1;
+        if (!data.lines.length) {
+          container.innerHTML = '';
+          emptyState.style.display = 'flex';
+          emptyState.textContent = 'No log entries found.';
+          container.appendChild(emptyState);
+          updatePagination();
+          return;
+        }
+        emptyState.style.display = 'none';
+        container.innerHTML = data.lines.map((l, i) => renderMergedLine(l, data.sources[i], cuts[i])).join('');
+      }
+      if (!isRefresh || (autoScrollCb.checked && wasNearBottom && currentPage === 1)) scrollToBottomNow();
+      updatePagination();
+    } catch (e) {
+      if (e.name !== 'AbortError') console.error('Failed to fetch merged logs:', e);
+    } finally {
+      endRequest(ctrl);
+    }
+  }
+
+  async function fetchLogs(isRefresh) {
+    if (mergeMode) return fetchMerged(isRefresh);
     if (!activeFile) return;
+    if (contextOffset !== null) {
+      // Auto-refresh leaves the context view alone; anything else closes it.
+      if (isRefresh) return;
+      contextOffset = null;
+    }
+    const ctrl = beginRequest(isRefresh);
+    if (!ctrl) return;
     try {
       const shouldForceScrollToBottom = forceScrollToBottom;
       forceScrollToBottom = false;
       const lines = parseInt(linesLimit.value);
-      const params = new URLSearchParams({ file: activeFile, lines: lines, page: currentPage });
+      const anchor = currentPage > 1 ? pageAnchor : null;
+      const params = new URLSearchParams({ file: activeFile, lines: lines, page: anchor ? anchor.page : currentPage, max_entry_bytes: MAX_ENTRY_BYTES, supersede: supersedeKey });
+      if (anchor && anchor.before !== undefined) params.set('before', anchor.before);
+      if (anchor && anchor.after !== undefined) params.set('after', anchor.after);
+      if (!anchor) params.set('estimate', '1');
       const level = levelFilter.value;
       const search = searchInput.value.trim();
+      const fields = fieldFilter.value.trim();
       if (level) params.set('level', level);
-      if (search) params.set('search', search);
-
-      const resp = await fetch(BASE + '/api/content?' + params.toString());
+      if (search) params.set(isQuery(search) ? 'query' : 'search', search);
+      if (fields) params.set('fields', fields);
+      if (timeRange.value) params.set('since', timeRange.value);
+      if (includeRotatedCb.checked && rotatedLabel.style.display !== 'none') params.set('rotated', '1');
+      if (fileMeta[activeFile] && fileMeta[activeFile].format) params.set('columns', FORMAT_COLUMNS);
+      if (collapseCb.checked) params.set('collapse', 'numbers');
+
+      const resp = await fetch(BASE + '/api/content?' + params.toString(), { signal: ctrl.signal });
       const data = await resp.json();
-      lineCountEl.textContent = data.total;
-      totalPages = data.total_pages || 1;
-      currentPage = data.page || 1;
+      if (data.cancelled) return;
+      if (data.error && !data.lines.length) {
+        // Refused by the server's query planner (429/503) or an invalid
+        // filter: keep the current view.
+        if (!isRefresh) showToast(data.error, 'error');
+        return;
+      }
+      if (anchor) {
+        // Keep the totals of the first page; only learn where this page ends.
+        pageCursor = data.cursor;
+        if (anchor.before !== undefined && !data.has_more) totalPages = currentPage;
+      } else {
+        totalEstimated = !!data.total_estimated;
+        exactCountParams = totalEstimated ? params : null;
+        lineCountEl.textContent = (totalEstimated ? '~' : '') + data.total + ((data.has_more && !totalEstimated) || data.partial ? '+' : '');
+        lineCountEl.title = data.errors ? 'Partial results: no answer from ' + Object.keys(data.errors).map(h => h + ' (' + data.errors[h] + ')').join(', ')
+          : data.partial ? 'Partial results: only the newest part of the log was scanned'
+          : totalEstimated ? 'Estimated from the newest entries - click for the exact count' : '';
+        lineCountEl.style.cursor = totalEstimated ? 'pointer' : '';
+        totalPages = data.total_pages || 1;
+        currentPage = data.page || 1;
+        snapshotEnd = currentPage === 1 && data.end !== undefined ? data.end : null;
+        pageCursor = null;
+      }
 
       if (!data.lines.length) {
         container.innerHTML = '';
@@ -707,9 +1028,22 @@ _TEMPLATE = r"""<!DOCTYPE html>
       const scrollThreshold = 200;
       const wasNearBottom = (container.scrollHeight - container.scrollTop - container.clientHeight) < scrollThreshold;
 
-      container.innerHTML = data.lines.map(line => {
-        const lvl = detectLevel(line);
-        return '<div class="log-line' + (lvl ? ' level-' + lvl : '') + '">' + formatLine(line) + '</div>';
+      // Hits of a filtered view link to their surrounding entries.
+      const offsets = (level || search || fields) && data.offsets ? data.offsets : null;
+      const cuts = truncatedByIndex(data);
+      const repeats = {};
+      (data.repeats || []).forEach(r => { repeats[r.index] = r; });
+      container.innerHTML = data.lines.map((line, i) => {
+        // Columns of cut entries are cut to the same size by the server.
+        const cols = data.columns ? formatColumns(data.columns, i) : null;
+        const colLevel = cols !== null && data.columns.level ? String(data.columns.level[i] || '').toUpperCase() : '';
+        const lvl = ['ERROR', 'WARNING', 'DEBUG', 'INFO'].includes(colLevel) ? colLevel : detectLevel(line);
+        return '<div class="log-line' + (lvl ? ' level-' + lvl : '') + '"'
+          + (offsets ? dataOffset(offsets[i]) + ' title="Click to show surrounding entries"' : '')
+          + '>' + repeatBadge(repeats[i])
+          // federated viewers tag each entry with its host
+          + (data.sources ? '<span class="source-tag">[' + data.sources[i] + ']</span>' : '')
+          + (cols !== null ? cols : formatLine(line)) + cutMarker(cuts[i], activeFile) + '</div>';
       }).join('');
 
       if (shouldForceScrollToBottom) {
@@ -721,7 +1055,9 @@ _TEMPLATE = r"""<!DOCTYPE html>
 
       updatePagination();
     } catch (e) {
-      console.error('Failed to fetch logs:', e);
+      if (e.name !== 'AbortError') console.error('Failed to fetch logs:', e);
+    } finally {
+      endRequest(ctrl);
     }
   }
 
@@ -729,15 +1065,139 @@ _TEMPLATE = r"""<!DOCTYPE html>
     var pg = document.getElementById('pagination');
     if (totalPages <= 1) { pg.style.display = 'none'; return; }
     pg.style.display = 'flex';
-    document.getElementById('page-info').textContent = 'Page ' + currentPage + ' of ' + totalPages;
+    document.getElementById('page-info').textContent = 'Page ' + currentPage + ' of ' + (totalEstimated ? '~' : '') + totalPages;
     document.getElementById('btn-first').disabled = currentPage <= 1;
     document.getElementById('btn-prev').disabled = currentPage <= 1;
     document.getElementById('btn-next').disabled = currentPage >= totalPages;
     document.getElementById('btn-last').disabled = currentPage >= totalPages;
   }
 
+  async function countExactly() {
+    const params = exactCountParams;
+    if (!params) return;
+    const exact = new URLSearchParams(params);
+    exact.delete('estimate');
+    exact.delete('supersede');
+    try {
+      const resp = await fetch(BASE + '/api/content?' + exact.toString());
+      const data = await resp.json();
+      // Ignore the answer if the view has changed meanwhile.
+      if (!resp.ok || data.error || exactCountParams !== params) return;
+      totalEstimated = false;
+      exactCountParams = null;
+      lineCountEl.textContent = data.total + (data.partial ? '+' : '');
+      lineCountEl.title = data.partial ? 'Partial results: only the newest part of the log was scanned' : '';
+      lineCountEl.style.cursor = '';
+      totalPages = data.total_pages || 1;
+      updatePagination();
+    } catch (e) {
+      console.error('Failed to count entries:', e);
+    }
+  }
+
+  lineCountEl.addEventListener('click', countExactly);
+
+  function dataOffset(position) {
+    if (!Array.isArray(position)) return ' data-offset="' + position + '"';
+    const segment = String(position[0]).replace(/&/g, '&amp;').replace(/"/g, '&quot;').replace(/</g, '&lt;');
+    return ' data-offset="' + position[1] + '" data-segment="' + segment + '"';
+  }
+
+  async function showContext(offset, file) {
+    const ctrl = beginRequest(false);
+    contextOffset = offset;
+    try {
+      const params = new URLSearchParams({ file: file, offset: offset, before: 20, after: 20, max_entry_bytes: MAX_ENTRY_BYTES });
+      const resp = await fetch(BASE + '/api/context?' + params.toString(), { signal: ctrl.signal });
+      const data = await resp.json();
+      if (contextOffset !== offset) return;
+      if (data.error) {
+        contextOffset = null;
+        showToast(data.error, 'error');
+        return;
+      }
+      document.getElementById('pagination').style.display = 'none';
+      const cuts = truncatedByIndex(data);
+      container.innerHTML = '<div class="context-bar"><span>Entries around the selected match</span>'
+        + '<button class="btn" onclick="closeContext()">&#8592; Back to results</button></div>'
+        + data.lines.map((line, i) => {
+          const lvl = detectLevel(line);
+          return '<div class="log-line' + (lvl ? ' level-' + lvl : '') + (i === data.target ? ' context-target' : '') + '">'
+            + formatLine(line) + cutMarker(cuts[i], file) + '</div>';
+        }).join('');
+      const target = container.querySelector('.context-target');
+      if (target) target.scrollIntoView({ block: 'center' });
+    } catch (e) {
+      if (e.name !== 'AbortError') console.error('Failed to fetch context:', e);
+    } finally {
+      endRequest(ctrl);
+    }
+  }
+
+  // The patterns view, like the context view, is left alone by auto-refresh.
+  const PATTERNS_VIEW = -1;
+
+  async function showPatterns() {
+    if (!activeFile) return;
+    const ctrl = beginRequest(false);
+    contextOffset = PATTERNS_VIEW;
+    try {
+      const params = new URLSearchParams({ file: activeFile, top: 50, supersede: supersedeKey });
+      if (levelFilter.value) params.set('level', levelFilter.value);
+      const resp = await fetch(BASE + '/api/patterns?' + params.toString(), { signal: ctrl.signal });
+      const data = await resp.json();
+      if (contextOffset !== PATTERNS_VIEW) return;
+      if (data.error) {
+        contextOffset = null;
+        showToast(data.error, 'error');
+        return;
+      }
+      document.getElementById('pagination').style.display = 'none';
+      const esc = v => String(v).replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;');
+      container.innerHTML = '<div class="context-bar"><span>' + data.clusters + ' message templates in '
+        + data.entries + ' entries' + (data.partial ? ' (newest part of the file)' : '') + '</span>'
+        + '<button class="btn" onclick="closeContext()">&#8592; Back to results</button></div>'
+        + data.patterns.map(p => {
+          const levels = Object.keys(p.levels);
+          const lvl = levels.sort((a, b) => p.levels[b] - p.levels[a])[0] || '';
+          const example = p.examples[p.examples.length - 1];
+          return '<div class="log-line' + (lvl ? ' level-' + lvl : '') + '"'
+            + (example !== undefined ? ' data-offset="' + example + '" title="Click to show the latest entry like this"' : '') + '>'
+            + '<span class="pattern-count">' + p.count + '</span>'
+            + levels.map(l => '<span class="level-tag">' + esc(l) + ':' + p.levels[l] + '</span> ').join('')
+            + esc(p.template) + '</div>';
+        }).join('');
+    } catch (e) {
+      if (e.name !== 'AbortError') console.error('Failed to fetch patterns:', e);
+    } finally {
+      endRequest(ctrl);
+    }
+  }
+
+  function closeContext() {
+    contextOffset = null;
+    fetchLogs();
+  }
+
+  container.addEventListener('click', (e) => {
+    const line = e.target.closest('.log-line[data-offset]');
+    // Selecting text in a line should not navigate away from it.
+    if (!line || e.target.closest('a') || String(window.getSelection())) return;
+    showContext(parseInt(line.dataset.offset), line.dataset.segment || activeFile);
+  });
+
   function goPage(p) {
     if (p < 1 || p > totalPages) return;
+    pageAnchor = null;
+    if (!mergeMode && p > 1) {
+      if (p === currentPage + 1 && currentPage === 1 && snapshotEnd !== null) {
+        pageAnchor = { before: snapshotEnd, page: 2 };
+      } else if (p === currentPage + 1 && pageCursor && pageCursor.older !== null) {
+        pageAnchor = { before: pageCursor.older, page: 1 };
+      } else if (p === currentPage - 1 && pageCursor && pageCursor.newer !== null) {
+        pageAnchor = { after: pageCursor.newer, page: 1 };
+      }
+    }
     currentPage = p;
     forceScrollToBottom = true;
     showLogLoader();
@@ -748,7 +1208,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
     if (refreshTimer) clearInterval(refreshTimer);
     const interval = parseInt(refreshSelect.value);
     if (interval > 0) {
-      refreshTimer = setInterval(() => { fetchLogs(); fetchFiles(); }, interval);
+      refreshTimer = setInterval(() => { fetchLogs(true); fetchFiles(); }, interval);
       statusDot.classList.remove('paused');
       statusText.textContent = 'Live';
     } else {
@@ -763,14 +1223,27 @@ _TEMPLATE = r"""<!DOCTYPE html>
     currentPage = 1;
     searchTimeout = setTimeout(fetchLogs, 400);
   });
+  fieldFilter.addEventListener('input', () => {
+    clearTimeout(searchTimeout);
+    currentPage = 1;
+    searchTimeout = setTimeout(fetchLogs, 400);
+  });
   levelFilter.addEventListener('change', () => { currentPage = 1; fetchLogs(); });
+  timeRange.addEventListener('change', () => { currentPage = 1; fetchLogs(); });
+  includeRotatedCb.addEventListener('change', () => { currentPage = 1; fetchLogs(); });
+  collapseCb.addEventListener('change', () => { currentPage = 1; fetchLogs(); });
   linesLimit.addEventListener('change', () => { currentPage = 1; fetchLogs(); });
   refreshSelect.addEventListener('change', startRefresh);
 
+  function updateRotatedToggle() {
+    const meta = fileMeta[activeFile];
+    rotatedLabel.style.display = meta && meta.rotated && meta.rotated.length ? '' : 'none';
+  }
+
   function updateActionButtons() {
-    const hasFile = !!activeFile;
+    const hasFile = !!activeFile && !mergeMode;
     btnClear.disabled = !hasFile;
-    btnDelete.disabled = !hasFile;
+    btnDelete.disabled = !hasFile || !!(fileMeta[activeFile] && fileMeta[activeFile].live);
   }
 
   function showToast(message, type) {
@@ -856,6 +1329,7 @@ _TEMPLATE = r"""<!DOCTYPE html>
       activeFileLabel.textContent = file;
       logPaneHeader.style.display = 'flex';
       updateActionButtons();
+      updateRotatedToggle();
       showLogLoader();
       fetchLogs();
     } else if (!file && activeFile) {
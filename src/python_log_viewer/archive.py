@@ -0,0 +1,454 @@
+"""
+Columnar archives of log files, for long retention.
+
+An archive (``*.lva``) holds the entries of one or more log files in blocks
+of compressed columns, written once from existing logs::
+
+    from python_log_viewer.archive import write_archive
+
+    write_archive(["logs/app.log.3.gz", "logs/app.log.2", "logs/app.log.1"],
+                  "logs/app-2026-10.lva")
+
+or ``python -m python_log_viewer archive logs/app.log.* -o logs/app-2026-10.lva``.
+
+Each block of up to ``block_entries`` entries stores, each column
+compressed on its own with zlib:
+
+* the entry timestamps, as millisecond deltas (entries without one inherit
+  the previous entry's, as in time-range reads);
+* the level and logger of each entry, as codes into the archive's
+  dictionaries;
+* the entry lengths and the entry text.
+
+A footer lists every block with its entry count, its first and last
+timestamp and the set of levels in it.
+:class:`~python_log_viewer.core.LogDirectory` lists archives next to the
+text files, and :class:`~python_log_viewer.core.LogReader` reads them
+natively.  Entry numbers take the place of byte offsets, time ranges and
+level filters skip the blocks that cannot match, and a page only
+decompresses the text of the blocks it is on.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.patterns import entry_level
+from python_log_viewer.sources import open_source
+from python_log_viewer.structured import Parser, parse_record
+from python_log_viewer.timestamps import parse_timestamp
+
+#: File name suffix of archives.
+ARCHIVE_SUFFIX = ".lva"
+
+DEFAULT_BLOCK_ENTRIES = 4096
+
+_MAGIC = b"LVARC\x00\x01\x00"
+_TRAILER = struct.Struct("<Q8s")  # footer length, magic
+_COLUMNS = ("time", "level", "logger", "length", "text")
+_COMPRESS_LEVEL = 6
+_MAX_CACHED_BYTES = 16 * 1024 * 1024  # decompressed columns, per archive
+_MAX_CACHED_ARCHIVES = 8
+
+
+def is_archive(path: str) -> bool:
+    """Tell whether *path* names an archive (by its suffix)."""
+    return path.endswith(ARCHIVE_SUFFIX)
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+
+class _Writer:
+    """Accumulate entries and write them block by block to *out*."""
+
+    def __init__(self, out, block_entries: int, parse: Optional[Parser]) -> None:
+        self.out = out
+        self.block_entries = max(1, block_entries)
+        self.parse = parse
+        self.levels: Dict[str, int] = {"": 0}
+        self.loggers: Dict[str, int] = {"": 0}
+        self.blocks: List[list] = []
+        self.entries = 0
+        self.source_bytes = 0
+        self.last_ts: Optional[float] = None
+        self._reset()
+        out.write(_MAGIC)
+        self.offset = len(_MAGIC)
+
+    def _reset(self) -> None:
+        self.times: List[Optional[float]] = []
+        self.level_codes = bytearray()
+        self.logger_codes = array("H")
+        self.lengths = array("I")
+        self.texts: List[bytes] = []
+
+    def add(self, entry: str) -> None:
+        ts = parse_timestamp(entry)
+        if ts is not None:
+            self.last_ts = ts
+        record = self.parse(entry) if self.parse is not None else (
+            parse_record(entry) if entry.startswith("{") else None
+        )
+        level = logger = None
+        if record:
+            level = record.get("level", record.get("levelname"))
+            logger = record.get("logger", record.get("name"))
+        level = str(level).upper() if level else entry_level(entry.split("\n", 1)[0])
+        data = entry.encode("utf-8")
+        self.times.append(self.last_ts)
+        self.level_codes.append(self._code(self.levels, level, 255))
+        self.logger_codes.append(self._code(self.loggers, str(logger) if logger else "", 65535))
+        self.lengths.append(len(data))
+        self.texts.append(data)
+        if len(self.texts) >= self.block_entries:
+            self.flush()
+
+    @staticmethod
+    def _code(dictionary: Dict[str, int], value: str, limit: int) -> int:
+        code = dictionary.get(value)
+        if code is None:
+            if len(dictionary) > limit:
+                return 0  # dictionary full: recorded as unknown
+            code = dictionary[value] = len(dictionary)
+        return code
+
+    def flush(self) -> None:
+        count = len(self.texts)
+        if not count:
+            return
+        untimed = 0
+        while untimed < count and self.times[untimed] is None:
+            untimed += 1
+        stamps = [round(ts * 1000) for ts in self.times[untimed:]]
+        deltas = array("q", [b - a for a, b in zip([0] + stamps, stamps)])
+        mask = 0
+        for code in set(self.level_codes):
+            mask |= 1 << code
+        raw = b"".join(self.texts)
+        columns = [
+            _pack(deltas),
+            bytes(self.level_codes),
+            _pack(self.logger_codes),
+            _pack(self.lengths),
+            raw,
+        ]
+        sizes = []
+        for column in columns:
+            packed = zlib.compress(column, _COMPRESS_LEVEL)
+            self.out.write(packed)
+            sizes.append(len(packed))
+        self.blocks.append([
+            self.offset, count, untimed,
+            min(stamps) / 1000 if stamps else None,
+            max(stamps) / 1000 if stamps else None,
+            mask, sizes, len(raw),
+        ])
+        self.offset += sum(sizes)
+        self.entries += count
+        self.source_bytes += len(raw)
+        self._reset()
+
+    def close(self, sources: Sequence[str]) -> None:
+        self.flush()
+        footer = zlib.compress(json.dumps({
+            "version": 1,
+            "entries": self.entries,
+            "source_bytes": self.source_bytes,
+            "sources": list(sources),
+            "levels": list(self.levels),
+            "loggers": list(self.loggers),
+            "blocks": self.blocks,
+        }).encode("utf-8"), _COMPRESS_LEVEL)
+        self.out.write(footer)
+        self.out.write(_TRAILER.pack(len(footer), _MAGIC))
+
+
+def write_archive(
+    paths: Sequence[str],
+    dest: str,
+    *,
+    block_entries: int = DEFAULT_BLOCK_ENTRIES,
+    parse: Optional[Parser] = None,
+    cancel=None,
+) -> dict:
+    """Write the entries of the log files *paths*, oldest first, to the archive *dest*.
+
+    Compressed inputs are read transparently.  Entries are grouped as
+    :meth:`~python_log_viewer.core.LogReader.read` groups them; their level
+    and logger come from *parse* (a field parser, see
+    :mod:`python_log_viewer.formats`), JSON-lines fields, or the level
+    named in the first line.  *dest* is replaced atomically.
+
+    Returns ``{"entries", "blocks", "source_bytes", "archive_bytes"}``.
+    """
+    from python_log_viewer.core import LogDirectory, LogReader  # core imports this module
+
+    reader = LogReader(LogDirectory(os.path.dirname(os.path.abspath(dest))))
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as out:
+            writer = _Writer(out, block_entries, parse)
+            for path in paths:
+                source = open_source(path)
+                for _offset, entry in reader._iter_forward(source, 0, source.size, cancel):
+                    writer.add(entry)
+            writer.close([os.path.basename(path) for path in paths])
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return {
+        "entries": writer.entries,
+        "blocks": len(writer.blocks),
+        "source_bytes": writer.source_bytes,
+        "archive_bytes": os.path.getsize(dest),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+class Block(NamedTuple):
+    offset: int  # file offset of the block's first column
+    count: int  # entries
+    first: int  # number of the block's first entry in the archive
+    untimed: int  # leading entries without a timestamp (before any in the archive)
+    min_ts: Optional[float]
+    max_ts: Optional[float]
+    levels: int  # bit mask of the level codes present
+    sizes: Tuple[int, ...]  # compressed size of each column
+    raw_bytes: int  # uncompressed size of the text
+
+
+class Archive:
+    """An archive opened for reading; see :func:`open_archive`.
+
+    Decompressed columns are cached (up to ``_MAX_CACHED_BYTES``), so
+    paging through recent history decompresses each block once, and the
+    small level and time columns stay cached next to the text.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("Not a log archive")
+            f.seek(-_TRAILER.size, os.SEEK_END)
+            length, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic != _MAGIC:
+                raise ValueError("Truncated log archive")
+            f.seek(-_TRAILER.size - length, os.SEEK_END)
+            footer = json.loads(zlib.decompress(f.read(length)))
+        self.entries: int = footer["entries"]
+        self.source_bytes: int = footer["source_bytes"]
+        self.sources: List[str] = footer["sources"]
+        self.levels: List[str] = footer["levels"]
+        self.loggers: List[str] = footer["loggers"]
+        self.blocks: List[Block] = []
+        first = 0
+        for offset, count, untimed, min_ts, max_ts, levels, sizes, raw_bytes in footer["blocks"]:
+            self.blocks.append(Block(offset, count, first, untimed, min_ts, max_ts, levels, tuple(sizes), raw_bytes))
+            first += count
+        self._firsts = [block.first for block in self.blocks]
+        self._cache: "OrderedDict[Tuple[int, str], Tuple[int, object]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def level_mask(self, level: str) -> int:
+        """Return the bit mask of the level codes whose name contains *level*."""
+        upper = level.upper()
+        mask = 0
+        for code, name in enumerate(self.levels):
+            if name and upper in name:
+                mask |= 1 << code
+        return mask
+
+    def block_of(self, entry: int) -> int:
+        """Return the index of the block holding entry number *entry*."""
+        return bisect_right(self._firsts, entry) - 1
+
+    def _column(self, i: int, name: str):
+        key = (i, name)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                _stats.cache("archive", True)
+                return self._cache[key][1]
+        _stats.cache("archive", False)
+        block = self.blocks[i]
+        col = _COLUMNS.index(name)
+        start = block.offset + sum(block.sizes[:col])
+        with _stats.phase("io"), open(self.path, "rb") as f:
+            f.seek(start)
+            packed = f.read(block.sizes[col])
+        _stats.add("bytes_read", len(packed))
+        data = zlib.decompress(packed)
+        if name == "time":
+            value, ts = [], 0
+            for delta in _unpack("q", data):
+                ts += delta
+                value.append(ts / 1000)
+            value = [None] * block.untimed + value
+        elif name == "level":
+            value = data
+        elif name == "logger":
+            value = _unpack("H", data)
+        elif name == "length":
+            value = _unpack("I", data)
+        else:
+            lengths = self._column(i, "length")
+            value, pos = [], 0
+            for length in lengths:
+                value.append(data[pos:pos + length].decode("utf-8", errors="replace"))
+                pos += length
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = (len(data), value)
+                self._cached_bytes += len(data)
+            while self._cached_bytes > _MAX_CACHED_BYTES and len(self._cache) > 1:
+                self._cached_bytes -= self._cache.popitem(last=False)[1][0]
+        return value
+
+    def times(self, i: int) -> List[Optional[float]]:
+        """Timestamps of the entries of block *i* (``None`` before the first one)."""
+        return self._column(i, "time")
+
+    def level_codes(self, i: int) -> bytes:
+        return self._column(i, "level")
+
+    def logger_codes(self, i: int) -> array:
+        return self._column(i, "logger")
+
+    def texts(self, i: int) -> List[str]:
+        """The entries of block *i*."""
+        return self._column(i, "text")
+
+    def entry_range(self, lo: int, hi: int) -> List[str]:
+        """Return entries number *lo* to *hi* - 1."""
+        lo, hi = max(0, lo), min(self.entries, hi)
+        out: List[str] = []
+        if lo >= hi:
+            return out
+        for i in range(self.block_of(lo), len(self.blocks)):
+            block = self.blocks[i]
+            if block.first >= hi:
+                break
+            out.extend(self.texts(i)[max(0, lo - block.first):hi - block.first])
+        return out
+
+    def matching(
+        self,
+        i: int,
+        *,
+        lo: int = 0,
+        hi: Optional[int] = None,
+        level_mask: int = 0,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ):
+        """Return the positions in block *i* (within ``[lo, hi)``) matching the filters.
+
+        Only the columns a filter needs are decompressed: none when the
+        block's summary decides it.  Returns a :class:`range` when every
+        position in ``[lo, hi)`` matches.
+        """
+        block = self.blocks[i]
+        hi = block.count if hi is None else hi
+        if lo >= hi:
+            return range(0)
+        if level_mask and not block.levels & level_mask:
+            return range(0)
+        if not block.untimed and block.min_ts is not None:
+            if (since is not None and block.max_ts < since) or (until is not None and block.min_ts > until):
+                return range(0)
+            if (since is None or block.min_ts >= since) and (until is None or block.max_ts <= until):
+                since = until = None  # the whole block is in range
+        positions = range(lo, hi)
+        if since is not None or until is not None:
+            times = self.times(i)
+            positions = [
+                p for p in positions
+                if times[p] is None or (
+                    (since is None or times[p] >= since) and (until is None or times[p] <= until)
+                )
+            ]
+        if level_mask and block.levels & ~level_mask:  # not every level present matches
+            codes = self.level_codes(i)
+            if isinstance(positions, range):
+                pattern = _level_pattern(level_mask)
+                positions = [m.start() for m in pattern.finditer(codes, positions.start, positions.stop)]
+            else:
+                positions = [p for p in positions if level_mask >> codes[p] & 1]
+        return positions
+
+
+@functools.lru_cache(maxsize=64)
+def _level_pattern(mask: int) -> "re.Pattern[bytes]":
+    """A regex matching one byte whose bit is set in *mask*."""
+    codes = [code for code in range(min(mask.bit_length(), 256)) if mask >> code & 1]
+    return re.compile(b"[" + b"".join(re.escape(bytes([code])) for code in codes) + b"]")
+
+
+_archives: "OrderedDict[str, Tuple[Tuple[int, int], Archive]]" = OrderedDict()
+_archives_lock = threading.Lock()
+
+
+def open_archive(path: str) -> Archive:
+    """Return the cached :class:`Archive` at *path*, reopened when the file changes.
+
+    Raises :class:`ValueError` for files that are not valid archives.
+    """
+    stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    with _archives_lock:
+        hit = _archives.get(path)
+        if hit is not None and hit[0] == identity:
+            _archives.move_to_end(path)
+            return hit[1]
+    try:
+        archive = Archive(path)
+    except (OSError, KeyError, TypeError, struct.error, zlib.error) as exc:
+        raise ValueError(f"Invalid log archive: {exc}") from None
+    with _archives_lock:
+        _archives[path] = (identity, archive)
+        _archives.move_to_end(path)
+        while len(_archives) > _MAX_CACHED_ARCHIVES:
+            _archives.popitem(last=False)
+    return archive
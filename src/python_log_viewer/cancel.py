@@ -0,0 +1,87 @@
+"""
+Cooperative cancellation of log scans.
+
+A :class:`CancelToken` is passed to :meth:`LogReader.read
+<python_log_viewer.core.LogReader.read>` (and ``read_merged``); the scan
+checks it between blocks and unwinds with :class:`QueryCancelled` once it
+is set.  Tokens are cancelled by
+
+* a newer request carrying the same *supersede* key (the UI sends one key
+  per browser tab, so a search typed while the previous one is still running
+  replaces it), see :func:`supersede`;
+* the ASGI integration when the client disconnects.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+
+class QueryCancelled(BaseException):
+    """Raised at a check point of a cancelled scan.
+
+    Derived from :class:`BaseException` (like :class:`asyncio.CancelledError`)
+    so the ``except Exception`` blocks that turn I/O errors into error
+    results do not swallow it.
+    """
+
+
+class CancelToken:
+    """A flag shared between a running scan and whoever may cancel it.
+
+    Parameters
+    ----------
+    event:
+        Optional event object to use instead of a new
+        :class:`threading.Event`, e.g. a ``multiprocessing`` event shared
+        with a sidecar process.
+    """
+
+    def __init__(self, event=None) -> None:
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Raise :class:`QueryCancelled` if the token has been cancelled."""
+        if self._event.is_set():
+            raise QueryCancelled()
+
+
+# ---------------------------------------------------------------------------
+# Supersede registry
+# ---------------------------------------------------------------------------
+
+_running: Dict[str, CancelToken] = {}
+_running_lock = threading.Lock()
+
+
+def supersede(key: Optional[str]) -> CancelToken:
+    """Return a token for a new request, cancelling the previous one for *key*.
+
+    Without a *key* the token is independent of every other request.
+    """
+    token = CancelToken()
+    if key:
+        with _running_lock:
+            previous = _running.get(key)
+            _running[key] = token
+        if previous is not None:
+            previous.cancel()
+    return token
+
+
+def release(key: Optional[str], token: CancelToken) -> None:
+    """Forget *token* once its request has finished."""
+    if key:
+        with _running_lock:
+            if _running.get(key) is token:
+                del _running[key]
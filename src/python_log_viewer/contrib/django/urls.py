@@ -4,6 +4,11 @@ from .views import (
     log_viewer_page,
     get_log_files,
     get_log_content,
+    get_merged_content,
+    get_log_context,
+    get_log_patterns,
+    get_log_entry,
+    get_log_metrics,
     delete_log_file,
     clear_log_file,
 )
@@ -14,6 +19,11 @@ urlpatterns = [
     # API routes must come first so the catch-all doesn't swallow them.
     path("api/files", get_log_files, name="log_viewer_files"),
     path("api/content", get_log_content, name="log_viewer_content"),
+    path("api/merged", get_merged_content, name="log_viewer_merged"),
+    path("api/context", get_log_context, name="log_viewer_context"),
+    path("api/patterns", get_log_patterns, name="log_viewer_patterns"),
+    path("api/entry", get_log_entry, name="log_viewer_entry"),
+    path("api/metrics", get_log_metrics, name="log_viewer_metrics"),
     path("api/file", delete_log_file, name="log_viewer_delete"),
     path("api/clear", clear_log_file, name="log_viewer_clear"),
     # HTML page – root and catch-all for deep-link support
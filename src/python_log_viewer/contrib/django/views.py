@@ -12,20 +12,33 @@ Settings (all optional, set in ``settings.py``)::
     LOG_VIEWER_USERNAME         = None  # set both to enable Basic Auth
     LOG_VIEWER_PASSWORD         = None
     LOG_VIEWER_SUPERUSER_ACCESS = True  # allow Django superusers without Basic Auth
+    LOG_VIEWER_PARALLEL_WORKERS = 0     # processes for whole-file search (0 = off)
+    LOG_VIEWER_SCAN_WORKER      = None  # e.g. {"processes": 2, "memory_limit": 512 * 1024**2}
+    LOG_VIEWER_QUERY_PLANNER    = None  # e.g. {"max_scan_bytes": 1024**3, "max_heavy_queries": 2}
+    LOG_VIEWER_FORMATS          = None  # e.g. {"app*.log*": "%(asctime)s %(levelname)s %(message)s"}
+    LOG_VIEWER_FEDERATION       = None  # e.g. {"peers": {"node2": "http://node2:8000/logs"}}
+
+``LOG_VIEWER_FEDERATION`` holds the keyword arguments of
+:class:`~python_log_viewer.federation.Federation` (``peers``, and optionally
+``local_name`` and ``timeout``); the views then list and read the files of
+every peer too, except for requests with ``local=1`` (those of the peers).
 """
 
 from __future__ import annotations
 
 import os
-from functools import wraps
+from functools import partial, wraps
 
 from django.conf import settings
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST, require_http_methods
 
+from python_log_viewer import stats as _stats
 from python_log_viewer.auth import check_credentials
+from python_log_viewer.cancel import release, supersede
 from python_log_viewer.core import LogDirectory, LogReader
+from python_log_viewer.params import ParameterError, int_param
 from python_log_viewer._html import render_html
 
 
@@ -36,15 +49,125 @@ _ALLOWED_DEFAULT_LINES = {0, 100, 250, 500, 1000}
 # Lazy singletons – created once, reused across requests.
 # ---------------------------------------------------------------------------
 
+_log_dir = None
+
+
 def _get_log_dir() -> LogDirectory:
-    path = getattr(settings, "LOG_VIEWER_DIR", None)
-    if path is None:
-        path = os.path.join(settings.BASE_DIR, "logs")
-    return LogDirectory(str(path))
+    # Shared by every request, so its rotation-chain cache and compiled
+    # formats are reused.
+    global _log_dir
+    if _log_dir is None:
+        path = getattr(settings, "LOG_VIEWER_DIR", None)
+        if path is None:
+            path = os.path.join(settings.BASE_DIR, "logs")
+        _log_dir = LogDirectory(str(path), formats=getattr(settings, "LOG_VIEWER_FORMATS", None))
+    return _log_dir
+
+
+_scan_worker = None
+
+
+def _get_scan_worker():
+    global _scan_worker
+    options = getattr(settings, "LOG_VIEWER_SCAN_WORKER", None)
+    if options is None:
+        return None
+    if _scan_worker is None:
+        from python_log_viewer.worker import ScanWorker
+
+        _scan_worker = ScanWorker(**(options if isinstance(options, dict) else {}))
+    return _scan_worker
+
+
+_planner = None
+
+
+def _get_planner():
+    # One planner per process: its concurrency slots must be shared by
+    # every request.
+    global _planner
+    options = getattr(settings, "LOG_VIEWER_QUERY_PLANNER", None)
+    if options is None:
+        return None
+    if _planner is None:
+        from python_log_viewer.planner import QueryPlanner
+
+        _planner = QueryPlanner(**(options if isinstance(options, dict) else {}))
+    return _planner
+
+
+_federation = None
+
+
+def _get_federation(request):
+    """The configured federation, unless a peer asks for local results."""
+    global _federation
+    options = getattr(settings, "LOG_VIEWER_FEDERATION", None)
+    if options is None or request.GET.get("local", "") in ("1", "true"):
+        return None
+    if _federation is None:
+        from python_log_viewer.federation import Federation
+
+        _federation = Federation(**options)
+    return _federation
+
+
+_reader = None
 
 
 def _get_reader() -> LogReader:
-    return LogReader(_get_log_dir())
+    global _reader
+    if _reader is None:
+        workers = getattr(settings, "LOG_VIEWER_PARALLEL_WORKERS", 0)
+        _reader = LogReader(
+            _get_log_dir(),
+            parallel_workers=int(workers or 0),
+            scan_worker=_get_scan_worker(),
+            planner=_get_planner(),
+        )
+    return _reader
+
+
+def _read_response(result: dict) -> JsonResponse:
+    """JSON-encode a reader result, honouring a planner refusal status."""
+    status = result.pop("status", 200)
+    retry_after = result.pop("retry_after", None)
+    with _stats.phase("serialize"):
+        response = JsonResponse(result, status=status)
+    if retry_after is not None:
+        response["Retry-After"] = str(retry_after)
+    return response
+
+
+def _superseding(request, method, *args, **kwargs):
+    """Call a reader method, cancelling the caller's previous query.
+
+    Requests carrying the same ``supersede`` key (one per browser tab)
+    replace each other; WSGI offers no disconnect notification.
+    """
+    key = request.GET.get("supersede", "")
+    token = supersede(key)
+    try:
+        return method(*args, cancel=token, **kwargs)
+    finally:
+        release(key, token)
+
+
+def _timed(name: str):
+    """Decorator: measure a view as request *name* and return its stats as a
+    ``Server-Timing`` header (see :mod:`python_log_viewer.stats`)."""
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            with _stats.collect(name) as stats:
+                response = view_func(request, *args, **kwargs)
+                response["Server-Timing"] = stats.server_timing()
+                return response
+
+        return _wrapped
+
+    return decorator
 
 
 def _get_default_lines() -> int:
@@ -126,34 +249,146 @@ def log_viewer_page(request, file_path=None):
 
 @_basic_auth_required
 @require_GET
+@_timed("files")
 def get_log_files(request):
     """Return a list of available log files with metadata."""
     try:
+        federation = _get_federation(request)
+        if federation is not None:
+            return _read_response(federation.list_files(_get_reader()))
         files = _get_log_dir().list_files()
-        return JsonResponse(
-            {"files": [{"name": f.name, "size": f.size, "modified": f.modified} for f in files]}
-        )
+        return _read_response({"files": [f.to_dict() for f in files]})
     except Exception as e:
         return JsonResponse({"files": [], "error": str(e)})
 
 
 @_basic_auth_required
 @require_GET
+@_timed("content")
 def get_log_content(request):
     """Return log lines from the selected file as JSON."""
     try:
-        result = _get_reader().read(
+        reader = _get_reader()
+        federation = _get_federation(request)
+        result = _superseding(
+            request,
+            partial(federation.read, reader) if federation is not None else reader.read,
             file=request.GET.get("file", "app.log"),
-            lines=int(request.GET.get("lines", str(_get_default_lines()))),
+            lines=int_param(request.GET, "lines", _get_default_lines()),
             level=request.GET.get("level", ""),
             search=request.GET.get("search", ""),
-            page=int(request.GET.get("page", "1")),
+            page=int_param(request.GET, "page", 1),
+            rotated=request.GET.get("rotated", "") in ("1", "true"),
+            since=request.GET.get("since", ""),
+            until=request.GET.get("until", ""),
+            before=request.GET.get("before", ""),
+            after=request.GET.get("after", ""),
+            estimate=request.GET.get("estimate", "") in ("1", "true"),
+            max_entry_bytes=int_param(request.GET, "max_entry_bytes", 0),
+            fields=request.GET.get("fields", ""),
+            query=request.GET.get("query", ""),
+            columns=request.GET.get("columns", ""),
+            sort=request.GET.get("sort", ""),
+            collapse=request.GET.get("collapse", ""),
         )
-        return JsonResponse(result)
+        return _read_response(result)
+    except ParameterError as e:
+        return JsonResponse({"error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"lines": [f"Error reading log file: {e}"], "total": 0})
 
 
+@_basic_auth_required
+@require_GET
+@_timed("merged")
+def get_merged_content(request):
+    """Return entries from several log files merged by timestamp."""
+    try:
+        result = _superseding(
+            request,
+            _get_reader().read_merged,
+            request.GET.get("files", ""),
+            lines=int_param(request.GET, "lines", _get_default_lines()),
+            level=request.GET.get("level", ""),
+            search=request.GET.get("search", ""),
+            page=int_param(request.GET, "page", 1),
+            after=request.GET.get("after", ""),
+            max_entry_bytes=int_param(request.GET, "max_entry_bytes", 0),
+            fields=request.GET.get("fields", ""),
+            query=request.GET.get("query", ""),
+            columns=request.GET.get("columns", ""),
+        )
+        return _read_response(result)
+    except ParameterError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"lines": [f"Error reading log file: {e}"], "sources": [], "total": 0})
+
+
+@_basic_auth_required
+@require_GET
+@_timed("context")
+def get_log_context(request):
+    """Return the entries around a byte offset of a log file."""
+    try:
+        return _read_response(_get_reader().context(
+            request.GET.get("file", "app.log"),
+            request.GET.get("offset", ""),
+            before=int_param(request.GET, "before", 10),
+            after=int_param(request.GET, "after", 10),
+            max_entry_bytes=int_param(request.GET, "max_entry_bytes", 0),
+        ))
+    except ParameterError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"lines": [f"Error reading log file: {e}"], "offsets": [], "target": 0})
+
+
+@_basic_auth_required
+@require_GET
+@_timed("patterns")
+def get_log_patterns(request):
+    """Return the most frequent message templates of a log file as JSON."""
+    try:
+        result = _superseding(
+            request,
+            _get_reader().patterns,
+            request.GET.get("file", "app.log"),
+            top=int_param(request.GET, "top", 20),
+            level=request.GET.get("level", ""),
+        )
+        return _read_response(result)
+    except ParameterError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"patterns": [], "error": f"Error reading log file: {e}"})
+
+
+@_basic_auth_required
+@require_GET
+@_timed("entry")
+def get_log_entry(request):
+    """Stream one whole log entry, optionally with its JSON pretty-printed."""
+    try:
+        result = _get_reader().entry(
+            request.GET.get("file", "app.log"),
+            request.GET.get("offset", ""),
+            pretty=request.GET.get("format", "") == "json",
+        )
+        if "error" in result:
+            return _read_response(result)
+        return StreamingHttpResponse(result["chunks"], content_type="text/plain; charset=utf-8")
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@_basic_auth_required
+@require_GET
+def get_log_metrics(request):
+    """Return the request metrics in the Prometheus text format."""
+    return HttpResponse(_stats.render_metrics(), content_type=_stats.METRICS_CONTENT_TYPE)
+
+
 @csrf_exempt
 @_basic_auth_required
 @require_http_methods(["DELETE"])
@@ -17,11 +17,13 @@ Usage::
     )
 """
 
-from __future__ import annotations
-
+import asyncio
 import os
+from functools import partial
 from typing import Optional
 
+from python_log_viewer import cancel as _cancel
+from python_log_viewer import stats as _stats
 from python_log_viewer.core import LogDirectory, LogReader
 from python_log_viewer._html import render_html
 
@@ -46,6 +48,11 @@ def create_log_viewer_router(
     auto_scroll: bool = True,
     colorize: bool = True,
     default_lines: int = 100,
+    parallel_workers: int = 0,
+    scan_worker=None,
+    planner=None,
+    formats=None,
+    federation=None,
 ):
     """Create and return a FastAPI :class:`~fastapi.APIRouter`.
 
@@ -59,17 +66,35 @@ def create_log_viewer_router(
         Enable HTTP Basic Auth when both are provided.
     auto_refresh / refresh_timer / auto_scroll / colorize / default_lines:
         UI defaults.
+    parallel_workers:
+        Worker processes used to search whole large files (0 disables).
+    scan_worker:
+        Optional :class:`~python_log_viewer.worker.ScanWorker` that runs
+        heavy reads in isolated sidecar processes.
+    planner:
+        Optional :class:`~python_log_viewer.planner.QueryPlanner`; refused
+        queries are answered with HTTP 429 or 503.
+    formats:
+        Optional ``{file glob: format}`` for field extraction from
+        plain-text logs; see :mod:`python_log_viewer.formats`.
+    federation:
+        Optional :class:`~python_log_viewer.federation.Federation`; file
+        lists and content then cover the peer viewers too (peers query each
+        other with ``local=1``).
     """
     from fastapi import APIRouter, Depends, HTTPException, Query, Request
-    from fastapi.responses import HTMLResponse, JSONResponse
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
     from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
     from python_log_viewer.auth import check_credentials as _check
 
     import secrets as _secrets
 
-    directory = LogDirectory(log_dir)
-    reader = LogReader(directory)
+    directory = LogDirectory(log_dir, formats=formats)
+    reader = LogReader(
+        directory, parallel_workers=parallel_workers, scan_worker=scan_worker, planner=planner
+    )
     router = APIRouter(prefix=prefix, tags=["python-log-viewer"])
     default_lines = _normalize_default_lines(default_lines)
 
@@ -95,6 +120,51 @@ def create_log_viewer_router(
                     headers={"WWW-Authenticate": 'Basic realm="Log Viewer"'},
                 )
 
+    # ---- responses ------------------------------------------------------
+
+    def _read_response(result: dict):
+        """Return a reader result, honouring a planner refusal status."""
+        if "status" not in result:
+            return result
+        status = result.pop("status")
+        headers = {}
+        if "retry_after" in result:
+            headers["Retry-After"] = str(result.pop("retry_after"))
+        return JSONResponse(result, status_code=status, headers=headers)
+
+    def _timed_response(stats, result):
+        """Encode *result* in the ``serialize`` phase and attach the request's
+        stats as a ``Server-Timing`` header (see :mod:`python_log_viewer.stats`).
+        """
+        with _stats.phase("serialize"):
+            response = _read_response(result) if isinstance(result, dict) else result
+            if not isinstance(response, Response):
+                response = JSONResponse(response)
+        response.headers["Server-Timing"] = stats.server_timing()
+        return response
+
+    async def _cancellable(request: Request, key: str, method, *args, **kwargs):
+        """Run a blocking reader method off the event loop.
+
+        The scan is cancelled when the client disconnects or a newer request
+        arrives with the same ``supersede`` key (one per browser tab).
+        """
+        token = _cancel.supersede(key)
+
+        async def watch_disconnect():
+            while not token.cancelled:
+                if await request.is_disconnected():
+                    token.cancel()
+                    return
+                await asyncio.sleep(0.25)
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            return await run_in_threadpool(_stats.propagate(method), *args, cancel=token, **kwargs)
+        finally:
+            watcher.cancel()
+            _cancel.release(key, token)
+
     # ---- routes ---------------------------------------------------------
 
     _html_page = render_html(
@@ -111,19 +181,127 @@ def create_log_viewer_router(
         return _html_page
 
     @router.get("/api/files", dependencies=[Depends(_verify)])
-    async def api_files():
-        files = directory.list_files()
-        return {"files": [{"name": f.name, "size": f.size, "modified": f.modified} for f in files]}
+    async def api_files(local: bool = Query(False)):
+        with _stats.collect("files") as stats:
+            if federation is not None and not local:
+                result = await run_in_threadpool(_stats.propagate(federation.list_files), reader)
+                return _timed_response(stats, result)
+            files = directory.list_files()
+            return _timed_response(stats, {"files": [f.to_dict() for f in files]})
 
     @router.get("/api/content", dependencies=[Depends(_verify)])
     async def api_content(
+        request: Request,
         file: str = Query("app.log"),
         lines: int = Query(default_lines),
         level: str = Query(""),
         search: str = Query(""),
         page: int = Query(1),
+        rotated: bool = Query(False),
+        since: str = Query(""),
+        until: str = Query(""),
+        before: str = Query(""),
+        after: str = Query(""),
+        estimate: bool = Query(False),
+        max_entry_bytes: int = Query(0),
+        fields: str = Query(""),
+        query: str = Query(""),
+        columns: str = Query(""),
+        sort: str = Query(""),
+        collapse: str = Query(""),
+        supersede: str = Query(""),
+        local: bool = Query(False),
+    ):
+        with _stats.collect("content") as stats:
+            result = await _cancellable(
+                request,
+                supersede,
+                partial(federation.read, reader) if federation is not None and not local else reader.read,
+                file=file,
+                lines=lines,
+                level=level,
+                search=search,
+                page=page,
+                rotated=rotated,
+                since=since,
+                until=until,
+                before=before,
+                after=after,
+                estimate=estimate,
+                max_entry_bytes=max_entry_bytes,
+                fields=fields,
+                columns=columns,
+                query=query,
+                sort=sort,
+                collapse=collapse,
+            )
+            return _timed_response(stats, result)
+
+    @router.get("/api/merged", dependencies=[Depends(_verify)])
+    async def api_merged(
+        request: Request,
+        files: str = Query(""),
+        lines: int = Query(default_lines),
+        level: str = Query(""),
+        search: str = Query(""),
+        page: int = Query(1),
+        after: str = Query(""),
+        max_entry_bytes: int = Query(0),
+        fields: str = Query(""),
+        query: str = Query(""),
+        columns: str = Query(""),
+        supersede: str = Query(""),
     ):
-        return reader.read(file=file, lines=lines, level=level, search=search, page=page)
+        with _stats.collect("merged") as stats:
+            result = await _cancellable(
+                request, supersede, reader.read_merged,
+                files, lines=lines, level=level, search=search, page=page, after=after,
+                max_entry_bytes=max_entry_bytes, fields=fields, columns=columns, query=query,
+            )
+            return _timed_response(stats, result)
+
+    @router.get("/api/context", dependencies=[Depends(_verify)])
+    async def api_context(
+        file: str = Query("app.log"),
+        offset: str = Query(""),
+        before: int = Query(10),
+        after: int = Query(10),
+        max_entry_bytes: int = Query(0),
+    ):
+        with _stats.collect("context") as stats:
+            result = await run_in_threadpool(
+                _stats.propagate(reader.context),
+                file, offset, before=before, after=after, max_entry_bytes=max_entry_bytes,
+            )
+            return _timed_response(stats, result)
+
+    @router.get("/api/patterns", dependencies=[Depends(_verify)])
+    async def api_patterns(
+        request: Request,
+        file: str = Query("app.log"),
+        top: int = Query(20),
+        level: str = Query(""),
+        supersede: str = Query(""),
+    ):
+        with _stats.collect("patterns") as stats:
+            result = await _cancellable(request, supersede, reader.patterns, file, top=top, level=level)
+            return _timed_response(stats, result)
+
+    @router.get("/api/entry", dependencies=[Depends(_verify)])
+    async def api_entry(
+        file: str = Query("app.log"),
+        offset: str = Query(""),
+        format: str = Query("raw"),
+    ):
+        with _stats.collect("entry") as stats:
+            result = await run_in_threadpool(_stats.propagate(reader.entry), file, offset, pretty=format == "json")
+            if "error" not in result:
+                result = StreamingResponse(result["chunks"], media_type="text/plain; charset=utf-8")
+            return _timed_response(stats, result)
+
+    @router.get("/api/metrics", response_class=PlainTextResponse, dependencies=[Depends(_verify)])
+    async def api_metrics():
+        return PlainTextResponse(_stats.render_metrics(), media_type=_stats.METRICS_CONTENT_TYPE)
 
     @router.delete("/api/file", dependencies=[Depends(_verify)])
     async def api_delete(file: str = Query("")):
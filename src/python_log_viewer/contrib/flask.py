@@ -20,10 +20,13 @@ Usage::
 from __future__ import annotations
 
 import os
-from functools import wraps
+from functools import partial, wraps
 from typing import Optional
 
+from python_log_viewer import stats as _stats
+from python_log_viewer.cancel import release, supersede
 from python_log_viewer.core import LogDirectory, LogReader
+from python_log_viewer.params import ParameterError, int_param
 from python_log_viewer._html import render_html
 
 _ALLOWED_DEFAULT_LINES = {0, 100, 250, 500, 1000}
@@ -47,6 +50,11 @@ def create_log_viewer_blueprint(
     auto_scroll: bool = True,
     colorize: bool = True,
     default_lines: int = 100,
+    parallel_workers: int = 0,
+    scan_worker=None,
+    planner=None,
+    formats=None,
+    federation=None,
 ):
     """Create and return a Flask :class:`~flask.Blueprint` for the log viewer.
 
@@ -60,13 +68,29 @@ def create_log_viewer_blueprint(
         Enable HTTP Basic Auth when both are provided.
     auto_refresh / refresh_timer / auto_scroll / colorize / default_lines:
         UI defaults.
+    parallel_workers:
+        Worker processes used to search whole large files (0 disables).
+    scan_worker:
+        Optional :class:`~python_log_viewer.worker.ScanWorker` that runs
+        heavy reads in isolated sidecar processes.
+    planner:
+        Optional :class:`~python_log_viewer.planner.QueryPlanner`; refused
+        queries are answered with HTTP 429 or 503.
+    formats:
+        Optional ``{file glob: format}`` for field extraction from
+        plain-text logs; see :mod:`python_log_viewer.formats`.
+    federation:
+        Optional :class:`~python_log_viewer.federation.Federation`; file
+        lists and content then cover the peer viewers too.
     """
-    from flask import Blueprint, jsonify, request, Response
+    from flask import Blueprint, jsonify, make_response, request, Response
 
     from python_log_viewer.auth import check_credentials
 
-    directory = LogDirectory(log_dir)
-    reader = LogReader(directory)
+    directory = LogDirectory(log_dir, formats=formats)
+    reader = LogReader(
+        directory, parallel_workers=parallel_workers, scan_worker=scan_worker, planner=planner
+    )
     bp = Blueprint("log_viewer", __name__, url_prefix=url_prefix)
     default_lines = _normalize_default_lines(default_lines)
 
@@ -86,6 +110,55 @@ def create_log_viewer_blueprint(
             return fn(*args, **kwargs)
         return wrapper
 
+    # ---- responses ------------------------------------------------------
+
+    def _read_response(result: dict):
+        """Return a reader result, honouring a planner refusal status."""
+        status = result.pop("status", 200)
+        headers = {}
+        if "retry_after" in result:
+            headers["Retry-After"] = str(result.pop("retry_after"))
+        return result, status, headers
+
+    @bp.errorhandler(ParameterError)
+    def _bad_parameter(exc):
+        return jsonify({"error": str(exc)}), 400
+
+    def _timed(name: str):
+        """Measure a view as request *name* (see :mod:`python_log_viewer.stats`).
+
+        The view's return value is encoded in the ``serialize`` phase and the
+        stats are sent back as a ``Server-Timing`` header.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _stats.collect(name) as stats:
+                    rv = fn(*args, **kwargs)
+                    with _stats.phase("serialize"):
+                        response = make_response(rv)
+                    response.headers["Server-Timing"] = stats.server_timing()
+                    return response
+            return wrapper
+        return decorator
+
+    def _federated() -> bool:
+        # peers query each other with local=1
+        return federation is not None and request.args.get("local", "") not in ("1", "true")
+
+    def _superseding(method, *args, **kwargs):
+        """Call a reader method, cancelling the caller's previous query.
+
+        Requests carrying the same ``supersede`` key (one per browser tab)
+        replace each other; WSGI offers no disconnect notification.
+        """
+        key = request.args.get("supersede", "")
+        token = supersede(key)
+        try:
+            return method(*args, cancel=token, **kwargs)
+        finally:
+            release(key, token)
+
     # ---- routes ---------------------------------------------------------
 
     _html_page = render_html(
@@ -104,21 +177,99 @@ def create_log_viewer_blueprint(
 
     @bp.route("/api/files", methods=["GET"])
     @_auth_required
+    @_timed("files")
     def api_files():
+        if _federated():
+            return federation.list_files(reader)
         files = directory.list_files()
-        return jsonify({"files": [{"name": f.name, "size": f.size, "modified": f.modified} for f in files]})
+        return {"files": [f.to_dict() for f in files]}
 
     @bp.route("/api/content", methods=["GET"])
     @_auth_required
+    @_timed("content")
     def api_content():
-        result = reader.read(
+        result = _superseding(
+            partial(federation.read, reader) if _federated() else reader.read,
             file=request.args.get("file", "app.log"),
-            lines=int(request.args.get("lines", str(default_lines))),
+            lines=int_param(request.args, "lines", default_lines),
+            level=request.args.get("level", ""),
+            search=request.args.get("search", ""),
+            page=int_param(request.args, "page", 1),
+            rotated=request.args.get("rotated", "") in ("1", "true"),
+            since=request.args.get("since", ""),
+            until=request.args.get("until", ""),
+            before=request.args.get("before", ""),
+            after=request.args.get("after", ""),
+            estimate=request.args.get("estimate", "") in ("1", "true"),
+            max_entry_bytes=int_param(request.args, "max_entry_bytes", 0),
+            fields=request.args.get("fields", ""),
+            query=request.args.get("query", ""),
+            columns=request.args.get("columns", ""),
+            sort=request.args.get("sort", ""),
+            collapse=request.args.get("collapse", ""),
+        )
+        return _read_response(result)
+
+    @bp.route("/api/merged", methods=["GET"])
+    @_auth_required
+    @_timed("merged")
+    def api_merged():
+        result = _superseding(
+            reader.read_merged,
+            request.args.get("files", ""),
+            lines=int_param(request.args, "lines", default_lines),
             level=request.args.get("level", ""),
             search=request.args.get("search", ""),
-            page=int(request.args.get("page", "1")),
+            page=int_param(request.args, "page", 1),
+            after=request.args.get("after", ""),
+            max_entry_bytes=int_param(request.args, "max_entry_bytes", 0),
+            fields=request.args.get("fields", ""),
+            query=request.args.get("query", ""),
+            columns=request.args.get("columns", ""),
+        )
+        return _read_response(result)
+
+    @bp.route("/api/context", methods=["GET"])
+    @_auth_required
+    @_timed("context")
+    def api_context():
+        return reader.context(
+            request.args.get("file", "app.log"),
+            request.args.get("offset", ""),
+            before=int_param(request.args, "before", 10),
+            after=int_param(request.args, "after", 10),
+            max_entry_bytes=int_param(request.args, "max_entry_bytes", 0),
         )
-        return jsonify(result)
+
+    @bp.route("/api/patterns", methods=["GET"])
+    @_auth_required
+    @_timed("patterns")
+    def api_patterns():
+        result = _superseding(
+            reader.patterns,
+            request.args.get("file", "app.log"),
+            top=int_param(request.args, "top", 20),
+            level=request.args.get("level", ""),
+        )
+        return _read_response(result)
+
+    @bp.route("/api/entry", methods=["GET"])
+    @_auth_required
+    @_timed("entry")
+    def api_entry():
+        result = reader.entry(
+            request.args.get("file", "app.log"),
+            request.args.get("offset", ""),
+            pretty=request.args.get("format", "") == "json",
+        )
+        if "error" in result:
+            return _read_response(result)
+        return Response(result["chunks"], content_type="text/plain; charset=utf-8")
+
+    @bp.route("/api/metrics", methods=["GET"])
+    @_auth_required
+    def api_metrics():
+        return Response(_stats.render_metrics(), content_type=_stats.METRICS_CONTENT_TYPE)
 
     @bp.route("/api/file", methods=["DELETE"])
     @_auth_required
@@ -6,9 +6,69 @@ No external dependencies – only the Python standard library.
 
 from __future__ import annotations
 
+import bisect
+import heapq
+import itertools
+import json
+import operator
 import os
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.archive import Archive, is_archive, open_archive
+from python_log_viewer.cancel import QueryCancelled
+from python_log_viewer.formats import LogFormats
+from python_log_viewer.handlers import (
+    CREATED,
+    INDEX_SUFFIX,
+    LEVEL,
+    MESSAGE,
+    SEQ,
+    TEXT,
+    LogIndex,
+    RingBufferHandler,
+    index_path,
+    live_source,
+    live_sources,
+    open_index,
+    record_fields,
+)
+from python_log_viewer.parallel import default_workers, parallel_search
+from python_log_viewer.patterns import pattern_index
+from python_log_viewer.query import Query, compile_query
+from python_log_viewer.repeats import collapse_runs, describe_runs, repeat_key
+from python_log_viewer.rotation import (
+    DEFAULT_ROTATION_PATTERNS,
+    compile_rotation_patterns,
+    group_rotations,
+    seek_time,
+    segment_info,
+)
+from python_log_viewer.sources import (
+    BufferSource,
+    detect_compression,
+    open_source,
+    read_cost,
+    uncompressed_size,
+)
+from python_log_viewer.structured import (
+    MISSING,
+    FieldFilter,
+    Parser,
+    field_index,
+    filter_fields,
+    has_level,
+    json_lines,
+    match_fields,
+    parse_columns,
+    parse_field_filters,
+    parse_record,
+    record_values,
+    sort_entries,
+)
+from python_log_viewer.timestamps import parse_time_bound, parse_timestamp
+from python_log_viewer.zonemap import ZoneFilter, zone_filter
 
 
 @dataclass
@@ -16,8 +76,31 @@ class LogFileInfo:
     """Metadata for a single log file."""
 
     name: str  # relative path from the log directory
-    size: int
+    size: int  # bytes on disk
     modified: float
+    compression: Optional[str] = None  # "gzip", "bz2", "xz" or None
+    uncompressed_size: Optional[int] = None  # None when unknown or uncompressed
+    rotated: List[str] = field(default_factory=list)  # rotated siblings, newest first
+    has_format: bool = False  # a field-extraction format applies (see LogDirectory)
+    live: bool = False  # an in-process ring buffer (see python_log_viewer.handlers)
+    archive: bool = False  # a columnar archive (see python_log_viewer.archive)
+
+    def to_dict(self) -> dict:
+        """Return the JSON-serialisable form used by the HTTP integrations."""
+        data = {"name": self.name, "size": self.size, "modified": self.modified}
+        if self.compression:
+            data["compression"] = self.compression
+            data["uncompressed_size"] = self.uncompressed_size
+        if self.rotated:
+            data["rotated"] = self.rotated
+        if self.has_format:
+            data["format"] = True
+        if self.live:
+            data["live"] = True
+        if self.archive:
+            data["archive"] = True
+            data["uncompressed_size"] = self.uncompressed_size
+        return data
 
 
 class LogDirectory:
@@ -27,37 +110,162 @@ class LogDirectory:
     ----------
     path:
         Absolute or relative path to the root log directory.
+    rotation_patterns:
+        Regular expressions matching the suffix a rotation scheme appends to
+        a live file's name (see
+        :data:`~python_log_viewer.rotation.DEFAULT_ROTATION_PATTERNS`).  Pass
+        an empty sequence to disable rotation grouping.
+    formats:
+        Optional ``{file glob: format}`` (or a
+        :class:`~python_log_viewer.formats.LogFormats`) splitting the entries
+        of matching plain-text files into named fields, for field filters,
+        sorting and columns; see :mod:`python_log_viewer.formats`.
+    live:
+        List the in-process ring buffers of
+        :class:`~python_log_viewer.handlers.RingBufferHandler` as virtual
+        files, read from memory by :class:`LogReader`.
     """
 
-    def __init__(self, path: str) -> None:
+    def __init__(
+        self,
+        path: str,
+        rotation_patterns: Optional[Sequence[str]] = None,
+        formats: Union[LogFormats, Dict[str, object], None] = None,
+        live: bool = True,
+    ) -> None:
         self.path = os.path.abspath(path)
+        self.live = live
+        self.formats = formats if isinstance(formats, LogFormats) else LogFormats(formats)
+        if rotation_patterns is None:
+            rotation_patterns = DEFAULT_ROTATION_PATTERNS
+        self.rotation_patterns = tuple(rotation_patterns)
+        self._rotation_re = (
+            compile_rotation_patterns(self.rotation_patterns) if self.rotation_patterns else None
+        )
+        # dirpath -> (directory mtime_ns, {live name: [rotated names]})
+        self._rotation_cache: Dict[str, Tuple[int, Dict[str, List[str]]]] = {}
 
     # ------------------------------------------------------------------
     # Listing
     # ------------------------------------------------------------------
 
+    @_stats.collected("list_files")
     def list_files(self) -> List[LogFileInfo]:
-        """Walk *self.path* and return metadata for every regular file."""
+        """Walk *self.path* and return metadata for every regular file.
+
+        The registered ring buffers (see *live*) are listed as well, hiding
+        files of the same name.  Archives are listed with the size of the
+        text they hold as ``uncompressed_size``; sidecar index files are
+        not listed.
+        """
+        live = live_sources() if self.live else {}
+        files: list[LogFileInfo] = [
+            LogFileInfo(
+                name=name,
+                size=handler.size,
+                modified=handler.modified,
+                has_format=self.formats.parser_for(name) is not None,
+                live=True,
+            )
+            for name, handler in live.items()
+        ]
         if not os.path.isdir(self.path):
-            return []
+            return files
 
-        files: list[LogFileInfo] = []
         for root, _dirs, filenames in os.walk(self.path):
+            rotations = self._rotation_groups(root, filenames)
             for entry in sorted(filenames):
+                if entry.endswith(INDEX_SUFFIX):
+                    continue
                 filepath = os.path.join(root, entry)
                 if os.path.isfile(filepath):
                     rel = os.path.relpath(filepath, self.path)
+                    if rel in live:
+                        continue
                     stat = os.stat(filepath)
+                    if is_archive(entry):
+                        files.append(self._archive_info(rel, filepath, stat))
+                        continue
+                    compression = detect_compression(entry)
                     files.append(
-                        LogFileInfo(name=rel, size=stat.st_size, modified=stat.st_mtime)
+                        LogFileInfo(
+                            name=rel,
+                            size=stat.st_size,
+                            modified=stat.st_mtime,
+                            compression=compression,
+                            uncompressed_size=uncompressed_size(filepath) if compression else None,
+                            rotated=[
+                                os.path.relpath(os.path.join(root, sibling), self.path)
+                                for sibling in rotations.get(entry, ())
+                            ],
+                            has_format=self.formats.parser_for(rel) is not None,
+                        )
                     )
         files.sort(key=lambda f: f.name)
         return files
 
+    def _archive_info(self, rel: str, filepath: str, stat: os.stat_result) -> LogFileInfo:
+        try:
+            source_bytes = open_archive(filepath).source_bytes
+        except ValueError:
+            source_bytes = None
+        return LogFileInfo(
+            name=rel, size=stat.st_size, modified=stat.st_mtime,
+            uncompressed_size=source_bytes, archive=True,
+        )
+
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
+
+    def _rotation_groups(
+        self, dirpath: str, filenames: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[str]]:
+        """Return ``{live name: [rotated names]}`` for one directory.
+
+        The grouping is cached until the directory's mtime changes, which
+        happens whenever a file is created, renamed or removed in it.
+        """
+        if self._rotation_re is None:
+            return {}
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._rotation_cache.get(dirpath)
+        _stats.cache("rotation", cached is not None and cached[0] == mtime)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        if filenames is None:
+            filenames = os.listdir(dirpath)
+        groups = group_rotations(dirpath, filenames, self._rotation_re)
+        self._rotation_cache[dirpath] = (mtime, groups)
+        return groups
+
+    def _rotation_chain(self, resolved: str) -> List[str]:
+        """Return absolute paths of *resolved* and its rotated siblings, newest first."""
+        dirpath, name = os.path.split(resolved)
+        siblings = self._rotation_groups(dirpath).get(name, [])
+        return [resolved] + [os.path.join(dirpath, sibling) for sibling in siblings]
+
+    def rotation_chain(self, relative: str) -> List[str]:
+        """Return *relative* followed by its rotated siblings, newest first.
+
+        Returns an empty list when the path escapes the log directory.
+        """
+        resolved = self._safe_resolve(relative)
+        if resolved is None:
+            return []
+        return [os.path.relpath(path, self.path) for path in self._rotation_chain(resolved)]
+
     # ------------------------------------------------------------------
     # Safe path resolution
     # ------------------------------------------------------------------
 
+    def _live_source(self, relative: str) -> Optional[RingBufferHandler]:
+        """Return the ring buffer listed as *relative*, if any."""
+        return live_source(relative) if self.live else None
+
     def _safe_resolve(self, relative: str) -> Optional[str]:
         """Return the absolute path if *relative* stays inside *self.path*.
 
@@ -78,21 +286,43 @@ class LogDirectory:
     # ------------------------------------------------------------------
 
     def delete_file(self, relative: str) -> bool:
-        """Permanently remove a log file. Returns *True* on success."""
+        """Permanently remove a log file. Returns *True* on success.
+
+        Ring buffers cannot be deleted, only cleared.
+        """
+        if self._live_source(relative) is not None:
+            return False
         resolved = self._safe_resolve(relative)
         if resolved is None:
             return False
         os.remove(resolved)
+        self._remove_index(resolved)
         return True
 
     def clear_file(self, relative: str) -> bool:
-        """Truncate a log file to zero bytes. Returns *True* on success."""
+        """Truncate a log file to zero bytes. Returns *True* on success.
+
+        Archives cannot be cleared, only deleted.
+        """
+        live = self._live_source(relative)
+        if live is not None:
+            live.clear()
+            return True
         resolved = self._safe_resolve(relative)
-        if resolved is None:
+        if resolved is None or is_archive(resolved):
             return False
         open(resolved, "w", encoding="utf-8").close()
+        self._remove_index(resolved)
         return True
 
+    @staticmethod
+    def _remove_index(resolved: str) -> None:
+        """Remove the sidecar index of a deleted or truncated log, if any."""
+        try:
+            os.remove(index_path(resolved))
+        except OSError:
+            pass
+
 
 class LogReader:
     """Read and filter log entries from a file inside a :class:`LogDirectory`.
@@ -101,22 +331,49 @@ class LogReader:
     ----------
     log_dir:
         A :class:`LogDirectory` instance.
+    parallel_workers:
+        When greater than zero, filtered reads of large uncompressed files
+        search the *whole* file (not just the tail window) across this many
+        worker processes; see :mod:`python_log_viewer.parallel`.
+    scan_worker:
+        Optional :class:`~python_log_viewer.worker.ScanWorker`.  Heavy
+        requests (``lines=0`` or any level/search filter) are then executed
+        in its sidecar processes instead of the host process.
+    planner:
+        Optional :class:`~python_log_viewer.planner.QueryPlanner`.  Each
+        request's scan size is estimated up-front; requests over its budget
+        are rejected or bounded, and heavy ones must get a concurrency slot.
     """
 
     _LEVEL_KEYWORDS = frozenset({"INFO", "WARNING", "ERROR", "DEBUG", "CRITICAL"})
     _MAX_READ_BYTES = 5 * 1024 * 1024  # 5 MB
     _TAIL_BYTES_PER_REQUESTED_LINE = 500
+    _BLOCK_BYTES = 64 * 1024
+    _PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+    _CANCEL_CHECK_BYTES = 4 * 1024 * 1024
+    _MAX_CONTEXT_ENTRIES = 1000
 
-    def __init__(self, log_dir: LogDirectory) -> None:
+    def __init__(
+        self, log_dir: LogDirectory, parallel_workers: int = 0, scan_worker=None, planner=None
+    ) -> None:
         self.log_dir = log_dir
+        self.parallel_workers = parallel_workers
+        self.scan_worker = scan_worker
+        self.planner = planner
 
     @classmethod
-    def _is_new_entry_start(cls, line: str) -> bool:
-        """Return True when *line* looks like a new log entry prefix."""
+    def _is_new_entry_start(cls, line: str, json_lines: bool = False) -> bool:
+        """Return True when *line* looks like a new log entry prefix.
+
+        A line starting with ``{`` begins an entry only in a JSON-lines file
+        (*json_lines*); elsewhere it is a dict or payload inside an entry.
+        """
         if not line:
             return False
         if line[0].isdigit():
             return True
+        if line[0] == "{":
+            return json_lines
         token = line.split()[0]
         if token in cls._LEVEL_KEYWORDS:
             return True
@@ -124,28 +381,633 @@ class LogReader:
             return token[1:-1] in cls._LEVEL_KEYWORDS
         return False
 
+    @staticmethod
+    def _json_lines(sources: Iterable[object]) -> bool:
+        """Return whether *sources*, the segments of one log, are JSON-lines.
+
+        The first segment that is not empty tells.
+        """
+        for source in sources:
+            detected = json_lines(source)
+            if detected is not None:
+                return detected
+        return False
+
+    @classmethod
+    def _entry_start(cls, sources: Iterable[object]) -> Callable[[str], bool]:
+        """Return the entry-start test for *sources*, the segments of one log."""
+        return cls._is_new_json_entry_start if cls._json_lines(sources) else cls._is_new_entry_start
+
+    @classmethod
+    def _is_new_json_entry_start(cls, line: str) -> bool:
+        """:meth:`_is_new_entry_start` for a JSON-lines file."""
+        return cls._is_new_entry_start(line, True)
+
     # ------------------------------------------------------------------
     # Efficient file reading
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _read_tail(filepath: str, max_bytes: int) -> list:
-        """Read the tail of a file, optimised for large files.
+    def _spans(
+        paths: List[str], since: Optional[float], until: Optional[float]
+    ) -> Iterator[Tuple[object, int, int]]:
+        """Yield ``(source, start, end)`` byte ranges for *paths*, newest first.
+
+        Without a time range every segment is yielded whole.  With one,
+        segments entirely outside ``[since, until]`` are skipped using their
+        cached first/last timestamps, and seekable segments are narrowed by
+        bisecting on entry timestamps instead of being scanned.
+        """
+        for path in paths:
+            source = open_source(path)
+            if since is None and until is None:
+                yield source, 0, source.size
+                continue
+            info = segment_info(path)
+            if until is not None and info.first_ts is not None and info.first_ts > until:
+                continue
+            if since is not None and info.last_ts is not None and info.last_ts < since:
+                return  # every remaining segment is older still
+            start, end = 0, info.size
+            if source.seekable:
+                if until is not None and (info.last_ts is None or info.last_ts > until):
+                    end = seek_time(source, until + 1e-6, 0, end)
+                if since is not None and (info.first_ts is None or info.first_ts < since):
+                    start = seek_time(source, since, 0, end)
+            yield source, start, end
+
+    @classmethod
+    def _read_range(cls, source, start: int, end: int, cancel=None) -> bytes:
+        """Read ``[start, end)`` of *source*, checking *cancel* between blocks."""
+        if cancel is None or end - start <= cls._CANCEL_CHECK_BYTES or not source.seekable:
+            # Chunking a stream-only source would re-decompress it per chunk.
+            if cancel is not None:
+                cancel.check()
+            return source.read(start, end)
+        parts = []
+        for pos in range(start, end, cls._CANCEL_CHECK_BYTES):
+            cancel.check()
+            parts.append(source.read(pos, min(end, pos + cls._CANCEL_CHECK_BYTES)))
+        return b"".join(parts)
+
+    @classmethod
+    def _read_tail(
+        cls,
+        spans: Iterable[Tuple[object, int, int]],
+        max_bytes: int,
+        cancel=None,
+        zones: Optional[ZoneFilter] = None,
+    ) -> Tuple[list, list, list, bool]:
+        """Read the tail of a chain of byte ranges, optimised for large files.
+
+        *spans* are consumed newest first until *max_bytes* have been read
+        (``0`` reads everything); the first (potentially partial) line at the
+        window boundary is discarded.  Compressed files are decompressed
+        transparently.  With *zones*, the zones of the window that cannot
+        hold a match are left out (they still count towards *max_bytes*, so
+        the window is the same).  Returns ``(lines, parts, segments,
+        exhausted)`` where *lines* are in file order, *parts* and
+        *segments* locate them (see :meth:`_line_positions`) and
+        *exhausted* tells whether the window reached the start of the
+        oldest span.  *cancel* is checked between blocks.
+        """
+        chunks: List[Tuple[object, list, list]] = []
+        remaining = max_bytes
+        exhausted = True
+        if zones is not None:
+            zones.lines_skipped = 0
+        for source, start, end in spans:
+            if max_bytes > 0 and remaining <= 0:
+                exhausted = False
+                break
+            cut = max_bytes > 0 and end - start > remaining
+            low = end - remaining if cut else start
+            ranges = zones.ranges(source, low, end) if zones is not None else [(low, end)]
+            parts = [(lo, cls._read_range(source, lo, hi, cancel)) for lo, hi in ranges]
+            parts.reverse()
+            if cut:
+                exhausted = False
+                if parts and parts[0][0] == low:
+                    # discard partial line at boundary
+                    data = parts[0][1]
+                    newline = data.find(b"\n")
+                    parts[0] = (low + newline + 1, data[newline + 1:]) if newline != -1 else (end, b"")
+            remaining -= end - start
+            chunk: list = []
+            located: list = []  # (first line index in chunk, start, end, byte lengths or None)
+            for lo, data in parts:
+                # Split on "\n" only, like a file read line by line:
+                # str.splitlines() would also break at form feeds and Unicode
+                # line separators.  (A newline byte never occurs inside a
+                # multi-byte UTF-8 sequence, so splitting after decoding is
+                # the same as splitting the bytes.)  Zones end at line starts.
+                part = data.decode("utf-8", errors="replace").split("\n")
+                if part[-1] == "":
+                    part.pop()
+                # Characters are bytes in ASCII text; otherwise keep the byte lengths.
+                lengths = None if data.isascii() else list(map(len, data.split(b"\n")))[:len(part)]
+                located.append((len(chunk), lo, lo + len(data) + (not data.endswith(b"\n")), lengths))
+                chunk.extend(part)
+            chunks.append((source, chunk, located))
+            if not exhausted:
+                break
+        raw_lines: list = []
+        line_parts: list = []
+        segments: list = []
+        for source, chunk, located in reversed(chunks):
+            segments.append((len(raw_lines), source))
+            line_parts.extend((len(raw_lines) + first, *rest) for first, *rest in located)
+            raw_lines.extend(chunk)
+        _stats.add("lines_scanned", len(raw_lines))
+        return raw_lines, line_parts, segments, exhausted
+
+    @staticmethod
+    def _filter_time(
+        entries: Iterable[Tuple[int, str]], since: Optional[float], until: Optional[float]
+    ) -> Iterator[Tuple[int, str]]:
+        """Yield the ``(start, entry)`` pairs stamped within ``[since, until]``.
+
+        Entries without a timestamp inherit the previous entry's; entries
+        before the first timestamp in the window are kept.
+        """
+        ts: Optional[float] = None
+        for pair in entries:
+            entry_ts = parse_timestamp(pair[1])
+            if entry_ts is not None:
+                ts = entry_ts
+            if ts is None or (
+                (since is None or ts >= since) and (until is None or ts <= until)
+            ):
+                yield pair
+
+    def _iter_backward(
+        self, source, start: int, end: int, cancel=None, is_start: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """Yield ``(offset, entry)`` for the entries in ``[start, end)``, newest first.
+
+        Blocks are read from *end* towards *start* only as the caller
+        consumes entries, so taking the newest *n* entries costs roughly
+        *n* entries of I/O.  Multi-line entries are grouped exactly as
+        :meth:`read` groups them (with *is_start*, by default the test for
+        *source*); *start* must be a line boundary.  *cancel* is checked
+        before every block.  A stream-only source (bzip2, xz) is decompressed
+        once for the whole range, since each of its reads starts over.
+        """
+        if is_start is None:
+            is_start = self._entry_start([source])
+        if not source.seekable and end > start:
+            if cancel is not None:
+                cancel.check()
+            source = BufferSource(source.read(start, end), start, source.compression)
+        pos = end
+        carry = b""
+        first_block = True
+        pending: List[str] = []  # continuation lines, newest first
+        while pos > start:
+            if cancel is not None:
+                cancel.check()
+            read_from = max(start, pos - self._BLOCK_BYTES)
+            data = source.read(read_from, pos) + carry
+            pos = read_from
+            raw = data.split(b"\n")
+            if first_block:
+                first_block = False
+                if raw[-1] == b"":
+                    raw.pop()
+            if pos > start:
+                # The first line may continue in the previous block.
+                carry = raw[0]
+                raw = raw[1:]
+                offset = pos + len(carry) + 1
+            else:
+                carry = b""
+                offset = pos
+            offsets = []
+            for line in raw:
+                offsets.append(offset)
+                offset += len(line) + 1
+            _stats.add("lines_scanned", len(raw))
+            for i in range(len(raw) - 1, -1, -1):
+                text = raw[i].decode("utf-8", errors="replace").rstrip()
+                if is_start(text):
+                    pending.reverse()
+                    _stats.add("entries_grouped", 1)
+                    yield offsets[i], "\n".join([text] + pending)
+                    pending = []
+                else:
+                    pending.append(text)
+        if pending:
+            # Continuation lines before the first entry start.
+            pending.reverse()
+            _stats.add("entries_grouped", 1)
+            yield start, "\n".join(pending)
+
+    def _blocks(self, source, start: int, end: int, cancel=None) -> Iterator[bytes]:
+        """Yield ``[start, end)`` of *source* in blocks, oldest first.
+
+        Stream-only sources (bzip2, xz) are decompressed once for the whole
+        range instead of once per block.  *cancel* is checked before every
+        block.
+        """
+        if not source.seekable:
+            for block in source.stream(start, end):
+                if cancel is not None:
+                    cancel.check()
+                yield block
+            return
+        pos = start
+        while pos < end:
+            if cancel is not None:
+                cancel.check()
+            block = source.read(pos, min(end, pos + self._BLOCK_BYTES))
+            if not block:
+                return
+            pos += len(block)
+            yield block
+
+    def _iter_forward(
+        self, source, start: int, end: int, cancel=None, is_start: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """Yield ``(offset, entry)`` for the entries in ``[start, end)``, oldest first.
+
+        The counterpart of :meth:`_iter_backward`: blocks are read from
+        *start* only as the caller consumes entries.  *start* must be a line
+        boundary.
+        """
+        if is_start is None:
+            is_start = self._entry_start([source])
+        line_offset = start
+        carry = b""
+        current: Optional[List[str]] = None
+        current_offset = start
+        for block in itertools.chain(self._blocks(source, start, end, cancel), (b"",)):
+            if block:
+                raw = (carry + block).split(b"\n")
+                carry = raw.pop()  # the last line may continue in the next block
+            else:
+                raw = [carry] if carry else []
+            _stats.add("lines_scanned", len(raw))
+            for line in raw:
+                text = line.decode("utf-8", errors="replace").rstrip()
+                if current is None or is_start(text):
+                    if current is not None:
+                        _stats.add("entries_grouped", 1)
+                        yield current_offset, "\n".join(current)
+                    current, current_offset = [text], line_offset
+                else:
+                    current.append(text)
+                line_offset += len(line) + 1
+            if not block:
+                break
+        if current is not None:
+            _stats.add("entries_grouped", 1)
+            yield current_offset, "\n".join(current)
+
+    def _complete_end(self, source) -> int:
+        """Return the offset just past the last complete line of *source*.
+
+        A line still being written is left out so it can be picked up whole
+        by the next tail request.  Stream-only archives are not written to,
+        and reading their end would decompress them whole.
+        """
+        size = source.size
+        if not source.seekable:
+            return size
+        tail = source.read(max(0, size - self._BLOCK_BYTES), size)
+        if not tail or tail.endswith(b"\n"):
+            return size
+        newline = tail.rfind(b"\n")
+        if newline == -1:
+            return size  # a single line longer than a block
+        return size - len(tail) + newline + 1
+
+    def _line_start(self, source, pos: int) -> int:
+        """Return the offset of the first line starting at or after *pos*."""
+        if pos <= 0:
+            return 0
+        block = source.read(pos - 1, pos - 1 + self._BLOCK_BYTES)
+        newline = block.find(b"\n")
+        return pos + newline if newline != -1 else pos - 1 + len(block)
+
+    @staticmethod
+    def _read_parallel(
+        path: str, start: int, end: int, *, lines: int, level: str, search: str, page: int,
+        workers: int, cancel=None, fields: Sequence[FieldFilter] = (), parse: Parser = parse_record,
+        query: Optional[Query] = None,
+    ) -> dict:
+        """Search ``[start, end)`` of *path* in parallel and paginate the hits."""
+        page = max(1, page)
+        needed = page * lines if lines > 0 else 0
+        with _stats.phase("scan"):
+            count, hits, complete = parallel_search(
+                path, start, end, level=level, search=search, needed=needed, workers=workers,
+                cancel=cancel, fields=fields, parse=parse, query=query,
+            )
+        if lines > 0:
+            total_pages = max(1, -(-count // lines))
+            if not complete:
+                total_pages = max(total_pages, page + 1)
+            page = min(page, total_pages)
+            # *hits* holds the newest page * lines matches in file order.
+            end_idx = len(hits) - (page - 1) * lines
+            hits = hits[max(0, end_idx - lines):max(0, end_idx)]
+        else:
+            total_pages = 1
+        result = {
+            "lines": [text for _offset, text in hits],
+            "offsets": [offset for offset, _text in hits],
+            "total": count,
+            "page": page,
+            "total_pages": total_pages,
+        }
+        if not complete:
+            result["has_more"] = True
+        return result
+
+    def _read_keyset(
+        self,
+        source,
+        start: int,
+        end: int,
+        *,
+        before: Optional[int],
+        after: Optional[int],
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        since: Optional[float],
+        until: Optional[float],
+        max_bytes: int,
+        cancel,
+        fields: Sequence[FieldFilter] = (),
+        parse: Parser = parse_record,
+        query: Optional[Query] = None,
+    ) -> dict:
+        """Return the page of entries just older than *before* or newer than *after*.
+
+        Only the entries on the page (plus any skipped pages and filtered-out
+        entries) are read, so the cost does not depend on how deep the page
+        is, and offsets stay valid while the file grows.
+        """
+        upper = level.upper()
+        lower = search.lower()
+        index = field_index(source.path) if fields else None
+        names = filter_fields(fields)
+        is_json = self._json_lines([source])
+        is_start = self._is_new_json_entry_start if is_json else self._is_new_entry_start
+
+        def matches(offset: int, entry: str) -> bool:
+            if upper and not (has_level(entry, upper) if is_json else upper in entry):
+                return False
+            if lower and lower not in entry.lower():
+                return False
+            if since is not None or until is not None:
+                ts = parse_timestamp(entry)
+                if ts is not None and ((since is not None and ts < since) or (until is not None and ts > until)):
+                    return False
+            if index is not None and not match_fields(fields, index.values(offset, entry, names, parse)):
+                return False
+            if query is not None and not query.matches(entry, parse):
+                return False
+            return True
+
+        page = max(1, page)
+        skip = (page - 1) * lines if lines > 0 else 0
+        stop = skip + lines if lines > 0 else None
+        partial = False
+        if before is not None:
+            end = min(end, before)
+            if max_bytes and end - start > max_bytes:
+                start = self._line_start(source, end - max_bytes)
+                partial = True
+            # Zones are skipped by level only: matches() keeps untimed
+            # entries, which a zone outside the time range may still hold.
+            zones = zone_filter(level)
+            if zones is None:
+                entries = self._iter_backward(source, start, end, cancel, is_start)
+            else:
+                entries = itertools.chain.from_iterable(
+                    self._iter_backward(source, lo, hi, cancel, is_start)
+                    for lo, hi in zones.ranges(source, start, end)
+                )
+            found = (e for e in entries if matches(*e))
+            with _stats.phase("scan"):
+                picked = list(itertools.islice(found, skip, stop))
+            picked.reverse()  # oldest first, like read()
+        else:
+            # Leave out a line that is still being written.
+            end = min(end, self._complete_end(source))
+            start = max(start, self._line_start(source, after))
+            if max_bytes and end - start > max_bytes:
+                end = self._line_start(source, start + max_bytes)
+                partial = True
+            found = (
+                e for e in self._iter_forward(source, start, end, cancel, is_start)
+                if e[0] > after and matches(*e)
+            )
+            with _stats.phase("scan"):
+                picked = list(itertools.islice(found, skip, stop))
+        _stats.add("entries_matched", skip + len(picked) if picked else 0)
+
+        # A full page may be followed by more entries; whether it is would
+        # need another (possibly long) scan for sparse filters.
+        has_more = lines > 0 and len(picked) == lines
+        result = {
+            "lines": [entry for _offset, entry in picked],
+            "offsets": [offset for offset, _entry in picked],
+            "total": len(picked),
+            "page": page,
+            "total_pages": page + 1 if has_more else page,
+            "has_more": has_more,
+            "cursor": {
+                "older": picked[0][0] if picked else before,
+                "newer": picked[-1][0] if picked else after,
+            },
+        }
+        if partial:
+            result["partial"] = True
+        return result
+
+    def _read_estimated(
+        self,
+        source,
+        start: int,
+        end: int,
+        *,
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        since: Optional[float],
+        until: Optional[float],
+        max_bytes: int,
+        cancel,
+        fields: Sequence[FieldFilter] = (),
+        parse: Parser = parse_record,
+        query: Optional[Query] = None,
+    ) -> Optional[dict]:
+        """Return page *page* of the tail window, extrapolating ``total``.
+
+        The window is the one the exact read would count, but it is read
+        backwards only until the page is filled; ``total`` is then the
+        number of matches found so far scaled by the share of the window
+        they came from.  Returns ``None`` when the exact read is needed
+        instead (a page past the end, whose number must be clamped).
+        """
+        window = max(page * lines * self._TAIL_BYTES_PER_REQUESTED_LINE, self._MAX_READ_BYTES)
+        if max_bytes:
+            window = min(window, max_bytes)
+        if end - start > window:
+            start = self._line_start(source, end - window)
+        result = self._read_keyset(
+            source, start, end, before=end, after=None, lines=lines, level=level,
+            search=search, page=page, since=since, until=until, max_bytes=0, cancel=cancel,
+            fields=fields, parse=parse, query=query,
+        )
+        found = (page - 1) * lines + len(result["lines"])
+        if not result["lines"] and page > 1:
+            return None
+        result["end"] = end
+        if not result["has_more"]:
+            # The whole window was read: the count is exact.
+            result["total"] = found
+            return result
+        scanned = end - result["cursor"]["older"]
+        total = max(found, -(-found * (end - start) // max(1, scanned)))
+        result["total"] = total
+        result["total_pages"] = max(page, -(-total // lines))
+        result["total_estimated"] = True
+        return result
+
+    def _parser(self, file: str) -> Parser:
+        """Return the field parser for *file*: its format's, or JSON."""
+        return self.log_dir.formats.parser_for(file) or parse_record
+
+    def _add_columns(
+        self, result: dict, columns: Sequence[str], file: Optional[str], path: Optional[str]
+    ) -> dict:
+        """Add ``result["columns"]``: the values of *columns* per entry.
+
+        ``{name: [value, ...]}`` aligned with ``lines``; ``None`` where an
+        entry has no such field.  Entries are parsed with the format of
+        *file* (or of each line's ``sources`` entry when *file* is
+        ``None``).  Values come from the field index of *path* when the
+        entries' offsets are known.
+        """
+        if not columns or "columns" in result:
+            return result
+        lines = result.get("lines") or []
+        offsets = result.get("offsets")
+        if file is None:
+            parsers = [self._parser(name) for name in result.get("sources") or []]
+        else:
+            parsers = [self._parser(file)] * len(lines)
+        if path is not None and offsets is not None:
+            index = field_index(path)
+            rows = [
+                index.values(offset, entry, columns, parse)
+                for offset, entry, parse in zip(offsets, lines, parsers)
+            ]
+        else:
+            rows = [record_values(entry, columns, parse) for entry, parse in zip(lines, parsers)]
+        result["columns"] = {
+            name: [None if row[name] is MISSING else row[name] for row in rows] for name in columns
+        }
+        return result
+
+    @staticmethod
+    def _cap_entries(result: dict, max_entry_bytes: int) -> dict:
+        """Cut the entries of *result* to *max_entry_bytes* (UTF-8) each.
+
+        Each cut entry is recorded in ``result["truncated"]`` as
+        ``{"index": i, "length": bytes, "offset": offset_or_None}``; the
+        offset (known when the read returned ``"offsets"``; a ``(segment,
+        offset)`` pair for rotated reads) lets the client fetch the whole
+        entry with :meth:`entry`.  Column values are cut to
+        the same size (objects and lists as JSON text), and the names of the
+        cut ones are added to the entry's record as ``"columns"``.  Results
+        that were already capped (e.g. by a sidecar worker) are left alone.
+        """
+        if max_entry_bytes <= 0 or "truncated" in result:
+            return result
+        lines = result.get("lines") or []
+        offsets = result.get("offsets")
+        cuts: Dict[int, dict] = {}
+
+        def cut(i: int, length: int) -> dict:
+            if i not in cuts:
+                cuts[i] = {
+                    "index": i,
+                    "length": length,
+                    "offset": offsets[i] if offsets is not None else None,
+                }
+            return cuts[i]
+
+        for i, entry in enumerate(lines):
+            if len(entry) * 4 <= max_entry_bytes:  # at most 4 bytes per character
+                continue
+            data = entry.encode("utf-8")
+            if len(data) <= max_entry_bytes:
+                continue
+            lines[i] = data[:max_entry_bytes].decode("utf-8", errors="ignore")
+            cut(i, len(data))
+        for name, values in (result.get("columns") or {}).items():
+            for i, value in enumerate(values):
+                if value is None or isinstance(value, (bool, int, float)):
+                    continue
+                text = value if isinstance(value, str) else json.dumps(value, default=str)
+                if len(text) * 4 <= max_entry_bytes:
+                    continue
+                data = text.encode("utf-8")
+                if len(data) <= max_entry_bytes:
+                    continue
+                values[i] = data[:max_entry_bytes].decode("utf-8", errors="ignore")
+                cut(i, len(lines[i].encode("utf-8"))).setdefault("columns", []).append(name)
+        if cuts:
+            result["truncated"] = [cuts[i] for i in sorted(cuts)]
+        return result
+
+    # ------------------------------------------------------------------
+    # Cost estimation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _estimate_scan_bytes(paths: List[str], window: int) -> int:
+        """Estimate the bytes scanned to read the newest *window* bytes of *paths*.
 
-        If the file is larger than *max_bytes*, only the last *max_bytes*
-        are read and the first (potentially partial) line is discarded.
+        ``window=0`` means the whole chain.  Time ranges are ignored, so the
+        estimate is an upper bound for ``since``/``until`` reads.
         """
-        file_size = os.path.getsize(filepath)
-        with open(filepath, "r", encoding="utf-8") as fh:
-            if max_bytes > 0 and file_size > max_bytes:
-                fh.seek(file_size - max_bytes)
-                fh.readline()  # discard partial line at boundary
-            return fh.readlines()
+        cost = covered = 0
+        for path in paths:
+            if window > 0 and covered >= window:
+                break
+            size, cheap_tail = read_cost(path)
+            part = size if window <= 0 else min(size, window - covered)
+            covered += part
+            cost += part if cheap_tail else size
+        return cost
+
+    def _workers_for(self, parallel: Optional[bool]) -> int:
+        if parallel is None:
+            return self.parallel_workers
+        return (self.parallel_workers or default_workers()) if parallel else 0
+
+    def _admit(self, estimated_bytes: int):
+        """Plan a request with the planner; return ``(plan, error_fields)``."""
+        plan = self.planner.plan(estimated_bytes)
+        if plan.error:
+            return None, {"error": plan.error, "status": plan.status}
+        if not self.planner.acquire(plan):
+            return None, self.planner.busy_error()
+        return plan, None
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    @_stats.collected("read")
     def read(
         self,
         file: str,
@@ -154,65 +1016,460 @@ class LogReader:
         level: str = "",
         search: str = "",
         page: int = 1,
+        rotated: bool = False,
+        since: Union[str, float, None] = None,
+        until: Union[str, float, None] = None,
+        parallel: Optional[bool] = None,
+        max_bytes: int = 0,
+        cancel=None,
+        before: Union[str, int, None] = None,
+        after: Union[str, int, None] = None,
+        estimate: bool = False,
+        max_entry_bytes: int = 0,
+        fields: Union[str, Sequence[str], None] = None,
+        columns: Union[str, Sequence[str], None] = None,
+        sort: str = "",
+        query: str = "",
+        collapse: str = "",
     ) -> dict:
         """Return filtered, paginated log entries as a dict.
 
+        Parameters
+        ----------
+        level:
+            Keep the entries that contain this level name (upper-cased).
+            In a JSON-lines log it is compared, ignoring case, with each
+            entry's ``level`` field instead.
+        rotated:
+            Read *file* together with its rotated siblings (``app.log.1``,
+            ``app.log.2.gz`` …) as one logical log, newest first.
+        since / until:
+            Optional time range (epoch seconds, ISO timestamps or relative
+            durations such as ``"6h"``; see
+            :func:`~python_log_viewer.timestamps.parse_time_bound`).
+        parallel:
+            Force the parallel whole-file search on (``True``) or off
+            (``False``); ``None`` follows *parallel_workers*.  Only used for
+            filtered reads of a single uncompressed file larger than
+            ``_PARALLEL_MIN_BYTES``.
+        max_bytes:
+            Scan at most this many of the newest bytes (``0`` = no limit).
+            The planner sets it for over-budget requests it downgrades.
+        cancel:
+            Optional :class:`~python_log_viewer.cancel.CancelToken`; the scan
+            stops at its next check point once the token is cancelled.
+        before / after:
+            Cursor pagination: return the *lines* entries that start before
+            byte offset *before* (newest of them) or after offset *after*
+            (oldest of them; ``-1`` for the start of the file) instead of
+            counting pages from the end.  *page* then skips whole pages in
+            that direction.  Offsets come from a previous response's
+            ``"cursor"`` (or ``"end"``), so pages neither shift nor repeat
+            while the file grows, and a page costs about one page of I/O.
+            Not available together with *rotated*.
+        estimate:
+            Return the page as soon as it is found instead of grouping and
+            filtering the whole tail window to count it.  ``total`` and
+            ``total_pages`` are then extrapolated from the share of the
+            window read so far and ``"total_estimated": True`` is set; the
+            same request without *estimate* gives the exact count.  Used
+            for single uncompressed files (other reads ignore it).
+        max_entry_bytes:
+            Cut entries longer than this many bytes (``0`` = no limit), so
+            a page of multi-megabyte single-line payloads stays small; see
+            :meth:`_cap_entries`.  Filters still see the whole entries.
+        fields:
+            Field filters for JSON-lines entries, e.g. ``"level=error,
+            duration_ms>500"``; see :mod:`python_log_viewer.structured`.
+            Entries are parsed only when this (or *columns*) is given.
+            Files with a format (see :class:`LogDirectory`) are filtered on
+            the fields the format extracts instead.
+        columns:
+            Fields to return as ``"columns"`` (``{name: [value, ...]}``
+            aligned with ``lines``), so clients need not parse the entries.
+        sort:
+            Order the filtered entries by this field (``"-field"`` for
+            descending) instead of by position.  Pages still count from
+            the end, so page 1 holds the largest values (the smallest
+            with ``"-field"``).  Sorting needs every entry in the tail window,
+            so it disables the parallel and estimated reads and is not
+            available with cursor pagination.
+        query:
+            A boolean query such as ``'ERROR AND (timeout OR refused) AND
+            NOT healthcheck'``, applied like *search* (and together with
+            it); see :mod:`python_log_viewer.query` for the syntax.
+        collapse:
+            Collapse runs of consecutive repeated entries into their newest
+            entry: ``"exact"``, ``"timestamps"`` (ignore the leading
+            timestamp) or ``"numbers"`` (ignore all numbers); see
+            :mod:`python_log_viewer.repeats`.  Pages and ``total`` then
+            count runs.  Like *sort*, it reads the whole tail window and is
+            not available with cursor pagination (nor together with *sort*).
+
         Returns
         -------
         dict
             ``{"lines": [...], "total": int, "page": int, "total_pages": int}``
-            on success, or the same shape with ``"error"`` on failure.
+            on success, or the same shape with ``"error"`` on failure.  A
+            parallel search that stopped once the page was filled also sets
+            ``"has_more": True``; its ``total`` is then a lower bound.  A
+            scan cut short by *max_bytes* sets ``"partial": True``.
+            Requests refused by the planner carry the HTTP ``"status"`` to
+            answer with (429 or 503) and, for 503, ``"retry_after"``.  A
+            cancelled scan returns an error result with ``"cancelled": True``.
+
+            Single-file reads also return ``"end"``, the byte offset the read
+            covered up to; ``before=end`` with ``page=2`` continues with
+            cursor pagination.  Cursor reads return ``"cursor": {"older":
+            offset, "newer": offset}`` (the offsets of the oldest and newest
+            entry on the page) and ``"has_more"``; their ``total`` counts
+            only the returned entries.
+
+            Every read also returns ``"offsets"``, the start offset of each
+            entry in ``lines`` (for collapsed runs, of the newest repeat),
+            for use with :meth:`context` and :meth:`entry`.  Rotated reads
+            return ``(segment, offset)`` pairs instead, *segment* naming the
+            file the entry is in, relative to the log directory.
+
+            Entries cut by *max_entry_bytes* are listed in ``"truncated"``,
+            and runs collapsed by *collapse* in ``"repeats"`` as ``{"index":
+            i, "count": n, "first": timestamp, "last": timestamp}``.
+
+            Ring buffers (see :mod:`python_log_viewer.handlers`) are read
+            from memory; their offsets and cursors are sequence numbers.
+            Archives (see :mod:`python_log_viewer.archive`) are read by
+            block; their offsets and cursors are entry numbers.
         """
         _err = {"lines": [], "total": 0, "page": 1, "total_pages": 1}
 
-        resolved = self.log_dir._safe_resolve(file)
-        if resolved is None:
+        live = self.log_dir._live_source(file)
+        resolved = None if live is not None else self.log_dir._safe_resolve(file)
+        if live is None and resolved is None:
             return {**_err, "error": "Invalid or missing file"}
 
         try:
+            before = None if before in (None, "") else int(before)
+            after = None if after in (None, "") else int(after)
+        except (TypeError, ValueError):
+            return {**_err, "error": "Invalid cursor"}
+        if sort and (before is not None or after is not None):
+            return {**_err, "error": "Sorting is not supported with cursor pagination"}
+        if collapse:
+            if before is not None or after is not None:
+                return {**_err, "error": "Collapsing repeats is not supported with cursor pagination"}
+            if sort:
+                return {**_err, "error": "Collapsing repeats is not supported together with sorting"}
+            try:
+                repeat_key(collapse)
+            except ValueError as exc:
+                return {**_err, "error": str(exc)}
+        try:
+            fields = parse_field_filters(fields)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        columns = parse_columns(columns)
+        try:
+            query = compile_query(query) if query else None
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+
+        kwargs = dict(
+            lines=lines, level=level, search=search, page=page, rotated=rotated,
+            since=since, until=until, parallel=parallel, max_bytes=max_bytes, cancel=cancel,
+            before=before, after=after, estimate=estimate, max_entry_bytes=max_entry_bytes,
+            fields=fields, columns=columns, sort=sort, query=query, collapse=collapse,
+        )
+        if live is not None:
+            # Memory only: no planner slot, sidecar or parallel scan needed.
+            try:
+                result = self._read_live(live, file, **kwargs)
+                return self._cap_entries(result, max_entry_bytes)
+            except QueryCancelled:
+                return {**_err, "error": "Query cancelled", "cancelled": True}
+        if is_archive(resolved):
+            return self._read_archive_file(resolved, file, _err, kwargs)
+        if not (search or fields or query or sort or collapse):
+            # Logs of IndexedRotatingFileHandler: their sidecars locate the
+            # entries, so nothing is scanned (and nothing needs planning).
+            try:
+                result = self._read_indexed(resolved, **kwargs)
+            except Exception:
+                result = None  # the scan below reports what went wrong
+            if result is not None:
+                result = self._add_columns(result, columns, file, None if rotated else resolved)
+                return self._cap_entries(result, max_entry_bytes)
+        plan = None
+        if self.planner is not None:
+            paths = self.log_dir._rotation_chain(resolved) if rotated else [resolved]
+            window = max(page * lines * self._TAIL_BYTES_PER_REQUESTED_LINE, self._MAX_READ_BYTES)
+            if lines <= 0 or (
+                (before is not None or after is not None) and (level or search or fields or query)
+            ) or (
+                self._workers_for(parallel) > 0
+                and not sort
+                and not collapse
+                and (level or search or fields or query)
+                and len(paths) == 1
+                and detect_compression(resolved) is None
+                and os.path.getsize(resolved) >= self._PARALLEL_MIN_BYTES
+            ):
+                window = 0
+            plan, error = self._admit(self._estimate_scan_bytes(paths, window))
+            if error is not None:
+                return {**_err, **error}
+            if plan.max_bytes:
+                kwargs["max_bytes"] = min(max_bytes, plan.max_bytes) if max_bytes else plan.max_bytes
+        try:
+            result = self._read(file, resolved, **kwargs)
+            result = self._add_columns(result, columns, file, None if rotated else resolved)
+            return self._cap_entries(result, max_entry_bytes)
+        except QueryCancelled:
+            return {**_err, "error": "Query cancelled", "cancelled": True}
+        finally:
+            if plan is not None:
+                self.planner.release(plan)
+
+    def _read(
+        self,
+        file: str,
+        resolved: str,
+        *,
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        rotated: bool,
+        since: Union[str, float, None],
+        until: Union[str, float, None],
+        parallel: Optional[bool],
+        max_bytes: int,
+        cancel,
+        before: Optional[int],
+        after: Optional[int],
+        estimate: bool,
+        max_entry_bytes: int,
+        fields: List[FieldFilter],
+        columns: List[str],
+        sort: str,
+        query: Optional[Query],
+        collapse: str,
+    ) -> dict:
+        _err = {"lines": [], "total": 0, "page": 1, "total_pages": 1}
+
+        if self.scan_worker is not None and (
+            lines <= 0 or level or search or fields or sort or query or collapse
+        ):
+            return self.scan_worker.call(
+                "read",
+                self.log_dir,
+                self.parallel_workers,
+                cancel=cancel,
+                file=file,
+                lines=lines,
+                level=level,
+                search=search,
+                page=page,
+                rotated=rotated,
+                since=since,
+                until=until,
+                parallel=parallel,
+                max_bytes=max_bytes,
+                before=before,
+                after=after,
+                estimate=estimate,
+                max_entry_bytes=max_entry_bytes,
+                fields=[str(f) for f in fields],
+                columns=columns,
+                sort=sort,
+                query=str(query or ""),
+                collapse=collapse,
+            )
+
+        parse = self._parser(file)
+        try:
+            since_ts = parse_time_bound(since)
+            until_ts = parse_time_bound(until)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+
+        paths = self.log_dir._rotation_chain(resolved) if rotated else [resolved]
+
+        if before is not None or after is not None:
+            if len(paths) != 1:
+                return {**_err, "error": "Cursor pagination is not supported for rotated reads"}
+            try:
+                span = next(self._spans(paths, since_ts, until_ts), None)
+                if span is None:  # nothing in the time range
+                    return {**_err, "has_more": False, "cursor": {"older": before, "newer": after}}
+                source, start, end = span
+                return self._read_keyset(
+                    source, start, end, before=before, after=after, lines=lines, level=level,
+                    search=search, page=page, since=since_ts, until=until_ts,
+                    max_bytes=max_bytes, cancel=cancel, fields=fields, parse=parse, query=query,
+                )
+            except Exception as exc:
+                return {**_err, "lines": [f"Error reading log file: {exc}"]}
+
+        workers = self._workers_for(parallel)
+        if (
+            workers > 0
+            and not (sort or collapse)
+            and (level or search or fields or query)
+            and len(paths) == 1
+        ):
+            try:
+                source, start, end = next(self._spans(paths, since_ts, until_ts), (None, 0, 0))
+                if source is not None and source.compression is None and end - start >= self._PARALLEL_MIN_BYTES:
+                    partial = bool(max_bytes) and end - start > max_bytes
+                    if partial:
+                        start = self._line_start(source, end - max_bytes)
+                    result = self._read_parallel(
+                        resolved, start, end, lines=lines, level=level, search=search,
+                        page=page, workers=workers, cancel=cancel, fields=fields, parse=parse,
+                        query=query,
+                    )
+                    if partial:
+                        result["partial"] = True
+                    return result
+            except Exception as exc:
+                return {**_err, "lines": [f"Error reading log file: {exc}"]}
+
+        if estimate and not (sort or collapse) and lines > 0 and len(paths) == 1:
+            try:
+                span = next(self._spans(paths, since_ts, until_ts), None)
+                if span is not None and span[0].seekable:
+                    source, start, end = span
+                    result = self._read_estimated(
+                        source, start, end, lines=lines, level=level, search=search,
+                        page=page, since=since_ts, until=until_ts, max_bytes=max_bytes,
+                        cancel=cancel, fields=fields, parse=parse, query=query,
+                    )
+                    if result is not None:
+                        return result
+            except Exception as exc:
+                return {**_err, "lines": [f"Error reading log file: {exc}"]}
+
+        single: Optional[list] = None
+        partial = False
+        try:
+            if len(paths) == 1:
+                # Resolve the one span once: the growth loop re-reads it and
+                # its end is returned as the anchor for cursor pagination.
+                single = list(self._spans(paths, since_ts, until_ts))
+
+            def spans():
+                return single if single is not None else self._spans(paths, since_ts, until_ts)
+
+            # Zones of the window that cannot match the level or time range
+            # are not read at all.
+            zones = zone_filter(level, since_ts, until_ts)
+
             if lines > 0:
                 # Read enough bytes from the tail for the requested pages.
                 # Some logs have very long single-line JSON entries, so we
                 # grow the tail window until we have at least one page worth
-                # of physical lines (or we reach the full file).
-                file_size = os.path.getsize(resolved)
+                # of physical lines, read or skipped (or we reach the start
+                # of the log).
                 read_bytes = max(
                     page * lines * self._TAIL_BYTES_PER_REQUESTED_LINE,
                     self._MAX_READ_BYTES,
                 )
-                read_bytes = min(read_bytes, file_size)
-                raw_lines = self._read_tail(resolved, read_bytes)
-                while read_bytes < file_size and len(raw_lines) <= page * lines:
-                    read_bytes = min(read_bytes * 2, file_size)
-                    raw_lines = self._read_tail(resolved, read_bytes)
+                if max_bytes:
+                    read_bytes = min(read_bytes, max_bytes)
+                raw_lines, line_parts, segments, exhausted = self._read_tail(
+                    spans(), read_bytes, cancel, zones
+                )
+                while not exhausted and len(raw_lines) + (zones.lines_skipped if zones else 0) <= page * lines:
+                    if max_bytes and read_bytes >= max_bytes:
+                        partial = True
+                        break
+                    read_bytes *= 2
+                    if max_bytes:
+                        read_bytes = min(read_bytes, max_bytes)
+                    raw_lines, line_parts, segments, exhausted = self._read_tail(
+                        spans(), read_bytes, cancel, zones
+                    )
             else:
-                with open(resolved, "r", encoding="utf-8") as fh:
-                    raw_lines = fh.readlines()
+                raw_lines, line_parts, segments, exhausted = self._read_tail(
+                    spans(), max_bytes, cancel, zones
+                )
+                partial = not exhausted
         except Exception as exc:
             return {**_err, "lines": [f"Error reading log file: {exc}"]}
 
+        if cancel is not None:
+            cancel.check()
+
         # Group multi-line entries
-        entries: list[str] = []
-        for line in raw_lines:
-            stripped = line.rstrip()
-            if self._is_new_entry_start(stripped):
-                entries.append(stripped)
-            elif entries:
-                entries[-1] += "\n" + stripped
+        is_json = self._json_lines(open_source(path) for path in paths)
+        is_start = self._is_new_json_entry_start if is_json else self._is_new_entry_start
+        with _stats.phase("group"):
+            stripped = list(map(str.rstrip, raw_lines))
+            flags = list(map(is_start, stripped))
+            if flags:
+                flags[0] = True  # leading continuation lines form an entry
+            # the index of each entry's first line
+            starts = list(itertools.compress(range(len(stripped)), flags))
+            if len(starts) == len(stripped):
+                entries = stripped
             else:
-                entries.append(stripped)
+                ends = starts[1:] + [len(stripped)]
+                entries = list(map("\n".join, map(stripped.__getitem__, map(slice, starts, ends))))
+        _stats.add("entries_grouped", len(entries))
 
-        # Level filter
-        if level:
-            upper = level.upper()
-            entries = [e for e in entries if upper in e]
+        if cancel is not None:
+            cancel.check()
 
-        # Text search
-        if search:
-            lower = search.lower()
-            entries = [e for e in entries if lower in e.lower()]
+        runs = None
+        # (index of the entry's first line, entry) pairs, made only if
+        # filtered.  The filters are chained lazily: the pairs are filtered,
+        # and runs detected, in one pass by whatever consumes them last.
+        pairs = zip(starts, entries)
+        kept: Iterable[Tuple[int, str]] = pairs
+        with _stats.phase("filter"):
+            # Time range
+            if since_ts is not None or until_ts is not None:
+                kept = self._filter_time(kept, since_ts, until_ts)
+
+            # Level filter
+            if level:
+                upper = level.upper()
+                if is_json:
+                    kept = ((start, e) for start, e in kept if has_level(e, upper))
+                else:
+                    kept = ((start, e) for start, e in kept if upper in e)
+
+            # Text search
+            if search:
+                lower = search.lower()
+                kept = ((start, e) for start, e in kept if lower in e.lower())
 
+            # Field filters
+            if fields:
+                names = filter_fields(fields)
+                kept = ((start, e) for start, e in kept if match_fields(fields, record_values(e, names, parse)))
+
+            # Boolean query
+            if query is not None:
+                kept = ((start, e) for start, e in kept if query.matches(e, parse))
+
+            if sort:
+                kept = sort_entries(
+                    kept, sort, parse, lambda pair, names, parse: record_values(pair[1], names, parse)
+                )
+
+            if collapse:
+                key = repeat_key(collapse)
+                runs = collapse_runs(kept, lambda pair: key(pair[1]))
+                kept = [newest for newest, _count, _oldest in runs]
+            elif kept is not pairs:
+                kept = list(kept)
+
+        if kept is not pairs:
+            starts = [start for start, _entry in kept]
+            entries = [entry for _start, entry in kept]
         total = len(entries)
+        _stats.add("entries_matched", total)
 
         if lines > 0:
             total_pages = max(1, -(-total // lines))  # ceiling division
@@ -220,14 +1477,1188 @@ class LogReader:
             # Page 1 = most recent entries, higher pages = older
             end_idx = total - (page - 1) * lines
             start_idx = max(0, end_idx - lines)
-            entries = entries[start_idx:end_idx]
+            entries, starts = entries[start_idx:end_idx], starts[start_idx:end_idx]
+            if runs is not None:
+                runs = runs[start_idx:end_idx]
         else:
             total_pages = 1
             page = 1
 
+        result = {
+            "lines": entries,
+            "offsets": self._line_positions(
+                starts, raw_lines, line_parts, segments if len(paths) > 1 else None
+            ),
+            "total": total,
+            "page": page,
+            "total_pages": total_pages,
+        }
+        if runs is not None:
+            result["repeats"] = describe_runs([
+                (newest[1], count, oldest[1]) for newest, count, oldest in runs
+            ])
+        if single:
+            result["end"] = single[0][2]
+        if partial:
+            result["partial"] = True
+        return result
+
+    def _line_positions(
+        self,
+        indexes: List[int],
+        lines: List[str],
+        parts: List[Tuple[int, int, int, Optional[List[int]]]],
+        segments: Optional[List[Tuple[int, object]]],
+    ) -> list:
+        """Return the positions of ``lines[i]`` for *indexes* of a :meth:`_read_tail` window.
+
+        *parts* holds ``(first line index, start, end, byte lengths)`` for
+        each contiguous run of lines, *end* counting a final newline even
+        where the run has none, and the byte lengths ``None`` where they
+        equal the lengths of the (ASCII) lines.  Line lengths are summed
+        from whichever end of a run is nearer to the lines asked for, so a
+        page from the tail costs little.  Returns byte offsets, or – with
+        the window's *segments*, for reads spanning several files –
+        ``(segment, offset)`` pairs naming the file relative to the log
+        directory.
+        """
+        if not indexes:
+            return []
+        firsts = [part[0] for part in parts]
+        # the part of each index, and the range of indexes asked for in each part
+        wanted: Dict[int, Tuple[int, int]] = {}
+        if len(parts) == 1:
+            owners: List[int] = []
+            wanted[0] = (min(indexes), max(indexes))
+        else:
+            owners = [bisect.bisect_right(firsts, i) - 1 for i in indexes]
+            for k, i in zip(owners, indexes):
+                low, high = wanted.get(k, (i, i))
+                wanted[k] = (min(low, i), max(high, i))
+        # per part, (first index covered, offset of each line less its index)
+        table: Dict[int, Tuple[int, List[int]]] = {}
+        for k, (low, high) in wanted.items():
+            first, start, end, lengths = parts[k]
+            stop = firsts[k + 1] if k + 1 < len(parts) else len(lines)
+            if high - first <= stop - low:
+                sizes = map(len, lines[first:high]) if lengths is None else lengths[:high - first]
+                table[k] = (first, list(itertools.accumulate(sizes, initial=start - first)))
+            else:
+                # end - offset(i) = bytes of lines i.. plus their newlines
+                sizes = map(len, lines[low:stop]) if lengths is None else lengths[low - first:]
+                tail = list(itertools.accumulate(reversed(list(sizes)), initial=0))
+                table[k] = (low, list(map((end - stop).__sub__, reversed(tail[1:]))))
+        if len(parts) == 1:
+            shift, values = table[0]
+            rows = indexes if shift == 0 else map((-shift).__add__, indexes)
+            positions = list(map(operator.add, map(values.__getitem__, rows), indexes))
+        else:
+            positions = [table[k][1][i - table[k][0]] + i for k, i in zip(owners, indexes)]
+        if segments is None:
+            return positions
+        starts = [first for first, _source in segments]
+        names = [os.path.relpath(source.path, self.log_dir.path) for _first, source in segments]
+        return [
+            (names[bisect.bisect_right(starts, i) - 1], offset) for i, offset in zip(indexes, positions)
+        ]
+
+    def _read_live(
+        self,
+        live: RingBufferHandler,
+        file: str,
+        *,
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        since: Union[str, float, None],
+        until: Union[str, float, None],
+        cancel,
+        before: Optional[int],
+        after: Optional[int],
+        fields: List[FieldFilter],
+        columns: List[str],
+        sort: str,
+        query: Optional[Query],
+        collapse: str,
+        **_ignored,
+    ) -> dict:
+        """Serve :meth:`read` from the records of a ring buffer.
+
+        Level and time filters use the level and creation time stored with
+        each record.  An unfiltered page from the end only copies the
+        records on it.
+        """
+        _err = {"lines": [], "total": 0, "page": 1, "total_pages": 1}
+        parse = self._parser(file)
+        try:
+            since_ts = parse_time_bound(since)
+            until_ts = parse_time_bound(until)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        cursor = before is not None or after is not None
+        filtered = bool(level or search or fields or query) or since_ts is not None or until_ts is not None
+
+        runs = None
+        if lines > 0 and not (filtered or cursor or sort or collapse):
+            records, total = live.tail(page * lines)
+            end = records[-1][SEQ] + 1 if records else live.end()
+            # records holds the newest of the total entries; no page reaches
+            # the older ones, so they are only counted.
+            segments = [(None, range(total - len(records))), (None, records)]
+            _stats.add("entries_matched", total)
+        else:
+            records = live.records(after + 1 if after is not None else 0)
+            end = records[-1][SEQ] + 1 if records else live.end()
+            if before is not None:
+                records = [r for r in records if r[SEQ] < before]
+            upper = level.upper()
+            lower = search.lower()
+            names = filter_fields(fields)
+
+            def matches(record) -> bool:
+                if upper and upper not in record[LEVEL]:
+                    return False
+                if since_ts is not None and record[CREATED] < since_ts:
+                    return False
+                if until_ts is not None and record[CREATED] > until_ts:
+                    return False
+                if lower and lower not in record[TEXT].lower():
+                    return False
+                if fields and not match_fields(fields, record_fields(record, names, parse)):
+                    return False
+                if query is not None and not query.matches(record[TEXT], parse):
+                    return False
+                return True
+
+            if cancel is not None:
+                cancel.check()
+            with _stats.phase("filter"):
+                # Lazy, so that filtering and run detection take one pass
+                found = (r for r in records if matches(r)) if filtered else records
+                if sort:
+                    found = sort_entries(found, sort, parse, record_fields)
+                if collapse:
+                    key = repeat_key(collapse)
+                    runs = collapse_runs(found, lambda record: key(record[TEXT]))
+                else:
+                    records = list(found) if filtered and not sort else found
+            segments = [(None, runs if runs is not None else records)]
+            _stats.add("entries_matched", len(segments[0][1]))
+
+        picked: list = []
+        picked_runs: list = []
+
+        def fetch(_key, found: list) -> Tuple[List[str], List[int]]:
+            if runs is not None:
+                picked_runs.extend(found)
+                found = [newest for newest, _count, _oldest in found]
+            picked.extend(found)
+            return [record[TEXT] for record in found], [record[SEQ] for record in found]
+
+        result = self._paged(segments, fetch, lines=lines, page=page, before=before, after=after)
+        if not cursor:
+            result["end"] = end
+        if runs is not None:
+            result["repeats"] = describe_runs([
+                (newest[TEXT], count, oldest[TEXT]) for newest, count, oldest in picked_runs
+            ])
+        if columns:
+            rows = [record_fields(record, columns, parse) for record in picked]
+            result["columns"] = {
+                name: [None if row[name] is MISSING else row[name] for row in rows] for name in columns
+            }
+        return result
+
+    @staticmethod
+    def _paged(
+        segments: Sequence[Tuple[Any, Sequence[Any]]],
+        fetch: Callable[[Any, Sequence[Any]], Tuple[List[str], List[int]]],
+        *,
+        lines: int,
+        page: int,
+        before: Optional[int],
+        after: Optional[int],
+        positional: bool = True,
+    ) -> dict:
+        """Return the read result of one page of the matches in *segments*.
+
+        *segments* holds ``(key, matches)`` pairs, oldest first.  Only the
+        matches on the page are located, by ``fetch(key, matches)``, which
+        returns their entries and offsets.  Pages count back from the newest
+        match, or on from *after*.  Cursor reads (*before* / *after*) report
+        ``has_more`` and ``cursor`` – taken from the page's offsets only if
+        *positional*; other reads ``total`` over all matches.
+        """
+        total = sum(len(matches) for _key, matches in segments)
+        page = max(1, page)
+        skip = (page - 1) * lines if lines > 0 else 0
+        if after is not None:
+            start_idx, end_idx = skip, skip + lines if lines > 0 else total
+        elif before is not None or lines <= 0:
+            end_idx = max(0, total - skip)
+            start_idx = max(0, end_idx - lines) if lines > 0 else 0
+        else:
+            page = min(page, max(1, -(-total // lines)))
+            end_idx = total - (page - 1) * lines
+            start_idx = max(0, end_idx - lines)
+        start_idx, end_idx = min(start_idx, total), min(end_idx, total)
+
+        entries: List[str] = []
+        offsets: list = []
+        seen = 0
+        for key, matches in segments:
+            a, b = max(0, start_idx - seen), min(len(matches), end_idx - seen)
+            seen += len(matches)
+            if a < b:
+                texts, positions = fetch(key, matches[a:b])
+                entries.extend(texts)
+                offsets.extend(positions)
+
+        if before is not None or after is not None:
+            has_more = lines > 0 and (end_idx < total if after is not None else start_idx > 0)
+            return {
+                "lines": entries,
+                "offsets": offsets,
+                "total": len(entries),
+                "page": page,
+                "total_pages": page + 1 if has_more else page,
+                "has_more": has_more,
+                "cursor": {
+                    "older": offsets[0] if positional and offsets else before,
+                    "newer": offsets[-1] if positional and offsets else after,
+                },
+            }
         return {
             "lines": entries,
+            "offsets": offsets,
             "total": total,
+            "page": page if lines > 0 else 1,
+            "total_pages": max(1, -(-total // lines)) if lines > 0 else 1,
+        }
+
+    def _read_archive_file(self, resolved: str, file: str, _err: dict, kwargs: dict) -> dict:
+        """:meth:`read` of an archive: open it, plan it and read it."""
+        try:
+            archive = open_archive(resolved)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        plan = None
+        heavy = kwargs["lines"] <= 0 or any(kwargs[name] for name in ("search", "fields", "query", "sort", "collapse"))
+        if self.planner is not None and heavy:
+            plan, error = self._admit(archive.source_bytes)
+            if error is not None:
+                return {**_err, **error}
+            if plan.max_bytes:
+                max_bytes = kwargs["max_bytes"]
+                kwargs = {**kwargs, "max_bytes": min(max_bytes, plan.max_bytes) if max_bytes else plan.max_bytes}
+        try:
+            result = self._read_archive(archive, file, **kwargs)
+            result = self._add_columns(result, kwargs["columns"], file, None)
+            return self._cap_entries(result, kwargs["max_entry_bytes"])
+        except QueryCancelled:
+            return {**_err, "error": "Query cancelled", "cancelled": True}
+        finally:
+            if plan is not None:
+                self.planner.release(plan)
+
+    def _read_archive(
+        self,
+        archive: Archive,
+        file: str,
+        *,
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        since: Union[str, float, None],
+        until: Union[str, float, None],
+        max_bytes: int,
+        cancel,
+        before: Optional[int],
+        after: Optional[int],
+        fields: List[FieldFilter],
+        sort: str,
+        query: Optional[Query],
+        collapse: str,
+        **_ignored,
+    ) -> dict:
+        """Serve :meth:`read` from a columnar archive.
+
+        Blocks whose summary rules them out (time range, levels present)
+        are skipped unread; the level and time columns of the others
+        decide the matches, and entry text is decompressed only for text
+        filters, sorting, collapsing and the returned page.  *max_bytes*
+        limits the read to the newest blocks holding that much text.
+        """
+        _err = {"lines": [], "total": 0, "page": 1, "total_pages": 1}
+        parse = self._parser(file)
+        try:
+            since_ts = parse_time_bound(since)
+            until_ts = parse_time_bound(until)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        mask = archive.level_mask(level) if level else 0
+        lower = search.lower()
+        names = filter_fields(fields)
+
+        def text_matches(entry: str) -> bool:
+            if lower and lower not in entry.lower():
+                return False
+            if fields and not match_fields(fields, record_values(entry, names, parse)):
+                return False
+            if query is not None and not query.matches(entry, parse):
+                return False
+            return True
+
+        first_block = 0
+        if max_bytes:
+            budget = max_bytes
+            for i in range(len(archive.blocks) - 1, -1, -1):
+                budget -= archive.blocks[i].raw_bytes
+                if budget < 0:
+                    first_block = i + 1
+                    break
+        lo_entry = after + 1 if after is not None else 0
+        hi_entry = before if before is not None else archive.entries
+
+        # (block index, matching positions), oldest first
+        segments = []
+        with _stats.phase("filter"):
+            for i in range(first_block, len(archive.blocks)):
+                if level and not mask:
+                    break  # no entry has such a level
+                block = archive.blocks[i]
+                lo, hi = max(0, lo_entry - block.first), min(block.count, hi_entry - block.first)
+                if lo >= hi:
+                    continue
+                if cancel is not None:
+                    cancel.check()
+                positions = archive.matching(i, lo=lo, hi=hi, level_mask=mask, since=since_ts, until=until_ts)
+                if positions and (search or fields or query):
+                    texts = archive.texts(i)
+                    positions = [p for p in positions if text_matches(texts[p])]
+                if positions:
+                    segments.append((i, positions))
+        _stats.add("blocks_skipped", len(archive.blocks) - first_block - len(segments))
+
+        positional = not (sort or collapse)
+        if not positional:
+            # (entry number, text) pairs
+            entries = [
+                (archive.blocks[i].first + p, archive.texts(i)[p])
+                for i, positions in segments
+                for p in positions
+            ]
+            if sort:
+                segments = [(None, sort_entries(
+                    entries, sort, parse, lambda pair, names, parse: record_values(pair[1], names, parse)
+                ))]
+            else:
+                key = repeat_key(collapse)
+                segments = [(None, collapse_runs(entries, lambda pair: key(pair[1])))]
+        _stats.add("entries_matched", sum(len(positions) for _i, positions in segments))
+        runs: List[Tuple[str, int, str]] = []
+
+        def fetch(i: Optional[int], found: list) -> Tuple[List[str], List[int]]:
+            if i is not None:
+                texts = archive.texts(i)
+                first = archive.blocks[i].first
+                return [texts[p] for p in found], [first + p for p in found]
+            if collapse:
+                runs.extend((newest[1], count, oldest[1]) for newest, count, oldest in found)
+                found = [newest for newest, _count, _oldest in found]
+            return [text for _number, text in found], [number for number, _text in found]
+
+        result = self._paged(
+            segments, fetch, lines=lines, page=page, before=before, after=after, positional=positional
+        )
+        if before is None and after is None:
+            result["end"] = archive.entries
+        if collapse:
+            result["repeats"] = describe_runs(runs)
+        if first_block:
+            result["partial"] = True
+        return result
+
+    def _read_indexed(
+        self,
+        resolved: str,
+        *,
+        lines: int,
+        level: str,
+        page: int,
+        rotated: bool,
+        since: Union[str, float, None],
+        until: Union[str, float, None],
+        before: Optional[int],
+        after: Optional[int],
+        **_ignored,
+    ) -> Optional[dict]:
+        """Serve :meth:`read` from sidecar indexes, or return ``None``.
+
+        Used when every file read has a trusted sidecar (see
+        :func:`~python_log_viewer.handlers.open_index`).  Pages and time
+        bounds are located in the index, the level filter runs over its
+        level column, and only the text of the returned entries is read.
+        Levels and times are those of the logging records, not text
+        matches.  Entries appended past the last indexed one (by a writer
+        that does not index) are scanned, see :meth:`_unindexed_tail`.
+        """
+        paths = self.log_dir._rotation_chain(resolved) if rotated else [resolved]
+        if (before is not None or after is not None) and len(paths) != 1:
+            return None
+        indexes: List[LogIndex] = []
+        try:
+            for path in paths:
+                index = open_index(path)
+                if index is None:
+                    return None
+                indexes.append(index)
+            try:
+                since_ts = parse_time_bound(since)
+                until_ts = parse_time_bound(until)
+            except ValueError:
+                return None
+
+            # Matching record numbers per file, oldest file first, each
+            # followed by the matching (offset, entry) pairs past its index
+            segments: list = []
+            end = 0
+            with _stats.phase("filter"):
+                for path, index in zip(reversed(paths), reversed(indexes)):
+                    lo = index.seek_time(since_ts) if since_ts is not None else 0
+                    hi = index.seek_time(until_ts, right=True) if until_ts is not None else index.count
+                    if before is not None:
+                        hi = min(hi, index.seek_offset(before))
+                    if after is not None:
+                        lo = max(lo, index.seek_offset(after + 1))
+                    hi = max(lo, hi)
+                    found = index.matching(level, lo, hi) if level else range(lo, hi)
+                    segments.append(((path, index), found))
+                    tail = self._unindexed_tail(path, index, level, since_ts, until_ts, before, after)
+                    if tail is None:
+                        return None
+                    end, scanned = tail
+                    if scanned:
+                        segments.append(((path, None), scanned))
+            _stats.add("entries_matched", sum(len(found) for _key, found in segments))
+            _stats.cache("index", True)
+
+            def fetch(key: Tuple[str, Optional[LogIndex]], found: Sequence[Any]) -> Tuple[List[str], list]:
+                path, index = key
+                if index is None:
+                    texts = [entry for _start, entry in found]
+                    starts = [start for start, _entry in found]
+                else:
+                    if isinstance(found, range):
+                        records = index.records(found.start, found.stop)
+                    else:
+                        records = [index.record(i) for i in found]
+                    with _stats.phase("io"):
+                        texts = self._read_indexed_entries(path, records)
+                    starts = [start for start, _created, _length, _level in records]
+                if len(paths) > 1:
+                    segment = os.path.relpath(path, self.log_dir.path)
+                    return texts, [(segment, start) for start in starts]
+                return texts, starts
+
+            result = self._paged(
+                segments, fetch, lines=lines, page=page, before=before, after=after,
+                positional=len(paths) == 1,
+            )
+            if before is None and after is None and len(paths) == 1:
+                result["end"] = end
+            return result
+        finally:
+            for index in indexes:
+                index.close()
+
+    def _unindexed_tail(
+        self,
+        path: str,
+        index: LogIndex,
+        level: str,
+        since: Optional[float],
+        until: Optional[float],
+        before: Optional[int],
+        after: Optional[int],
+    ) -> Optional[Tuple[int, List[Tuple[int, str]]]]:
+        """Scan the entries of *path* after the last one *index* covers.
+
+        A process that logs to the file without the handler appends entries
+        the sidecar never sees.  They are grouped and filtered as in a scan
+        (levels and times read from the text; untimed entries kept) and
+        returned as ``(end, [(offset, entry), ...])``, *end* being the end
+        of the last complete line.  Returns ``None`` when there are more
+        than ``_MAX_READ_BYTES`` of them, for the regular read to handle.
+        """
+        source = open_source(path)
+        end = self._complete_end(source)
+        if end <= index.end:
+            return index.end, []
+        if end - index.end > self._MAX_READ_BYTES:
+            return None
+        upper = level.upper()
+        is_json = self._json_lines([source])
+        is_start = self._is_new_json_entry_start if is_json else self._is_new_entry_start
+        found = []
+        for offset, entry in self._iter_forward(source, index.end, end, None, is_start):
+            if upper and not (has_level(entry, upper) if is_json else upper in entry):
+                continue
+            if (before is not None and offset >= before) or (after is not None and offset <= after):
+                continue
+            if since is not None or until is not None:
+                ts = parse_timestamp(entry)
+                if ts is not None and ((since is not None and ts < since) or (until is not None and ts > until)):
+                    continue
+            found.append((offset, entry))
+        return end, found
+
+    @staticmethod
+    def _read_indexed_entries(path: str, records: list) -> List[str]:
+        """Read the text of the indexed *records* of the log at *path*.
+
+        Adjacent records are read together.
+        """
+        texts = []
+        with open(path, "rb") as f:
+            i = 0
+            while i < len(records):
+                j = i + 1
+                while j < len(records) and records[j][0] == records[j - 1][0] + records[j - 1][2]:
+                    j += 1
+                start = records[i][0]
+                f.seek(start)
+                data = f.read(records[j - 1][0] + records[j - 1][2] - start)
+                _stats.add("bytes_read", len(data))
+                for rec_start, _created, length, _level in records[i:j]:
+                    text = data[rec_start - start:rec_start - start + length].decode("utf-8", errors="replace")
+                    texts.append("\n".join(line.rstrip() for line in text.rstrip("\r\n").split("\n")))
+                i = j
+        return texts
+
+    @_stats.collected("read_merged")
+    def read_merged(
+        self,
+        files: Union[str, Sequence[str]],
+        *,
+        lines: int = 100,
+        level: str = "",
+        search: str = "",
+        page: int = 1,
+        after: Union[str, Dict[str, int], None] = None,
+        max_bytes: int = 0,
+        cancel=None,
+        max_entry_bytes: int = 0,
+        fields: Union[str, Sequence[str], None] = None,
+        columns: Union[str, Sequence[str], None] = None,
+        query: str = "",
+    ) -> dict:
+        """Return entries from several files merged by timestamp, newest page first.
+
+        Each file is read backwards lazily and a heap picks the newest
+        pending entry across files, so only as much of each file as the
+        requested page needs is read.  Entries without a timestamp inherit
+        the previous one from the same file.
+
+        Parameters
+        ----------
+        files:
+            File names relative to the log directory (a list or a
+            comma-separated string).
+        after:
+            A ``cursor`` from a previous response (dict or its JSON form).
+            Only entries appended after it are returned, which makes cheap
+            live tailing possible.
+        max_bytes:
+            Scan at most this many of the newest bytes, split evenly across
+            *files* (``0`` = no limit); sets ``"partial": True`` when it cuts
+            a file short.
+        cancel:
+            Optional :class:`~python_log_viewer.cancel.CancelToken`, as in
+            :meth:`read`.
+        max_entry_bytes:
+            Cut oversize entries, as in :meth:`read`.
+        fields / columns / query:
+            Field filters, columns and boolean query, as in :meth:`read`.
+
+        Returns
+        -------
+        dict
+            ``{"lines": [...], "sources": [...], "total": int, "page": int,
+            "total_pages": int, "has_more": bool, "cursor": {file: offset}}``
+            where ``sources[i]`` names the file ``lines[i]`` came from and
+            ``total`` counts the entries merged so far (a lower bound when
+            ``has_more`` is true).  Planner refusals carry ``"status"``
+            (and ``"retry_after"``) and cancelled merges ``"cancelled"``
+            exactly as in :meth:`read`, and so does ``"truncated"``.
+        """
+        _err = {"lines": [], "sources": [], "total": 0, "page": 1, "total_pages": 1}
+
+        if isinstance(files, str):
+            files = [f for f in files.split(",") if f]
+        if not files:
+            return {**_err, "error": "No files selected"}
+        if isinstance(after, str):
+            try:
+                after = json.loads(after) if after else None
+            except ValueError:
+                return {**_err, "error": "Invalid cursor"}
+        if after is not None and not isinstance(after, dict):
+            return {**_err, "error": "Invalid cursor"}
+
+        try:
+            fields = parse_field_filters(fields)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        columns = parse_columns(columns)
+        try:
+            query = compile_query(query) if query else None
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+
+        resolved = []
+        for name in files:
+            path = self.log_dir._safe_resolve(name)
+            if path is None:
+                return {**_err, "error": f"Invalid or missing file: {name}"}
+            if is_archive(path):
+                return {**_err, "error": f"Archives cannot be merged: {name}"}
+            resolved.append((name, path))
+
+        kwargs = dict(
+            lines=lines, level=level, search=search, page=page, after=after,
+            max_bytes=max_bytes, cancel=cancel, max_entry_bytes=max_entry_bytes, fields=fields,
+            columns=columns, query=query,
+        )
+        plan = None
+        if self.planner is not None:
+            # Unfiltered pages stop early; filtered or full reads may scan everything.
+            window = 0
+            if after is not None or (lines > 0 and not (level or search or fields or query)):
+                window = page * max(lines, 1) * self._TAIL_BYTES_PER_REQUESTED_LINE
+            plan, error = self._admit(
+                sum(self._estimate_scan_bytes([path], window) for _name, path in resolved)
+            )
+            if error is not None:
+                return {**_err, **error}
+            if plan.max_bytes:
+                kwargs["max_bytes"] = min(max_bytes, plan.max_bytes) if max_bytes else plan.max_bytes
+        try:
+            result = self._add_columns(self._read_merged(resolved, **kwargs), columns, None, None)
+            return self._cap_entries(result, max_entry_bytes)
+        except QueryCancelled:
+            return {**_err, "error": "Query cancelled", "cancelled": True}
+        finally:
+            if plan is not None:
+                self.planner.release(plan)
+
+    def _read_merged(
+        self,
+        resolved: List[Tuple[str, str]],
+        *,
+        lines: int,
+        level: str,
+        search: str,
+        page: int,
+        after: Optional[Dict[str, int]],
+        max_bytes: int,
+        cancel,
+        max_entry_bytes: int,
+        fields: List[FieldFilter],
+        columns: List[str],
+        query: Optional[Query],
+    ) -> dict:
+        _err = {"lines": [], "sources": [], "total": 0, "page": 1, "total_pages": 1}
+
+        if self.scan_worker is not None and after is None and (
+            lines <= 0 or level or search or fields or query
+        ):
+            return self.scan_worker.call(
+                "read_merged",
+                self.log_dir,
+                self.parallel_workers,
+                cancel=cancel,
+                files=[name for name, _path in resolved],
+                lines=lines,
+                level=level,
+                search=search,
+                page=page,
+                max_bytes=max_bytes,
+                max_entry_bytes=max_entry_bytes,
+                fields=[str(f) for f in fields],
+                columns=columns,
+                query=str(query or ""),
+            )
+
+        upper = level.upper()
+        lower = search.lower()
+        names = filter_fields(fields)
+
+        def timed(
+            entries: Iterator[Tuple[int, str]], name: str, path: str, is_json: bool
+        ) -> Iterator[Tuple[float, str]]:
+            ts = float("inf")
+            index = field_index(path) if fields else None
+            parse = self._parser(name)
+            for offset, entry in entries:
+                entry_ts = parse_timestamp(entry)
+                if entry_ts is not None:
+                    ts = entry_ts
+                if upper and not (has_level(entry, upper) if is_json else upper in entry):
+                    continue
+                if lower and lower not in entry.lower():
+                    continue
+                if index is not None and not match_fields(
+                    fields, index.values(offset, entry, names, parse)
+                ):
+                    continue
+                if query is not None and not query.matches(entry, parse):
+                    continue
+                yield ts, entry
+
+        cursor: Dict[str, int] = {}
+        iterators: List[Iterator[Tuple[float, str]]] = []
+        heap: List[Tuple[float, int, str]] = []
+        per_file = max_bytes // len(resolved) if max_bytes else 0
+        partial = False
+        try:
+            for idx, (name, path) in enumerate(resolved):
+                source = open_source(path)
+                end = self._complete_end(source)
+                floor = int((after or {}).get(name, 0))
+                if floor > end:
+                    floor = 0  # truncated or rotated since the cursor was issued
+                if per_file and end - floor > per_file:
+                    floor = self._line_start(source, end - per_file)
+                    partial = True
+                cursor[name] = end
+                is_json = self._json_lines([source])
+                is_start = self._is_new_json_entry_start if is_json else self._is_new_entry_start
+                iterators.append(
+                    timed(self._iter_backward(source, floor, end, cancel, is_start), name, path, is_json)
+                )
+                for ts, entry in itertools.islice(iterators[idx], 1):
+                    heapq.heappush(heap, (-ts, idx, entry))
+
+            page = max(1, page)
+            skip = (page - 1) * lines if lines > 0 else 0
+            picked: List[Tuple[str, str]] = []
+            consumed = 0
+            with _stats.phase("scan"):
+                while heap and (lines <= 0 or len(picked) < lines):
+                    _neg_ts, idx, entry = heapq.heappop(heap)
+                    consumed += 1
+                    if consumed > skip:
+                        picked.append((entry, resolved[idx][0]))
+                    for ts, nxt in itertools.islice(iterators[idx], 1):
+                        heapq.heappush(heap, (-ts, idx, nxt))
+        except Exception as exc:
+            return {**_err, "lines": [f"Error reading log file: {exc}"]}
+        _stats.add("entries_matched", consumed)
+
+        picked.reverse()  # oldest first, like read()
+        has_more = bool(heap)
+        if has_more:
+            total_pages = page + 1
+        else:
+            total_pages = max(1, -(-consumed // lines)) if lines > 0 else 1
+        result = {
+            "lines": [entry for entry, _name in picked],
+            "sources": [name for _entry, name in picked],
+            "total": consumed,
             "page": page,
             "total_pages": total_pages,
+            "has_more": has_more,
+            "cursor": cursor,
         }
+        if partial:
+            result["partial"] = True
+        return result
+
+    @_stats.collected("context")
+    def context(
+        self, file: str, offset: Union[str, int], *, before: int = 10, after: int = 10,
+        max_entry_bytes: int = 0,
+    ) -> dict:
+        """Return the entries around the entry starting at byte *offset*.
+
+        Parameters
+        ----------
+        file:
+            File name relative to the log directory.
+        offset:
+            Byte offset of an entry, as returned in ``"offsets"`` by
+            :meth:`read`; an offset inside an entry selects that entry.
+        before / after:
+            Number of entries to return before and after it (at most
+            ``_MAX_CONTEXT_ENTRIES`` each).
+        max_entry_bytes:
+            Cut oversize entries, as in :meth:`read`.
+
+        Only the blocks around *offset* are read, whatever the size of the
+        file; stream-only archives (bzip2, xz) are decompressed once up to
+        the end of the window.
+
+        Returns
+        -------
+        dict
+            ``{"lines": [...], "offsets": [...], "target": int,
+            "has_before": bool, "has_after": bool}`` where ``target`` is the
+            index of the entry at *offset* in ``lines``, or the same shape
+            with ``"error"`` on failure.
+        """
+        _err = {"lines": [], "offsets": [], "target": 0, "has_before": False, "has_after": False}
+
+        live = self.log_dir._live_source(file)
+        resolved = None if live is not None else self.log_dir._safe_resolve(file)
+        if live is None and resolved is None:
+            return {**_err, "error": "Invalid or missing file"}
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            return {**_err, "error": "Invalid offset"}
+        before = max(0, min(int(before), self._MAX_CONTEXT_ENTRIES))
+        after = max(0, min(int(after), self._MAX_CONTEXT_ENTRIES))
+
+        if live is not None:
+            records = live.records()
+            i = offset - records[0][SEQ] if records else -1
+            if not 0 <= i < len(records):
+                return {**_err, "error": "Offset out of range"}
+            picked = records[max(0, i - before):i + after + 1]
+            result = {
+                "lines": [record[TEXT] for record in picked],
+                "offsets": [record[SEQ] for record in picked],
+                "target": min(i, before),
+                "has_before": i > before,
+                "has_after": i + after + 1 < len(records),
+            }
+            return self._cap_entries(result, max_entry_bytes)
+
+        if is_archive(resolved):
+            try:
+                archive = open_archive(resolved)
+            except ValueError as exc:
+                return {**_err, "error": str(exc)}
+            if not 0 <= offset < archive.entries:
+                return {**_err, "error": "Offset out of range"}
+            lo, hi = max(0, offset - before), min(archive.entries, offset + after + 1)
+            result = {
+                "lines": archive.entry_range(lo, hi),
+                "offsets": list(range(lo, hi)),
+                "target": offset - lo,
+                "has_before": lo > 0,
+                "has_after": hi < archive.entries,
+            }
+            return self._cap_entries(result, max_entry_bytes)
+
+        try:
+            source = open_source(resolved)
+            is_start = self._entry_start([source])
+            if not source.seekable:
+                # One pass over a window wide enough for the usual entry
+                # sizes; the iterators below then work in memory.
+                margin = (before + after + 1) * self._TAIL_BYTES_PER_REQUESTED_LINE + self._BLOCK_BYTES
+                base = max(0, offset - margin)
+                data = source.read(base, offset + margin)
+                if base > 0:
+                    newline = data.find(b"\n")
+                    base, data = (base + newline + 1, data[newline + 1:]) if newline != -1 else (offset, b"")
+                source = BufferSource(data, base, source.compression)
+            low = getattr(source, "base", 0)
+            size = source.size
+            if not low <= offset < size:
+                return {**_err, "error": "Offset out of range"}
+            # Start from the entry containing *offset*, even mid-entry.
+            target = next(self._iter_backward(source, low, self._line_start(source, offset + 1), None, is_start), None)
+            if target is None:
+                return {**_err, "error": "Offset out of range"}
+            offset = target[0]
+            with _stats.phase("scan"):
+                older = list(itertools.islice(self._iter_backward(source, low, offset, None, is_start), before + 1))
+                newer = list(itertools.islice(self._iter_forward(source, offset, size, None, is_start), after + 2))
+        except Exception as exc:
+            return {**_err, "lines": [f"Error reading log file: {exc}"]}
+
+        has_before = len(older) > before or low > 0
+        older = older[:before]
+        older.reverse()
+        has_after = len(newer) > after + 1
+        picked = older + newer[:after + 1]
+        result = {
+            "lines": [entry for _offset, entry in picked],
+            "offsets": [pos for pos, _entry in picked],
+            "target": len(older),
+            "has_before": has_before,
+            "has_after": has_after,
+        }
+        return self._cap_entries(result, max_entry_bytes)
+
+    @_stats.collected("patterns")
+    def patterns(self, file: str, *, top: int = 20, level: str = "", cancel=None) -> dict:
+        """Return the most frequent message templates of *file*.
+
+        Entries are clustered into templates by a Drain-style miner (see
+        :mod:`python_log_viewer.patterns`) kept per file; each call only
+        feeds it the entries appended since the previous one.  Files with a
+        format (or JSON-lines entries) are clustered on their ``message``
+        field and counted under their ``level`` field.
+
+        Parameters
+        ----------
+        top:
+            Number of templates to return.
+        level:
+            Only return templates seen at this level, ordered by how often.
+        cancel:
+            Optional :class:`~python_log_viewer.cancel.CancelToken`; what
+            was mined before the cancellation is kept.
+
+        Returns
+        -------
+        dict
+            ``{"patterns": [{"template": str, "count": int, "levels":
+            {level: count}, "examples": [offset, ...]}, ...], "entries":
+            int, "clusters": int, "end": int}`` where ``examples`` are the
+            offsets of recent matching entries (for :meth:`context`),
+            ``entries`` counts the entries mined and ``end`` is the offset
+            mined up to.  ``"partial": True`` is set when the planner's
+            budget limited the first scan to the newest bytes.  Errors and
+            refusals are reported as in :meth:`read`.
+        """
+        _err = {"patterns": [], "entries": 0, "clusters": 0}
+
+        parser = self.log_dir.formats.parser_for(file)
+        live = self.log_dir._live_source(file)
+        if live is not None:
+            return self._live_patterns(live, parser, top, level, cancel)
+        resolved = self.log_dir._safe_resolve(file)
+        if resolved is None:
+            return {**_err, "error": "Invalid or missing file"}
+        index = pattern_index(resolved)
+        if is_archive(resolved):
+            return self._archive_patterns(resolved, index, parser, top, level, cancel)
+
+        plan = None
+        if self.planner is not None:
+            pending = max(0, os.path.getsize(resolved) - index.offset)
+            if index.offset == 0:
+                pending = self._estimate_scan_bytes([resolved], 0)
+            plan, error = self._admit(pending)
+            if error is not None:
+                return {**_err, **error}
+        try:
+            with index.lock:
+                source = open_source(resolved)
+                end = self._complete_end(source)
+                start = index.offset
+                if start == 0 and plan is not None and plan.max_bytes and end > plan.max_bytes:
+                    start = index.start = self._line_start(source, end - plan.max_bytes)
+                last = None
+                completed = False
+                is_start = self._entry_start([source])
+                try:
+                    with _stats.phase("scan"):
+                        for offset, entry in self._iter_forward(source, start, end, cancel, is_start):
+                            if last is None and start > 0 and not is_start(entry):
+                                # Continuation lines of an entry mined last time.
+                                last = offset
+                                continue
+                            record = parser(entry) if parser is not None else (
+                                parse_record(entry) if entry.startswith("{") else None
+                            )
+                            index.add(offset, entry, record)
+                            last = offset
+                    completed = True
+                finally:
+                    if completed:
+                        index.offset = max(start, end)
+                    elif last is not None:
+                        # Cancelled: resume after the last mined entry's first line.
+                        index.offset = self._line_start(source, last + 1)
+                result = {
+                    "patterns": index.miner.top(top, level),
+                    "entries": index.miner.entries,
+                    "clusters": len(index.miner),
+                    "end": index.offset,
+                }
+                if index.start > 0:
+                    result["partial"] = True
+                return result
+        except QueryCancelled:
+            return {**_err, "error": "Query cancelled", "cancelled": True}
+        except Exception as exc:
+            return {**_err, "error": f"Error reading log file: {exc}"}
+        finally:
+            if plan is not None:
+                self.planner.release(plan)
+
+    @staticmethod
+    def _live_patterns(live: RingBufferHandler, parser: Optional[Parser], top: int, level: str, cancel) -> dict:
+        """:meth:`patterns` of a ring buffer; offsets are sequence numbers."""
+        index = live.pattern_index
+        with index.lock:
+            records = live.records(index.offset)
+            try:
+                with _stats.phase("scan"):
+                    for n, record in enumerate(records):
+                        if cancel is not None and n % 1000 == 0:
+                            cancel.check()
+                        entry = record[TEXT]
+                        parsed = parser(entry) if parser is not None else (
+                            parse_record(entry) if entry.startswith("{") else None
+                        )
+                        if parsed is None:
+                            parsed = {"level": record[LEVEL]}
+                            if record[MESSAGE] >= 0:
+                                parsed["message"] = entry[record[MESSAGE]:]
+                        index.add(record[SEQ], entry, parsed)
+                        index.offset = record[SEQ] + 1
+            except QueryCancelled:
+                return {"patterns": [], "entries": 0, "clusters": 0, "error": "Query cancelled", "cancelled": True}
+            return {
+                "patterns": index.miner.top(top, level),
+                "entries": index.miner.entries,
+                "clusters": len(index.miner),
+                "end": index.offset,
+            }
+
+    @staticmethod
+    def _archive_patterns(resolved: str, index, parser: Optional[Parser], top: int, level: str, cancel) -> dict:
+        """:meth:`patterns` of an archive; offsets are entry numbers."""
+        _err = {"patterns": [], "entries": 0, "clusters": 0}
+        try:
+            archive = open_archive(resolved)
+        except ValueError as exc:
+            return {**_err, "error": str(exc)}
+        with index.lock:
+            try:
+                with _stats.phase("scan"):
+                    while index.offset < archive.entries:
+                        if cancel is not None:
+                            cancel.check()
+                        i = archive.block_of(index.offset)
+                        block = archive.blocks[i]
+                        texts = archive.texts(i)
+                        for p in range(index.offset - block.first, block.count):
+                            entry = texts[p]
+                            record = parser(entry) if parser is not None else (
+                                parse_record(entry) if entry.startswith("{") else None
+                            )
+                            index.add(block.first + p, entry, record)
+                        index.offset = block.first + block.count
+            except QueryCancelled:
+                return {**_err, "error": "Query cancelled", "cancelled": True}
+            return {
+                "patterns": index.miner.top(top, level),
+                "entries": index.miner.entries,
+                "clusters": len(index.miner),
+                "end": index.offset,
+            }
+
+    def _entry_end(self, source, start: int, end: int) -> int:
+        """Return the offset of the first entry start after *start* (or *end*).
+
+        Only the first bytes of each line are decoded, so finding the end
+        of a multi-megabyte entry does not build it in memory.
+        """
+        is_start = self._entry_start([source])
+        pos = start
+        while pos < end:
+            block = source.read(pos, min(end, pos + self._BLOCK_BYTES))
+            if not block:
+                break
+            newline = block.find(b"\n")
+            while newline != -1:
+                line_at = pos + newline + 1
+                if line_at >= end:
+                    return end
+                head = block[newline + 1:newline + 65]
+                if len(head) < 64:
+                    head = source.read(line_at, min(end, line_at + 64))
+                if is_start(head.decode("utf-8", errors="replace").rstrip()):
+                    return line_at
+                newline = block.find(b"\n", newline + 1)
+            pos += len(block)
+        return end
+
+    @_stats.collected("entry")
+    def entry(self, file: str, offset: Union[str, int], *, pretty: bool = False) -> dict:
+        """Return the whole entry starting at byte *offset*, for streaming.
+
+        The counterpart of *max_entry_bytes*: the offset comes from the
+        ``"truncated"`` list of a capped read.
+
+        Parameters
+        ----------
+        pretty:
+            Pretty-print the JSON payload starting at the entry's first
+            ``{`` or ``[``.  The entry is then built in memory; entries
+            that are not JSON are returned unchanged.
+
+        Returns
+        -------
+        dict
+            ``{"offset": int, "length": int, "chunks": iterator}`` where
+            *chunks* yields the entry as UTF-8 bytes, or ``{"error": str,
+            "status": int}`` on failure.
+        """
+        live = self.log_dir._live_source(file)
+        resolved = None if live is not None else self.log_dir._safe_resolve(file)
+        if live is None and resolved is None:
+            return {"error": "Invalid or missing file", "status": 404}
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            return {"error": "Invalid offset", "status": 400}
+        if live is not None:
+            records = live.records(offset)
+            if not records or records[0][SEQ] != offset:
+                return {"error": "Offset out of range", "status": 400}
+            text = records[0][TEXT]
+            data = (self._pretty_json(text) if pretty else text).encode("utf-8")
+            return {"offset": offset, "length": len(data), "chunks": iter([data])}
+        if is_archive(resolved):
+            try:
+                archive = open_archive(resolved)
+            except ValueError as exc:
+                return {"error": str(exc), "status": 400}
+            if not 0 <= offset < archive.entries:
+                return {"error": "Offset out of range", "status": 400}
+            text = archive.entry_range(offset, offset + 1)[0]
+            data = (self._pretty_json(text) if pretty else text).encode("utf-8")
+            return {"offset": offset, "length": len(data), "chunks": iter([data])}
+        source = open_source(resolved)
+        if not source.seekable:
+            return {"error": "Entries of bzip2/xz archives cannot be read by offset", "status": 400}
+        size = source.size
+        if not 0 <= offset < size:
+            return {"error": "Offset out of range", "status": 400}
+        stop = self._entry_end(source, offset, size)
+        if source.read(stop - 1, stop) == b"\n":
+            stop -= 1
+
+        def chunks() -> Iterator[bytes]:
+            step = 16 * self._BLOCK_BYTES
+            for pos in range(offset, stop, step):
+                yield source.read(pos, min(stop, pos + step))
+
+        if pretty:
+            data = self._pretty_json(source.read(offset, stop).decode("utf-8", errors="replace")).encode("utf-8")
+            return {"offset": offset, "length": len(data), "chunks": iter([data])}
+        return {"offset": offset, "length": stop - offset, "chunks": chunks()}
+
+    @staticmethod
+    def _pretty_json(text: str) -> str:
+        """Pretty-print the JSON payload starting at the first ``{`` or ``[`` of *text*."""
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        if not starts:
+            return text
+        first = min(starts)
+        try:
+            payload, stop_at = json.JSONDecoder().raw_decode(text, first)
+        except ValueError:
+            return text
+        return text[:first] + json.dumps(payload, indent=2, ensure_ascii=False) + text[stop_at:]
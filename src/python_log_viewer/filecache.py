@@ -0,0 +1,109 @@
+"""
+Per-file caches of state built from a growing log file.
+
+Several indexes are fed incrementally from the bytes of one file – the
+templates of :mod:`~python_log_viewer.patterns`, the parsed fields of
+:mod:`~python_log_viewer.structured` and the zone summaries of
+:mod:`~python_log_viewer.zonemap`.  They stay valid only as long as the file
+is the one they were built from, grown by appends.  A :class:`FileCache`
+holds one such object per path and starts it over when that is no longer
+so:
+
+* the file was replaced (a new device/inode: rotation by rename);
+* the file shrank (truncated);
+* the file was truncated and has grown back past the size seen last
+  (``copytruncate`` rotation between two requests) – same inode, larger
+  size, different content.  This is caught by fingerprints: the first bytes
+  of the file and the bytes just before the size seen last must be
+  unchanged.
+
+Each lookup therefore costs a ``stat`` and a few small reads.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, NamedTuple, Optional, Tuple, TypeVar
+
+from python_log_viewer import stats as _stats
+
+T = TypeVar("T")
+
+_FINGERPRINT_BYTES = 256
+
+
+class _Entry(NamedTuple):
+    identity: Tuple[int, int]
+    size: int
+    head: bytes  # the first bytes of the file
+    seam: bytes  # the bytes just before *size*
+    value: object
+
+
+def _seam(fd: int, size: int) -> bytes:
+    """Return the bytes of the file just before offset *size*."""
+    start = max(0, size - _FINGERPRINT_BYTES)
+    return os.pread(fd, size - start, start)
+
+
+class FileCache(Generic[T]):
+    """An LRU of objects built from files, dropped when a file's content changes.
+
+    Parameters
+    ----------
+    factory:
+        Creates the (empty) object for a file not cached yet.
+    max_entries:
+        Files kept; the least recently used one is dropped first.
+    name:
+        Cache name for :func:`python_log_viewer.stats.cache` (``None``: not
+        recorded).
+    """
+
+    def __init__(self, factory: Callable[[], T], max_entries: int, name: Optional[str] = None) -> None:
+        self.factory = factory
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> T:
+        """Return the object cached for *path*, or a new one if the file changed."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return self.factory()
+        try:
+            with self._lock:
+                entry = self._entries.get(path)
+                stat = os.fstat(fd)
+                identity, size = (stat.st_dev, stat.st_ino), stat.st_size
+                head = os.pread(fd, _FINGERPRINT_BYTES, 0)
+                hit = (
+                    entry is not None
+                    and entry.identity == identity
+                    and entry.size <= size
+                    and head.startswith(entry.head)
+                    and _seam(fd, entry.size) == entry.seam
+                )
+                value = entry.value if hit else self.factory()
+                self._entries[path] = _Entry(identity, size, head, _seam(fd, size), value)
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except OSError:
+            return self.factory()
+        finally:
+            os.close(fd)
+        if self.name is not None:
+            _stats.cache(self.name, hit)
+        return value  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        """Forget every cached object."""
+        with self._lock:
+            self._entries.clear()
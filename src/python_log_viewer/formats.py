@@ -0,0 +1,157 @@
+r"""
+Field extraction for plain-text log formats.
+
+A :class:`~python_log_viewer.core.LogDirectory` can be given one format per
+file glob; entries of matching files are then split into named fields that
+can be filtered, sorted and returned as columns exactly like the fields of
+JSON-lines entries (see :mod:`python_log_viewer.structured`)::
+
+    LogDirectory("./logs", formats={
+        "app*.log*": "%(asctime)s %(levelname)s [%(name)s] %(message)s",
+        "access.log*": r'(?P<ip>\S+) \S+ \S+ \[(?P<timestamp>[^]]+)\] "(?P<request>[^"]*)" (?P<status>\d+)',
+    })
+
+A format is either a regular expression with named groups or a
+:class:`logging.Formatter` format string (``%``, ``{`` or ``$`` style) – or
+the ``Formatter`` itself – which is turned into such an expression once.
+The standard record attributes map onto the column names ``timestamp``
+(``asctime``), ``level`` (``levelname``), ``logger`` (``name``) and
+``message``; other attributes keep their names.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import re
+from typing import Dict, Mapping, Optional, Pattern, Tuple, Union
+
+# logging.LogRecord attribute -> (column name, regular expression)
+_RECORD_FIELDS: Dict[str, Tuple[str, str]] = {
+    "asctime": ("timestamp", r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[,.]\d+)?"),
+    "created": ("created", r"\d+(?:\.\d+)?"),
+    "relativeCreated": ("relativeCreated", r"\d+(?:\.\d+)?"),
+    "msecs": ("msecs", r"\d+(?:\.\d+)?"),
+    "levelname": ("level", r"[A-Za-z]+"),
+    "levelno": ("levelno", r"\d+"),
+    "name": ("logger", r"\S+"),
+    "module": ("module", r"\S+"),
+    "filename": ("filename", r"\S+"),
+    "pathname": ("pathname", r"\S+"),
+    "funcName": ("funcName", r"\S+"),
+    "lineno": ("lineno", r"\d+"),
+    "process": ("process", r"\d+"),
+    "processName": ("processName", r"\S+"),
+    "thread": ("thread", r"\d+"),
+    "threadName": ("threadName", r"\S+"),
+    "message": ("message", r".*"),
+}
+
+_PLACEHOLDERS = {
+    "%": re.compile(r"%\((\w+)\)[-#0 +]*\d*(?:\.\d+)?[sdifrxXeEgGc]"),
+    "{": re.compile(r"\{(\w+)(?:[!:][^}]*)?\}"),
+    "$": re.compile(r"\$\{?(\w+)\}?"),
+}
+
+
+def formatter_regex(fmt: str, style: str = "%") -> str:
+    """Translate a :class:`logging.Formatter` format string into a regex source.
+
+    Literal text is matched exactly except that runs of spaces match any
+    number of spaces (to absorb padded fields such as ``%(levelname)-8s``).
+    The last field is greedy and spans continuation lines.
+    """
+    placeholder = _PLACEHOLDERS[style]
+    parts = []
+    seen = set()
+    pos = 0
+    for match in placeholder.finditer(fmt):
+        parts.append(_literal(fmt[pos:match.start()], style))
+        column, body = _RECORD_FIELDS.get(match.group(1), (match.group(1), r".*?"))
+        if column in seen:
+            parts.append(f"(?:{body})")
+        else:
+            seen.add(column)
+            parts.append(f"(?P<{column}>{body})")
+        pos = match.end()
+    parts.append(_literal(fmt[pos:], style))
+    return " *" + "".join(parts)
+
+
+def _literal(text: str, style: str) -> str:
+    if style == "%":
+        text = text.replace("%%", "%")
+    elif style == "{":
+        text = text.replace("{{", "{").replace("}}", "}")
+    else:
+        text = text.replace("$$", "$")
+    return " +".join(re.escape(chunk) for chunk in re.split(r" +", text)) if text else ""
+
+
+def format_regex(spec: Union[str, logging.Formatter]) -> str:
+    """Return the regex source for one format *spec* (see the module docs)."""
+    if isinstance(spec, logging.Formatter):
+        style = next(
+            (key for key, (cls, _default) in logging._STYLES.items() if type(spec._style) is cls), "%"
+        )
+        return formatter_regex(spec._fmt or "%(message)s", style)
+    if "(?P<" in spec:
+        return spec
+    for style in ("%", "{", "$"):
+        if _PLACEHOLDERS[style].search(spec):
+            return formatter_regex(spec, style)
+    raise ValueError(f"Not a log format or named-group regex: {spec!r}")
+
+
+class RegexParser:
+    """Callable turning an entry into its named groups (``None`` if no match).
+
+    A plain class (rather than a closure) so it can be sent to the parallel
+    search's worker processes.
+    """
+
+    def __init__(self, pattern: Pattern[str]) -> None:
+        self.pattern = pattern
+
+    def __call__(self, entry: str) -> Optional[dict]:
+        match = self.pattern.match(entry)
+        return match.groupdict() if match else None
+
+
+class LogFormats:
+    """Formats of the files in a log directory, by file glob.
+
+    Parameters
+    ----------
+    formats:
+        ``{glob: format}``; the first glob matching a file's relative path
+        or base name wins.  Formats are compiled once, here.
+
+    Raises
+    ------
+    ValueError
+        If a format is neither a named-group regex nor a format string.
+    """
+
+    def __init__(self, formats: Optional[Mapping[str, Union[str, logging.Formatter]]] = None) -> None:
+        # (glob, regex source) pairs: hashable and picklable, used to rebuild
+        # the formats in a sidecar worker process.
+        self.spec: Tuple[Tuple[str, str], ...] = tuple(
+            (glob, format_regex(fmt)) for glob, fmt in (formats or {}).items()
+        )
+        self._parsers = [
+            (glob, RegexParser(re.compile(source, re.DOTALL))) for glob, source in self.spec
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.spec)
+
+    def parser_for(self, name: str) -> Optional[RegexParser]:
+        """Return the parser for the file *name* (relative path), if any."""
+        base = name.replace("\\", "/").rsplit("/", 1)[-1]
+        for glob, parser in self._parsers:
+            if fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(base, glob):
+                return parser
+        return None
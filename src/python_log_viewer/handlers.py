@@ -0,0 +1,508 @@
+"""
+``logging`` handlers that feed the viewer directly.
+
+Live records
+------------
+
+:class:`RingBufferHandler` keeps the newest records of the current process
+in memory.  Every :class:`~python_log_viewer.core.LogDirectory` of the
+process lists each such handler as a virtual file (named after the
+handler, ``"live"`` by default), and :class:`~python_log_viewer.core.LogReader`
+serves it from memory without touching the filesystem::
+
+    import logging
+    from python_log_viewer.handlers import RingBufferHandler
+
+    logging.getLogger().addHandler(RingBufferHandler(max_bytes=8 * 1024 * 1024))
+
+Records are kept formatted, together with their level, creation time,
+logger name and where the message starts, so level filters, time ranges
+and the ``level``, ``logger``, ``created`` and ``message`` fields (named
+as in :mod:`python_log_viewer.formats`) need no parsing.  Sequence numbers take the place of byte offsets
+(for cursors, :meth:`~python_log_viewer.core.LogReader.context` and
+:meth:`~python_log_viewer.core.LogReader.entry`).
+
+Indexed log files
+-----------------
+
+:class:`IndexedRotatingFileHandler` is a drop-in
+:class:`logging.handlers.RotatingFileHandler` that also appends, for every
+record, a fixed-size entry to a sidecar file (``app.log.lvidx``): the
+record's byte offset and length in the log, its creation time and its
+level.  Sidecars are rotated together with their logs.  When a sidecar can
+be trusted (see :func:`open_index`), :class:`~python_log_viewer.core.LogReader`
+pages, level-filters and time-seeks the log through it, reading only the
+text of the entries it returns.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import logging.handlers
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from python_log_viewer.patterns import PatternIndex
+from python_log_viewer.structured import Parser, parse_record, record_values
+
+#: Format of records when the handler has no formatter of its own; the
+#: viewer recognises its entry starts, levels and timestamps.
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s: %(message)s"
+
+# A buffered record: (sequence number, created, level name, logger name,
+# formatted text, index of the message in the text or -1)
+LiveRecord = Tuple[int, float, str, str, str, int]
+SEQ, CREATED, LEVEL, LOGGER, TEXT, MESSAGE = range(6)
+
+# Bookkeeping per record (tuple, deque slot), counted against max_bytes
+_RECORD_OVERHEAD = 120
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the newest records in memory, bounded by size.
+
+    Parameters
+    ----------
+    name:
+        Name the buffer is listed under by :meth:`LogDirectory.list_files
+        <python_log_viewer.core.LogDirectory.list_files>`.  A real file of
+        the same name is hidden by it.
+    max_bytes:
+        Approximate memory for the formatted records; the oldest are dropped
+        beyond it.
+    level:
+        Handler level, as for :class:`logging.Handler`.
+    register:
+        List the buffer in the process's log directories (see
+        :func:`live_sources`) until :meth:`close` is called.
+    """
+
+    def __init__(
+        self,
+        name: str = "live",
+        max_bytes: int = 8 * 1024 * 1024,
+        level: int = logging.NOTSET,
+        *,
+        register: bool = True,
+    ) -> None:
+        super().__init__(level)
+        self.name = name
+        self.max_bytes = max(1, max_bytes)
+        self.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        self._records: Deque[LiveRecord] = deque()
+        self._bytes = 0
+        self._next_seq = 0
+        self._modified = 0.0
+        # Templates mined from the buffer; offsets are sequence numbers.
+        self.pattern_index = PatternIndex()
+        if register:
+            _register(self)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            text = self.format(record).rstrip("\n")
+        except Exception:
+            self.handleError(record)
+            return
+        message = getattr(record, "message", "")  # set by Formatter.format()
+        start = text.find(message) if message else -1
+        cost = len(text) + _RECORD_OVERHEAD
+        # emit() runs with the handler lock held (see logging.Handler.handle)
+        self._records.append((self._next_seq, record.created, record.levelname, record.name, text, start))
+        self._next_seq += 1
+        self._bytes += cost
+        self._modified = record.created
+        while self._bytes > self.max_bytes and len(self._records) > 1:
+            self._bytes -= len(self._records.popleft()[TEXT]) + _RECORD_OVERHEAD
+
+    # ---- reading --------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes held."""
+        return self._bytes
+
+    @property
+    def modified(self) -> float:
+        """Creation time of the newest record (``0.0`` when empty)."""
+        return self._modified
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self, since_seq: int = 0) -> List[LiveRecord]:
+        """Return the buffered records with sequence numbers from *since_seq*, oldest first."""
+        with self.lock:
+            if not self._records:
+                return []
+            skip = since_seq - self._records[0][SEQ]
+            if skip <= 0:
+                return list(self._records)
+            return list(itertools.islice(self._records, skip, None))
+
+    def tail(self, count: int) -> Tuple[List[LiveRecord], int]:
+        """Return ``(newest count records oldest first, records held)``.
+
+        Only the returned records are touched, whatever the buffer size.
+        """
+        with self.lock:
+            newest = list(itertools.islice(reversed(self._records), count))
+            held = len(self._records)
+        newest.reverse()
+        return newest, held
+
+    def end(self) -> int:
+        """Sequence number the next record will get."""
+        return self._next_seq
+
+    def clear(self) -> None:
+        with self.lock:
+            self._records.clear()
+            self._bytes = 0
+            self.pattern_index = PatternIndex()
+
+    def close(self) -> None:
+        _unregister(self)
+        super().close()
+
+
+def record_fields(record: LiveRecord, names: Sequence[str], parse: Parser = parse_record) -> Dict[str, Any]:
+    """Return the fields *names* of a buffered record.
+
+    ``level``, ``logger``, ``created`` and ``message`` come from the record
+    itself; other fields are parsed from its text with *parse*.
+    """
+    known = {"level": record[LEVEL], "logger": record[LOGGER], "created": record[CREATED]}
+    if record[MESSAGE] >= 0:
+        known["message"] = record[TEXT][record[MESSAGE]:]
+    other = [name for name in names if name not in known]
+    values = record_values(record[TEXT], other, parse) if other else {}
+    return {name: known[name] if name in known else values[name] for name in names}
+
+
+# ---------------------------------------------------------------------------
+# Registry of the process's live sources
+# ---------------------------------------------------------------------------
+
+_live: Dict[str, RingBufferHandler] = {}
+_live_lock = threading.Lock()
+
+
+def _register(handler: RingBufferHandler) -> None:
+    with _live_lock:
+        _live[handler.name] = handler
+
+
+def _unregister(handler: RingBufferHandler) -> None:
+    with _live_lock:
+        if _live.get(handler.name) is handler:
+            del _live[handler.name]
+
+
+def live_sources() -> Dict[str, RingBufferHandler]:
+    """Return ``{name: handler}`` of the registered ring buffers."""
+    with _live_lock:
+        return dict(_live)
+
+
+def live_source(name: str) -> Optional[RingBufferHandler]:
+    with _live_lock:
+        return _live.get(name)
+
+
+# ---------------------------------------------------------------------------
+# Sidecar-indexed log files
+# ---------------------------------------------------------------------------
+
+#: Suffix of sidecar index files; :class:`~python_log_viewer.core.LogDirectory`
+#: does not list them.
+INDEX_SUFFIX = ".lvidx"
+
+_INDEX_MAGIC = b"LVIDX\x00\x01\x00"
+# magic, st_dev and st_ino of the log, offset of the first indexed entry
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+# start offset, created, length, levelno (24 bytes, so columns can be sliced)
+_INDEX_RECORD = struct.Struct("<QdIB3x")
+_LEVEL_AT = 20  # offset of levelno inside a record
+
+IndexRecord = Tuple[int, float, int, int]
+
+
+def index_path(log_path: str) -> str:
+    """Return the path of the sidecar index of the log at *log_path*."""
+    return log_path + INDEX_SUFFIX
+
+
+class IndexedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """A :class:`~logging.handlers.RotatingFileHandler` that indexes its records.
+
+    Takes the same arguments.  Besides the log, each record is described in
+    the sidecar :func:`index_path` by its byte offset, length, creation time
+    and level number; the sidecars are rotated (``app.log.1.lvidx`` …)
+    whenever the logs are.
+
+    The sidecar starts over whenever the log is changed behind the
+    handler's back (truncated, replaced or appended to by another writer).
+    A log that already had content when the handler first opened it is
+    indexed from its next rotation on.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._index = None
+        self._index_end = 0
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        stream = super()._open()
+        self._open_index(stream)
+        return stream
+
+    def _open_index(self, stream) -> None:
+        """Open the sidecar of *stream* for appending, or start a new one."""
+        self._close_index()
+        st = os.fstat(stream.fileno())
+        try:
+            index = open(index_path(self.baseFilename), "r+b")
+        except OSError:
+            self._reset_index(st, st.st_size)
+            return
+        try:
+            magic, dev, ino, base = _INDEX_HEADER.unpack(index.read(_INDEX_HEADER.size))
+            count = (os.fstat(index.fileno()).st_size - _INDEX_HEADER.size) // _INDEX_RECORD.size
+            end = base
+            if count:
+                index.seek(_INDEX_HEADER.size + (count - 1) * _INDEX_RECORD.size)
+                start, _created, length, _level = _INDEX_RECORD.unpack(index.read(_INDEX_RECORD.size))
+                end = start + length
+            if magic == _INDEX_MAGIC and (dev, ino) == (st.st_dev, st.st_ino) and end == st.st_size:
+                index.seek(_INDEX_HEADER.size + count * _INDEX_RECORD.size)
+                index.truncate()  # a record cut short by a crash
+                self._index, self._index_end = index, end
+                return
+        except (OSError, struct.error):
+            pass
+        index.close()
+        self._reset_index(st, st.st_size)
+
+    def _reset_index(self, st: os.stat_result, base: int) -> None:
+        """Replace the sidecar with an empty one covering the log from *base*."""
+        self._close_index()
+        path = index_path(self.baseFilename)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as out:
+                out.write(_INDEX_HEADER.pack(_INDEX_MAGIC, st.st_dev, st.st_ino, base))
+            # A new file, so that readers notice the change even at equal size
+            os.replace(tmp, path)
+            self._index = open(path, "ab")
+        except OSError:
+            self._index = None
+            return
+        self._index_end = base
+
+    def _close_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _log_size(self) -> int:
+        if self.stream is not None:
+            return os.fstat(self.stream.fileno()).st_size
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            start = self._log_size()
+            logging.FileHandler.emit(self, record)
+            if self.stream is None:
+                return
+            end = self._log_size()
+            if end <= start:  # not written (the error was handled by StreamHandler.emit)
+                return
+            if start != self._index_end or self._index is None:
+                self._reset_index(os.fstat(self.stream.fileno()), start)
+                if self._index is None:
+                    return
+            self._index.write(
+                _INDEX_RECORD.pack(start, record.created, end - start, min(max(record.levelno, 0), 255))
+            )
+            self._index.flush()
+            self._index_end = end
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:
+        # Rotate the sidecars first: reopening the log opens its new sidecar.
+        self._close_index()
+        if self.backupCount > 0:
+            for i in range(self.backupCount - 1, 0, -1):
+                sfn = index_path(self.rotation_filename("%s.%d" % (self.baseFilename, i)))
+                dfn = index_path(self.rotation_filename("%s.%d" % (self.baseFilename, i + 1)))
+                if os.path.exists(sfn):
+                    if os.path.exists(dfn):
+                        os.remove(dfn)
+                    os.rename(sfn, dfn)
+            dfn = index_path(self.rotation_filename(self.baseFilename + ".1"))
+            if os.path.exists(dfn):
+                os.remove(dfn)
+            if os.path.exists(index_path(self.baseFilename)):
+                os.rename(index_path(self.baseFilename), dfn)
+        super().doRollover()
+        if self.backupCount > 0:
+            # A rotator that rewrites the file (e.g. compresses it) leaves an
+            # index that no longer applies.
+            rotated = self.rotation_filename(self.baseFilename + ".1")
+            index = open_index(rotated)
+            if index is None:
+                try:
+                    os.remove(index_path(rotated))
+                except OSError:
+                    pass
+            else:
+                index.close()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self._close_index()
+        finally:
+            self.release()
+        super().close()
+
+
+class LogIndex:
+    """A trusted sidecar index, open for reading; see :func:`open_index`.
+
+    Records are numbered from ``0`` (the oldest entry of the log) to
+    ``count - 1``; each is ``(start offset, created, length, levelno)``.
+    """
+
+    def __init__(self, handle, count: int, identity: Tuple[int, int], end: int) -> None:
+        self._handle = handle
+        self.count = count
+        self.identity = identity
+        self.end = end  # offset the last indexed entry ends at
+
+    def __enter__(self) -> "LogIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def _raw(self, lo: int, hi: int) -> bytes:
+        self._handle.seek(_INDEX_HEADER.size + lo * _INDEX_RECORD.size)
+        return self._handle.read((hi - lo) * _INDEX_RECORD.size)
+
+    def record(self, i: int) -> IndexRecord:
+        return _INDEX_RECORD.unpack(self._raw(i, i + 1))
+
+    def records(self, lo: int, hi: int) -> List[IndexRecord]:
+        """Return records ``lo`` to ``hi - 1`` (one read)."""
+        if hi <= lo:
+            return []
+        return list(_INDEX_RECORD.iter_unpack(self._raw(lo, hi)))
+
+    def _bisect(self, value: float, field: int, right: bool) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = self.record(mid)[field]
+            if key < value or (right and key == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def seek_time(self, ts: float, right: bool = False) -> int:
+        """Return the first record created at or after *ts* (after it, with *right*).
+
+        Records are written in order, so this is a binary search reading
+        about ``log2(count)`` records.
+        """
+        return self._bisect(ts, 1, right)
+
+    def seek_offset(self, offset: int) -> int:
+        """Return the first record starting at or after byte *offset*."""
+        return self._bisect(offset, 0, False)
+
+    def levels(self) -> bytes:
+        """Return the level numbers of all records, one byte each.
+
+        Cached per sidecar; later calls only read the records appended since.
+        """
+        with _levels_lock:
+            cached = _levels.get(self._handle.name)
+            if cached is None or cached[0] != self.identity or len(cached[1]) > self.count:
+                cached = (self.identity, bytearray())
+            levels = cached[1]
+            if len(levels) < self.count:
+                levels += self._raw(len(levels), self.count)[_LEVEL_AT::_INDEX_RECORD.size]
+            _levels[self._handle.name] = cached
+            _levels.move_to_end(self._handle.name)
+            while len(_levels) > _MAX_CACHED_LEVELS:
+                _levels.popitem(last=False)
+            return bytes(levels[:self.count])
+
+    def matching(self, level: str, lo: int, hi: int) -> List[int]:
+        """Return the records in ``[lo, hi)`` whose level name contains *level*."""
+        upper = level.upper()
+        codes = [code for code in range(256) if upper in logging.getLevelName(code).upper()]
+        if not codes:
+            return []
+        pattern = re.compile(b"[" + b"".join(re.escape(bytes([code])) for code in codes) + b"]")
+        return [match.start() for match in pattern.finditer(self.levels(), lo, hi)]
+
+
+_MAX_CACHED_LEVELS = 64
+_levels: "OrderedDict[str, Tuple[Tuple[int, int], bytearray]]" = OrderedDict()
+_levels_lock = threading.Lock()
+
+
+def open_index(log_path: str) -> Optional[LogIndex]:
+    """Return the sidecar index of *log_path*, or ``None`` when it cannot be trusted.
+
+    The sidecar must have been written for this very file (same device and
+    inode), cover it from its first byte, and its last entry must end
+    within the file.  Bytes after that entry – a record being written, or
+    entries appended by a writer that does not index – are not covered;
+    :class:`~python_log_viewer.core.LogReader` scans the complete lines
+    among them.
+    """
+    try:
+        st = os.stat(log_path)
+        handle = open(index_path(log_path), "rb")
+    except OSError:
+        return None
+    try:
+        magic, dev, ino, base = _INDEX_HEADER.unpack(handle.read(_INDEX_HEADER.size))
+        if magic != _INDEX_MAGIC or (dev, ino) != (st.st_dev, st.st_ino) or base != 0:
+            raise ValueError("stale index")
+        ist = os.fstat(handle.fileno())
+        count = (ist.st_size - _INDEX_HEADER.size) // _INDEX_RECORD.size
+        index = LogIndex(handle, count, (ist.st_dev, ist.st_ino), 0)
+        if count:
+            start, _created, length, _level = index.record(count - 1)
+            index.end = start + length
+        if index.end > st.st_size:
+            raise ValueError("index past the end of the log")
+        return index
+    except (OSError, ValueError, struct.error):
+        handle.close()
+        return None
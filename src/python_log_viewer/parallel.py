@@ -0,0 +1,283 @@
+"""
+Parallel whole-file search for large, uncompressed log files.
+
+The file is split into byte ranges whose boundaries are moved forward to the
+next entry start, so no multi-line entry straddles two ranges.  Ranges are
+scanned by a shared :class:`~concurrent.futures.ProcessPoolExecutor` (the GIL
+would serialise threads), newest range first; once enough matches for the
+requested page have been collected the remaining ranges are cancelled.
+
+Inside a worker the raw bytes are searched for the needle first and only the
+entries around each hit are decoded and grouped, which is what makes a scan
+of a multi-GB file proportional to its size rather than to its line count.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.query import Query
+from python_log_viewer.sources import PlainSource
+from python_log_viewer.structured import (
+    FieldFilter,
+    Parser,
+    filter_fields,
+    has_level,
+    json_lines,
+    match_fields,
+    parse_record,
+    record_values,
+)
+
+_RANGE_BYTES = 32 * 1024 * 1024
+_ALIGN_PROBE_BYTES = 64 * 1024
+_CANCEL_POLL_SECONDS = 0.1
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the process-wide pool for *workers* processes, creating it once.
+
+    Workers are spawned rather than forked: the viewer usually runs inside a
+    multi-threaded web server, where forking can inherit held locks.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pools[workers] = pool
+        return pool
+
+
+def default_workers() -> int:
+    """Return the number of CPUs available to this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not on Linux
+        return os.cpu_count() or 1
+
+
+def _is_entry_start(line: str, json_lines: bool = False) -> bool:
+    from python_log_viewer.core import LogReader
+
+    return LogReader._is_new_entry_start(line, json_lines)
+
+
+# ---------------------------------------------------------------------------
+# Range splitting
+# ---------------------------------------------------------------------------
+
+
+def _align(fh, pos: int, end: int, is_start: Callable[[str], bool]) -> int:
+    """Return the offset of the first entry start at or after *pos*."""
+    fh.seek(max(0, pos - 1))
+    if pos > 0 and fh.read(1) != b"\n":
+        fh.readline()  # finish the partial line
+    offset = fh.tell()
+    at_line_start = True
+    while offset < end:
+        line = fh.readline(_ALIGN_PROBE_BYTES)
+        if not line:
+            break
+        if at_line_start and is_start(line.decode("utf-8", errors="replace").rstrip()):
+            return offset
+        # Very long lines come back in pieces; only a piece that follows a
+        # newline starts a line.
+        at_line_start = line.endswith(b"\n")
+        offset += len(line)
+    return end
+
+
+def split_ranges(
+    path: str, start: int, end: int, range_bytes: int = _RANGE_BYTES, json_lines: bool = False
+) -> List[Tuple[int, int]]:
+    """Split ``[start, end)`` of *path* into entry-aligned ranges."""
+    is_start = functools.partial(_is_entry_start, json_lines=json_lines)
+    bounds = [start]
+    with open(path, "rb") as fh:
+        pos = start + range_bytes
+        while pos < end:
+            aligned = _align(fh, pos, end, is_start)
+            if aligned > bounds[-1] and aligned < end:
+                bounds.append(aligned)
+            pos = max(pos, aligned) + range_bytes
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+def _entry_bounds(data: bytes, pos: int, is_start: Callable[[str], bool]) -> Tuple[int, int]:
+    """Return ``(start, end)`` of the entry containing byte *pos* of *data*."""
+    start = data.rfind(b"\n", 0, pos) + 1
+    while start > 0:
+        line_end = data.find(b"\n", start)
+        line = data[start:line_end if line_end != -1 else len(data)]
+        if is_start(line.decode("utf-8", errors="replace").rstrip()):
+            break
+        start = data.rfind(b"\n", 0, start - 1) + 1
+    end = data.find(b"\n", pos)
+    while end != -1 and end + 1 < len(data):
+        next_end = data.find(b"\n", end + 1)
+        line = data[end + 1:next_end if next_end != -1 else len(data)]
+        if is_start(line.decode("utf-8", errors="replace").rstrip()):
+            break
+        end = next_end
+    return start, len(data) if end == -1 else end
+
+
+def scan_range(
+    path: str, start: int, end: int, level: str, search: str, limit: int,
+    fields: Sequence[FieldFilter] = (), parse: Parser = parse_record, query: Optional[Query] = None,
+    json_lines: bool = False,
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """Scan ``[start, end)`` of *path* for entries matching *level*, *search* and *fields*.
+
+    Uses the same matching rules as :meth:`LogReader.read` (level is a
+    case-sensitive substring, or in a *json_lines* file a case-insensitive
+    one of the ``level`` field; search a case-insensitive one, *fields* are
+    field filters on the fields *parse* extracts, *query* a compiled
+    :class:`~python_log_viewer.query.Query`; a line starting with ``{``
+    begins an entry only when *json_lines*).  Returns the
+    number of matching entries and the last *limit* of them (all when
+    *limit* is ``0``) as ``(offset, entry)`` pairs.
+    """
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+
+    upper = level.upper()
+    lower = search.lower()
+    # Locate candidates on raw bytes; ASCII-lowering is only a valid
+    # prefilter for ASCII needles, otherwise every entry is a candidate.
+    if lower and lower.isascii():
+        haystack, needle = data.lower(), lower.encode()
+    elif upper and upper.isascii():
+        haystack, needle = data.upper() if json_lines else data, upper.encode()
+    elif query is not None and query.needle.isascii():
+        haystack, needle = data.lower(), query.needle.encode()
+    else:
+        haystack, needle = data, b""
+
+    names = filter_fields(fields)
+    is_start = functools.partial(_is_entry_start, json_lines=json_lines)
+    count = 0
+    hits: Deque[Tuple[int, str]] = deque(maxlen=limit or None)
+    pos = haystack.find(needle)
+    while pos != -1 and pos < len(data):
+        entry_start, entry_end = _entry_bounds(data, pos, is_start)
+        text = "\n".join(
+            line.rstrip()
+            for line in data[entry_start:entry_end].decode("utf-8", errors="replace").split("\n")
+        )
+        if (
+            (not upper or (has_level(text, upper) if json_lines else upper in text))
+            and (not lower or lower in text.lower())
+            and (not fields or match_fields(fields, record_values(text, names, parse)))
+            and (query is None or query.matches(text, parse))
+        ):
+            count += 1
+            hits.append((start + entry_start, text))
+        pos = haystack.find(needle, entry_end + 1)
+    return count, list(hits)
+
+
+# ---------------------------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------------------------
+
+
+def parallel_search(
+    path: str,
+    start: int,
+    end: int,
+    *,
+    level: str,
+    search: str,
+    needed: int,
+    workers: int,
+    cancel=None,
+    fields: Sequence[FieldFilter] = (),
+    parse: Parser = parse_record,
+    query: Optional[Query] = None,
+) -> Tuple[int, List[Tuple[int, str]], bool]:
+    """Search ``[start, end)`` of *path* newest range first across *workers*.
+
+    Stops submitting (and cancels queued) ranges once *needed* matches have
+    been found; ``needed=0`` scans everything.  Returns ``(count, hits,
+    complete)`` where *hits* are the newest matches in file order, at most
+    *needed* of them, and *complete* tells whether the whole range was
+    scanned (so *count* is exact).
+
+    A cancelled *cancel* token drops the queued ranges and raises
+    :class:`~python_log_viewer.cancel.QueryCancelled`; ranges already
+    running in a worker finish on their own.
+    """
+    is_json = bool(json_lines(PlainSource(path)))
+    ranges = split_ranges(path, start, end, json_lines=is_json)
+    pool = _get_pool(workers)
+    pending = list(reversed(ranges))  # newest first
+    in_flight: Deque[Future] = deque()
+    sizes: Deque[int] = deque()  # bytes of the ranges in flight
+    count = 0
+    newest_first: List[List[Tuple[int, str]]] = []
+
+    def submit() -> None:
+        while pending and len(in_flight) < workers * 2:
+            lo, hi = pending.pop(0)
+            in_flight.append(pool.submit(
+                scan_range, path, lo, hi, level, search, needed, tuple(fields), parse, query, is_json
+            ))
+            sizes.append(hi - lo)
+
+    submit()
+    while in_flight:
+        if cancel is not None:
+            while not in_flight[0].done():
+                if cancel.cancelled:
+                    for future in in_flight:
+                        future.cancel()
+                    cancel.check()
+                wait([in_flight[0]], timeout=_CANCEL_POLL_SECONDS)
+        try:
+            range_count, range_hits = in_flight.popleft().result()
+            _stats.add("bytes_read", sizes.popleft())
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start afresh next time.
+            with _pools_lock:
+                if _pools.get(workers) is pool:
+                    del _pools[workers]
+            raise
+        count += range_count
+        _stats.add("entries_matched", range_count)
+        newest_first.append(range_hits)
+        if needed and count >= needed:
+            break
+        submit()
+    complete = not in_flight and not pending
+    for future in in_flight:
+        future.cancel()
+
+    hits: List[Tuple[int, str]] = []
+    for range_hits in reversed(newest_first):
+        hits.extend(range_hits)
+    if needed:
+        hits = hits[-needed:]
+    return count, hits, complete
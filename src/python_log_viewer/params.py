@@ -0,0 +1,34 @@
+"""
+Query-parameter parsing shared by the HTTP integrations.
+
+The stdlib server and the Flask and Django integrations read the same
+integer parameters (``lines``, ``page``, ``before``, ``after``, ``top``,
+``max_entry_bytes``) from their query strings; a malformed value is the
+client's error and is answered with HTTP 400, never a 500.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+from typing import Mapping
+
+
+class ParameterError(ValueError):
+    """A malformed query parameter (answered with HTTP 400)."""
+
+
+def int_param(args: Mapping[str, str], name: str, default: int) -> int:
+    """Return the integer query parameter *name* of *args*.
+
+    A missing or empty parameter gives *default*; anything else that is not
+    an integer raises :class:`ParameterError` (``"<name> must be an
+    integer"``).
+    """
+    value = args.get(name, "")
+    if value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ParameterError(f"{name} must be an integer") from None
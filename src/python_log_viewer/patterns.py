@@ -0,0 +1,212 @@
+"""
+Log-template mining ("top error patterns").
+
+Entries are clustered into templates with a streaming parser in the style
+of Drain (He et al., 2017): the first line of an entry, without its
+timestamp, is split into tokens and tokens that are UUIDs, hex values, IP
+addresses or numbers are masked; entries with the same number of tokens and
+the same first token are compared token by token with the templates seen so
+far, and an entry similar enough to a template is merged into it (differing
+tokens become ``<*>``)::
+
+    Connection refused to 10.0.0.7:5432 after 3 retries
+    Connection refused to 10.0.0.9:5432 after 12 retries
+    -> Connection refused to <IP> after <NUM> retries
+
+Each file has one :class:`PatternIndex`, fed only with the bytes appended
+since the previous request, so a file is never rescanned.  Memory is bounded
+by ``max_clusters`` templates (least recently matched out) with a few
+example offsets each.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from python_log_viewer.filecache import FileCache
+from python_log_viewer.timestamps import strip_timestamp
+
+WILDCARD = "<*>"
+
+# Whole tokens only: one match per token is far cheaper than substituting
+# across the line, and partly variable tokens (``/item/42``) become ``<*>``
+# once a second value is seen.
+_MASK_RE = re.compile(
+    r"(?P<pre>[(\[]?)(?:"
+    r"(?P<UUID>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})"
+    r"|(?P<IP>\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?)"
+    r"|(?P<HEX>0x[0-9a-fA-F]+|(?=[a-fA-F]*\d)[0-9a-fA-F]{12,})"
+    r"|(?P<NUM>[-+]?\d+(?:[.,]\d+)?)"
+    r")(?P<post>[)\],;:]?)"
+)
+_MASK_KINDS = ("UUID", "IP", "HEX", "NUM")
+_LEVEL_RE = re.compile(r"\b(CRITICAL|FATAL|ERROR|WARNING|WARN|INFO|DEBUG)\b")
+_LEVEL_ALIASES = {"FATAL": "CRITICAL", "WARN": "WARNING"}
+
+_MAX_CLUSTERS = 2000
+_MAX_EXAMPLES = 3
+_MAX_CACHED_INDEXES = 32
+_MAX_KNOWN_MESSAGES = 10_000
+
+
+def mask(text: str) -> List[str]:
+    """Split *text* into tokens, with ids, addresses and numbers masked."""
+    tokens = text.split()
+    for i, token in enumerate(tokens):
+        if not token.isalpha():
+            match = _MASK_RE.fullmatch(token)
+            if match is not None:
+                kind = next(kind for kind in _MASK_KINDS if match.group(kind))
+                tokens[i] = f"{match.group('pre')}<{kind}>{match.group('post')}"
+    return tokens
+
+
+def entry_level(text: str) -> str:
+    """Return the level named in *text* (``""`` if none)."""
+    match = _LEVEL_RE.search(text)
+    if match is None:
+        return ""
+    return _LEVEL_ALIASES.get(match.group(1), match.group(1))
+
+
+class _Cluster:
+    __slots__ = ("tokens", "count", "levels", "examples")
+
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = tokens
+        self.count = 0
+        self.levels: Dict[str, int] = {}
+        self.examples: Deque[int] = deque(maxlen=_MAX_EXAMPLES)
+
+
+class TemplateMiner:
+    """Drain-style online clustering of messages into templates.
+
+    Parameters
+    ----------
+    similarity:
+        Share of equal tokens (``<*>`` positions not counting) above which
+        a message joins a template.
+    max_clusters:
+        Templates kept at most; the least recently matched one is dropped
+        to make room for a new one.
+    """
+
+    def __init__(self, similarity: float = 0.5, max_clusters: int = _MAX_CLUSTERS) -> None:
+        self.similarity = similarity
+        self.max_clusters = max_clusters
+        self.entries = 0
+        # (token count, first token) -> clusters; plus an LRU over all of them
+        self._groups: Dict[Tuple[int, str], List[_Cluster]] = {}
+        self._lru: "OrderedDict[int, Tuple[Tuple[int, str], _Cluster]]" = OrderedDict()
+        # masked message -> its cluster, to skip matching exact repeats
+        self._known: Dict[str, _Cluster] = {}
+
+    def add(self, message: str, level: str = "", offset: Optional[int] = None) -> None:
+        tokens = mask(message)
+        if not tokens:
+            return
+        masked = " ".join(tokens)
+        first = tokens[0] if not tokens[0].startswith("<") else WILDCARD
+        key = (len(tokens), first)
+        cluster = self._known.get(masked)
+        if cluster is None or id(cluster) not in self._lru:
+            group = self._groups.setdefault(key, [])
+            cluster = self._match(group, tokens)
+            if cluster is None:
+                cluster = _Cluster(tokens)
+                group.append(cluster)
+                if len(self._lru) >= self.max_clusters:
+                    _id, (old_key, old) = self._lru.popitem(last=False)
+                    self._groups[old_key].remove(old)
+                    if not self._groups[old_key]:
+                        del self._groups[old_key]
+            else:
+                cluster.tokens = [t if t == n else WILDCARD for t, n in zip(cluster.tokens, tokens)]
+        if len(self._known) >= _MAX_KNOWN_MESSAGES:
+            self._known.clear()
+        self._known[masked] = cluster
+        self._lru[id(cluster)] = (key, cluster)
+        self._lru.move_to_end(id(cluster))
+        cluster.count += 1
+        if level:
+            cluster.levels[level] = cluster.levels.get(level, 0) + 1
+        if offset is not None:
+            cluster.examples.append(offset)
+        self.entries += 1
+
+    def _match(self, group: List[_Cluster], tokens: List[str]) -> Optional[_Cluster]:
+        best, best_score, best_params = None, -1.0, -1
+        for cluster in group:
+            same = params = 0
+            for t, n in zip(cluster.tokens, tokens):
+                if t == WILDCARD:
+                    params += 1
+                elif t == n:
+                    same += 1
+            score = same / len(tokens)
+            if score > best_score or (score == best_score and params > best_params):
+                best, best_score, best_params = cluster, score, params
+        return best if best is not None and best_score >= self.similarity else None
+
+    def top(self, n: int = 20, level: str = "") -> List[dict]:
+        """Return the *n* most frequent templates (only those seen at *level*)."""
+        level = _LEVEL_ALIASES.get(level.upper(), level.upper())
+        clusters = [c for _key, c in self._lru.values() if not level or level in c.levels]
+        clusters.sort(key=lambda c: c.levels.get(level, 0) if level else c.count, reverse=True)
+        return [
+            {
+                "template": " ".join(c.tokens),
+                "count": c.count,
+                "levels": dict(c.levels),
+                "examples": list(c.examples),
+            }
+            for c in clusters[:max(0, n)]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+
+class PatternIndex:
+    """The templates of one file, fed incrementally.
+
+    ``offset`` is where the next update resumes; ``start`` is where mining
+    began (``> 0`` when an admission budget cut the first scan short).
+    Hold ``lock`` while updating or reading the miner.
+    """
+
+    def __init__(self, max_clusters: int = _MAX_CLUSTERS) -> None:
+        self.miner = TemplateMiner(max_clusters=max_clusters)
+        self.start = 0
+        self.offset = 0
+        self.lock = threading.Lock()
+
+    def add(self, offset: int, entry: str, record: Optional[dict] = None) -> None:
+        """Add *entry* (at *offset*); *record* holds its parsed fields, if any."""
+        first_line = entry.split("\n", 1)[0]
+        message = level = None
+        if record is not None:
+            message = record.get("message", record.get("msg"))
+            level = record.get("level", record.get("levelname"))
+        if not isinstance(message, str):
+            message = strip_timestamp(first_line)
+        level = str(level).upper() if level else entry_level(first_line)
+        self.miner.add(message.split("\n", 1)[0], _LEVEL_ALIASES.get(level, level), offset)
+
+
+_indexes: FileCache[PatternIndex] = FileCache(PatternIndex, _MAX_CACHED_INDEXES, "pattern")
+
+
+def pattern_index(path: str) -> PatternIndex:
+    """Return the cached :class:`PatternIndex` of the file at *path*.
+
+    The index starts over when the file is replaced (rotated), truncated or
+    rewritten (see :class:`~python_log_viewer.filecache.FileCache`).
+    """
+    return _indexes.get(path)
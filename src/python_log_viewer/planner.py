@@ -0,0 +1,111 @@
+"""
+Query cost estimation and admission control.
+
+:class:`~python_log_viewer.core.LogReader` estimates how many (uncompressed)
+bytes a request will scan from file sizes, compression and index state; a
+:class:`QueryPlanner` then decides what to do with it:
+
+* requests within *max_scan_bytes* run unchanged;
+* requests over budget are either rejected (HTTP 429) or downgraded to a
+  scan bounded by the budget whose result carries ``"partial": True``;
+* *heavy* requests (above *heavy_bytes*) additionally need one of
+  *max_heavy_queries* slots; when none frees up within *queue_timeout* the
+  request is refused with HTTP 503 and a ``Retry-After`` hint.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+_MB = 1024 * 1024
+
+
+@dataclass
+class QueryPlan:
+    """The planner's decision for one request."""
+
+    estimated_bytes: int
+    heavy: bool
+    max_bytes: int = 0  # scan cap for downgraded requests (0 = unbounded)
+    error: Optional[str] = None  # set when the request is rejected
+    status: int = 200
+
+
+class QueryPlanner:
+    """Budget and concurrency policy shared by every reader that uses it.
+
+    Parameters
+    ----------
+    max_scan_bytes:
+        Largest estimated scan admitted as-is (``0`` disables the budget).
+    over_budget:
+        ``"downgrade"`` to run over-budget requests as a bounded scan with
+        partial results, or ``"reject"`` to refuse them with HTTP 429.
+    heavy_bytes:
+        Estimated scan size from which a request counts as heavy.
+    max_heavy_queries:
+        How many heavy requests may run at once across the process.
+    queue_timeout:
+        Seconds a heavy request waits for a free slot before it is refused.
+    retry_after:
+        Seconds suggested to clients in the ``Retry-After`` header.
+    """
+
+    def __init__(
+        self,
+        max_scan_bytes: int = 1024 * _MB,
+        *,
+        over_budget: str = "downgrade",
+        heavy_bytes: int = 64 * _MB,
+        max_heavy_queries: int = 2,
+        queue_timeout: float = 0.0,
+        retry_after: int = 2,
+    ) -> None:
+        if over_budget not in ("downgrade", "reject"):
+            raise ValueError("over_budget must be 'downgrade' or 'reject'")
+        self.max_scan_bytes = max_scan_bytes
+        self.over_budget = over_budget
+        self.heavy_bytes = heavy_bytes
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max(1, max_heavy_queries))
+
+    def plan(self, estimated_bytes: int) -> QueryPlan:
+        """Classify a request that is expected to scan *estimated_bytes*."""
+        plan = QueryPlan(estimated_bytes=estimated_bytes, heavy=estimated_bytes >= self.heavy_bytes)
+        if self.max_scan_bytes and estimated_bytes > self.max_scan_bytes:
+            if self.over_budget == "reject":
+                plan.error = (
+                    f"Query would scan ~{estimated_bytes // _MB} MB, over the "
+                    f"{self.max_scan_bytes // _MB} MB limit; narrow it with a "
+                    "line limit, time range or filter"
+                )
+                plan.status = 429
+            else:
+                plan.max_bytes = self.max_scan_bytes
+                plan.heavy = self.max_scan_bytes >= self.heavy_bytes
+        return plan
+
+    def acquire(self, plan: QueryPlan) -> bool:
+        """Take a heavy-query slot for *plan*; light plans always succeed."""
+        if not plan.heavy:
+            return True
+        if self.queue_timeout > 0:
+            return self._slots.acquire(timeout=self.queue_timeout)
+        return self._slots.acquire(blocking=False)
+
+    def release(self, plan: QueryPlan) -> None:
+        if plan.heavy:
+            self._slots.release()
+
+    def busy_error(self) -> dict:
+        """Return the error fields for a request refused for lack of slots."""
+        return {
+            "error": "Too many expensive log queries are running; try again shortly",
+            "status": 503,
+            "retry_after": self.retry_after,
+        }
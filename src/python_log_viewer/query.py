@@ -0,0 +1,313 @@
+"""
+Boolean search queries.
+
+Next to the plain ``search`` substring, reads accept a ``query`` combining
+several conditions::
+
+    reader.read("app.log", query='ERROR AND (timeout OR "connection refused") AND NOT healthcheck')
+
+Syntax
+------
+``word`` / ``"quoted phrase"``
+    Case-insensitive substring, like ``search``.
+``re:pattern`` / ``re:"pattern"``
+    Regular expression (:func:`re.search`, case-sensitive unless the pattern
+    starts with ``(?i)``).  Unquoted patterns run to the next whitespace or
+    to a ``)`` that closes no group of their own, so
+    ``(timeout OR re:db-(primary|replica))`` works; quote patterns holding
+    spaces or unbalanced parentheses.
+``level:error`` / ``logger:payments``
+    The entry's level or logger field – from the file's format or JSON
+    record (see :mod:`python_log_viewer.formats`) when the entry has one;
+    otherwise ``level:`` looks for the upper-cased level like the *level*
+    filter and ``logger:`` for the name as a substring.  A logger also
+    matches its children (``logger:app`` matches ``app.db``).
+``AND``, ``OR``, ``NOT`` and parentheses
+    Upper case only.  Terms next to each other are ANDed; ``NOT`` binds
+    tightest, then ``AND``, then ``OR``.
+
+A query is compiled once per query string (and cached) into a tree of
+closures.  Evaluating it stops as soon as the outcome is known.  Terms
+without letters (``10.0.0.7``, ``"took 9"``) are looked up in the entry as
+it is; an entry is lower-cased – once, for all other terms – only if the
+query has a term with letters, and parsed only if a field term needs it.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from python_log_viewer.structured import MISSING, Parser, get_field, parse_record
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<paren>[()])|(?P<prefix>\w+:)?"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<regex>re:)(?=[^\s")])|(?P<word>[^\s()"]+))'
+)
+_FIELDS = ("level", "logger")
+_OPERATORS = ("AND", "OR", "NOT")
+
+# A compiled node: (entry, lowered entry, record getter) -> bool
+_Node = Callable[[str, str, Callable[[], Optional[dict]]], bool]
+
+
+def _regex_end(text: str, pos: int) -> int:
+    """Return the end of the unquoted pattern starting at *pos*.
+
+    The pattern stops at whitespace or at a ``)`` closing no group opened
+    in it; escaped characters and ``)`` in character classes are skipped.
+    """
+    depth = 0
+    in_class = False
+    while pos < len(text):
+        char = text[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if char.isspace():
+            break
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        pos += 1
+    return min(pos, len(text))
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    """Split *text* into ``(kind, value)`` tokens."""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Invalid query near {text[pos:].strip()!r}")
+        pos = match.end()
+        if match.group("regex"):
+            end = _regex_end(text, pos)
+            tokens.append(("re", text[pos:end]))
+            pos = end
+        elif match.group("paren"):
+            tokens.append((match.group("paren"), match.group("paren")))
+        elif match.group("quoted") is not None:
+            value = match.group("quoted").replace('\\"', '"')
+            prefix = (match.group("prefix") or "")[:-1]
+            if prefix == "re":
+                tokens.append(("re", value))
+            elif prefix in _FIELDS:
+                tokens.append((prefix, value))
+            else:
+                tokens.append(("term", (match.group("prefix") or "") + value))
+        else:
+            word = match.group("word")
+            prefix, _sep, value = word.partition(":")
+            if word in _OPERATORS:
+                tokens.append((word, word))
+            elif prefix in _FIELDS and value:
+                tokens.append((prefix, value))
+            else:
+                tokens.append(("term", word))
+    return tokens
+
+
+class _QueryParser:
+    """Recursive-descent parser building a tuple tree from tokens."""
+
+    def __init__(self, tokens: List[Tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise ValueError("Empty query")
+        tree = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.pos][1]!r} in query")
+        return tree
+
+    def parse_or(self) -> tuple:
+        parts = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            parts.append(self.parse_and())
+        return parts[0] if len(parts) == 1 else ("or", *parts)
+
+    def parse_and(self) -> tuple:
+        parts = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            parts.append(self.parse_not())
+        return parts[0] if len(parts) == 1 else ("and", *parts)
+
+    def parse_not(self) -> tuple:
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> tuple:
+        if self.peek() is None:
+            raise ValueError("Query ends unexpectedly")
+        kind, value = self.take()
+        if kind == "(":
+            tree = self.parse_or()
+            if self.peek() != ")":
+                raise ValueError("Missing ')' in query")
+            self.take()
+            return tree
+        if kind in (")", "AND", "OR"):
+            raise ValueError(f"Unexpected {value!r} in query")
+        if kind == "re":
+            try:
+                return ("re", re.compile(value))
+            except re.error as exc:
+                raise ValueError(f"Invalid regular expression {value!r}: {exc}") from None
+        if kind == "term":
+            return ("term", value.lower())
+        return (kind, value)
+
+
+def _no_record() -> Optional[dict]:
+    return None
+
+
+def _field_value(record: Optional[dict], name: str):
+    value = get_field(record, name) if record is not None else MISSING
+    return None if value is MISSING or value is None else str(value)
+
+
+def _compile(tree: tuple) -> _Node:
+    kind = tree[0]
+    if kind == "term":
+        term = tree[1]
+        if _caseless(term):
+            return lambda entry, low, record: term in entry
+        return lambda entry, low, record: term in low
+    if kind == "re":
+        search = tree[1].search
+        return lambda entry, low, record: search(entry) is not None
+    if kind == "level":
+        upper = tree[1].upper()
+
+        def level(entry: str, low: str, record) -> bool:
+            value = _field_value(record(), "level")
+            return upper in entry if value is None else value.upper() == upper
+
+        return level
+    if kind == "logger":
+        name = tree[1].lower()
+
+        def logger(entry: str, low: str, record) -> bool:
+            value = _field_value(record(), "logger")
+            if value is None:
+                return name in low
+            value = value.lower()
+            return value == name or value.startswith(name + ".")
+
+        return logger
+    if kind == "not":
+        inner = _compile(tree[1])
+        return lambda entry, low, record: not inner(entry, low, record)
+    parts = [_compile(part) for part in tree[1:]]
+    if kind == "and":
+        return lambda entry, low, record: all(part(entry, low, record) for part in parts)
+    return lambda entry, low, record: any(part(entry, low, record) for part in parts)
+
+
+def _caseless(term: str) -> bool:
+    """Return whether lower-casing an entry cannot change whether it holds *term*."""
+    return term.upper() == term == term.lower()
+
+
+def _kinds(tree: tuple) -> set:
+    if tree[0] in ("and", "or", "not"):
+        return set().union(*(_kinds(part) for part in tree[1:]))
+    if tree[0] == "term" and _caseless(tree[1]):
+        return {"caseless"}
+    return {tree[0]}
+
+
+def _needle(tree: tuple) -> str:
+    """Return a lower-case term every matching entry contains ("" if none)."""
+    if tree[0] == "term":
+        return tree[1]
+    if tree[0] == "and":
+        return max((_needle(part) for part in tree[1:]), key=len)
+    return ""
+
+
+class Query:
+    """A compiled boolean query; build it with :func:`compile_query`.
+
+    Attributes
+    ----------
+    text:
+        The query string.
+    needle:
+        A lower-case term every matching entry contains, or ``""``; lets a
+        scan skip to candidates before evaluating the query.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        tree = _QueryParser(_tokenize(text)).parse()
+        kinds = _kinds(tree)
+        self.needle = _needle(tree)
+        self._match = _compile(tree)
+        self._lower = bool(kinds & {"term", "logger"})
+        self._fields = bool(kinds & {"level", "logger"})
+
+    def __reduce__(self):
+        # Rebuilt from the text in the parallel search's worker processes.
+        return compile_query, (self.text,)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def matches(self, entry: str, parse: Parser = parse_record) -> bool:
+        """Return whether *entry* satisfies the query.
+
+        *parse* extracts the fields ``level:`` and ``logger:`` look at.
+        """
+        low = entry.lower() if self._lower else ""
+        if not self._fields:
+            return self._match(entry, low, _no_record)
+        cache: list = []
+
+        def record() -> Optional[dict]:
+            if not cache:
+                cache.append(parse(entry))
+            return cache[0]
+
+        return self._match(entry, low, record)
+
+
+@lru_cache(maxsize=256)
+def compile_query(text: str) -> Query:
+    """Compile *text* into a :class:`Query`, cached by query string.
+
+    Raises
+    ------
+    ValueError
+        If the query is empty or malformed, or a regular expression in it
+        is invalid.
+    """
+    return Query(text)
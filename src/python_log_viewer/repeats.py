@@ -0,0 +1,118 @@
+"""
+Collapsing runs of repeated entries.
+
+A retry storm writes the same entry thousands of times in a row.  With
+``collapse`` set, :meth:`~python_log_viewer.core.LogReader.read` returns each
+run of consecutive repeats as one entry (the newest of the run) and reports
+its size and time span in ``"repeats"``.  What counts as a repeat depends on
+the mode:
+
+``exact``
+    Identical entries.
+``timestamps``
+    Entries that differ only in their leading timestamp.
+``numbers``
+    Entries that differ only in the numbers of their message (ids,
+    durations) and in their timestamps.  The header before the message –
+    level and logger name – must be the same, so ``app.worker1`` and
+    ``app.worker2`` are told apart; in JSON entries that is the
+    ``logger`` (or ``name``) field.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from python_log_viewer.structured import parse_record
+from python_log_viewer.timestamps import strip_timestamp, timestamp_text
+
+_NUMBER_RE = re.compile(r"\d+")
+
+# The header of a text entry after its timestamp: up to the level keyword,
+# then a logger name ending in ":" or " - " or in brackets, then the
+# separator (``ERROR app.worker1: ``, `` - app.worker1 - ERROR - ``,
+# ``[ERROR] [worker1] ``).
+_HEADER_RE = re.compile(
+    r"[^:\n]*?\b(?:TRACE|DEBUG|INFO|NOTICE|WARN|WARNING|ERROR|CRITICAL|FATAL)\b\]?"
+    r"(?: \[[^\]\s]+\]| [\w.$<>-]+(?=:\s| - ))?"
+    r"(?::\s| - |\s)"
+)
+
+
+def _mask_numbers(entry: str) -> str:
+    """Return the ``numbers`` key of *entry*: numbers masked except in its header."""
+    if entry.startswith("{"):
+        record = parse_record(entry)
+        if record is not None:
+            return f"{record.get('logger', record.get('name'))}\0{_NUMBER_RE.sub('#', entry)}"
+    text = strip_timestamp(entry)
+    match = _HEADER_RE.match(text)
+    head = match.end() if match is not None else 0
+    return text[:head] + _NUMBER_RE.sub("#", text[head:])
+
+
+COLLAPSE_MODES: Dict[str, Callable[[str], str]] = {
+    "exact": lambda entry: entry,
+    "timestamps": strip_timestamp,
+    "numbers": _mask_numbers,
+}
+
+# (newest entry of the run, run length, oldest entry of the run)
+Run = Tuple[str, int, str]
+
+
+def repeat_key(mode: str) -> Callable[[str], str]:
+    """Return the function mapping entries of *mode* to what must repeat.
+
+    Raises
+    ------
+    ValueError
+        If *mode* is not one of :data:`COLLAPSE_MODES`.
+    """
+    try:
+        return COLLAPSE_MODES[mode]
+    except KeyError:
+        raise ValueError(
+            f"Invalid collapse mode {mode!r} (use one of: {', '.join(COLLAPSE_MODES)})"
+        ) from None
+
+
+def collapse_runs(entries: Iterable[str], key: Callable[[str], str]) -> List[Run]:
+    """Collapse consecutive *entries* with equal *key* into runs, oldest first.
+
+    *entries* is consumed once, so a lazy filter feeding it makes filtering
+    and run detection a single pass.
+    """
+    runs: List[Run] = []
+    last_key = None
+    for entry in entries:
+        entry_key = key(entry)
+        if runs and entry_key == last_key:
+            _newest, count, oldest = runs[-1]
+            runs[-1] = (entry, count + 1, oldest)
+        else:
+            runs.append((entry, 1, entry))
+            last_key = entry_key
+    return runs
+
+
+def describe_runs(runs: List[Run]) -> List[dict]:
+    """Return the ``"repeats"`` of a page of *runs*: one dict per real run.
+
+    ``{"index": i, "count": n, "first": timestamp, "last": timestamp}``,
+    where *i* indexes the page's ``lines`` and the timestamps (``None`` for
+    entries without one) are those of the oldest and newest repeat.
+    """
+    return [
+        {
+            "index": i,
+            "count": count,
+            "first": timestamp_text(oldest),
+            "last": timestamp_text(newest),
+        }
+        for i, (newest, count, oldest) in enumerate(runs)
+        if count > 1
+    ]
@@ -0,0 +1,220 @@
+"""
+Rotation-aware helpers: grouping a log with its rotated siblings and
+time-based seeking inside a single segment.
+
+A *logical log* is a live file plus the files its rotation scheme produced,
+e.g. ``app.log``, ``app.log.1``, ``app.log.2.gz`` (``logrotate`` /
+``RotatingFileHandler``), ``app.log-20260218.gz`` (``logrotate`` with
+``dateext``) or ``app.log.2026-02-18_13`` (``TimedRotatingFileHandler``).
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.sources import open_source
+from python_log_viewer.timestamps import parse_timestamp
+
+#: Suffix patterns (regular expressions) recognised after the live file's
+#: name.  A compression suffix (``.gz``, ``.bz2``, ``.xz``, ``.lzma``) is
+#: always allowed after any of them.
+DEFAULT_ROTATION_PATTERNS: Tuple[str, ...] = (
+    r"\.\d+",  # app.log.1 (logrotate, RotatingFileHandler)
+    r"-\d{8}(?:\d{2})?",  # app.log-20260218 (logrotate dateext)
+    r"\.\d{4}-\d{2}-\d{2}(?:_\d{2}(?:-\d{2}){0,2})?",  # app.log.2026-02-18_13 (TimedRotatingFileHandler)
+)
+
+_PROBE_BYTES = 64 * 1024
+
+
+def compile_rotation_patterns(patterns: Iterable[str]) -> Pattern[str]:
+    """Combine suffix *patterns* into one regex capturing the live file name."""
+    alternatives = "|".join(f"(?:{p})" for p in patterns)
+    return re.compile(rf"^(?P<base>.+?)(?:{alternatives})(?:\.(?:gz|bz2|xz|lzma))?$")
+
+
+_COMPRESSION_RE = re.compile(r"\.(?:gz|bz2|xz|lzma)$")
+_INDEX_RE = re.compile(r"\.(\d{1,7})")  # app.log.1; longer runs of digits are dates
+_DATE_DIGITS = 14  # YYYYmmddHHMMSS
+
+
+def _rotation_key(suffix: str, mtime: float) -> Tuple[int, float, float]:
+    """Return the sort key placing a sibling with *suffix* among the newest first.
+
+    Numbered siblings come first, lowest number first; dated siblings
+    next, latest date first; siblings of custom patterns last.  The
+    modification time only breaks ties – it changes when a file is copied
+    or touched, the suffix does not.
+    """
+    suffix = _COMPRESSION_RE.sub("", suffix)
+    index = _INDEX_RE.fullmatch(suffix)
+    if index is not None:
+        return 0, int(index.group(1)), -mtime
+    digits = re.sub(r"\D", "", suffix)
+    if digits:
+        return 1, -int(digits[:_DATE_DIGITS].ljust(_DATE_DIGITS, "0")), -mtime
+    return 2, -mtime, 0.0
+
+
+def group_rotations(
+    dirpath: str, filenames: Iterable[str], pattern: Pattern[str]
+) -> Dict[str, List[str]]:
+    """Map each live file name in *dirpath* to its rotated siblings.
+
+    Siblings are ordered newest first by their suffix: ``app.log.1`` before
+    ``app.log.2``, ``app.log-20260218`` before ``app.log-20260217``.  The
+    modification time only breaks ties (and orders siblings of custom
+    patterns), since copying or touching a file changes it.
+    """
+    names = set(filenames)
+    groups: Dict[str, List[Tuple[Tuple[int, float, float], str]]] = {}
+    for name in names:
+        match = pattern.match(name)
+        if match is None or match.group("base") not in names:
+            continue
+        try:
+            mtime = os.stat(os.path.join(dirpath, name)).st_mtime
+        except OSError:
+            continue
+        base = match.group("base")
+        groups.setdefault(base, []).append((_rotation_key(name[len(base):], mtime), name))
+    return {
+        base: [name for _key, name in sorted(siblings)]
+        for base, siblings in groups.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Per-segment metadata
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    """Cached facts about one file of a logical log."""
+
+    path: str
+    size: int  # uncompressed bytes
+    first_ts: Optional[float]
+    last_ts: Optional[float]
+
+
+_MAX_CACHED_SEGMENTS = 512
+_segment_cache: "OrderedDict[str, Tuple[Tuple[int, int], SegmentInfo]]" = OrderedDict()
+_segment_lock = threading.Lock()
+
+
+def _first_timestamp(data: bytes) -> Optional[float]:
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        ts = parse_timestamp(line)
+        if ts is not None:
+            return ts
+    return None
+
+
+def _last_timestamp(data: bytes) -> Optional[float]:
+    for line in reversed(data.decode("utf-8", errors="replace").splitlines()):
+        ts = parse_timestamp(line)
+        if ts is not None:
+            return ts
+    return None
+
+
+def segment_info(path: str) -> SegmentInfo:
+    """Return (and cache) the size and timestamp range of *path*.
+
+    Entries are keyed on ``(st_size, st_mtime_ns)`` so appends or rotations
+    invalidate them; rotated segments are immutable and stay cached.
+    """
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _segment_lock:
+        hit = _segment_cache.get(path)
+        if hit is not None and hit[0] == key:
+            _segment_cache.move_to_end(path)
+            _stats.cache("segment", True)
+            return hit[1]
+    _stats.cache("segment", False)
+
+    source = open_source(path)
+    size = source.size
+    info = SegmentInfo(
+        path=path,
+        size=size,
+        first_ts=_first_timestamp(source.read(0, min(size, _PROBE_BYTES))),
+        last_ts=_last_timestamp(source.read(max(0, size - _PROBE_BYTES), size)),
+    )
+    with _segment_lock:
+        _segment_cache[path] = (key, info)
+        _segment_cache.move_to_end(path)
+        while len(_segment_cache) > _MAX_CACHED_SEGMENTS:
+            _segment_cache.popitem(last=False)
+    return info
+
+
+# ---------------------------------------------------------------------------
+# Time seeking
+# ---------------------------------------------------------------------------
+
+
+def _timestamped_lines(source, pos: int, end: int) -> Iterator[Tuple[int, float]]:
+    """Yield ``(offset, ts)`` for every timestamped line starting in ``[pos, end)``."""
+    start = pos
+    # A line starts at *pos* only if the preceding byte is a newline.
+    skip_partial = pos > 0 and source.read(pos - 1, pos) != b"\n"
+    while start < end:
+        block = source.read(start, min(start + _PROBE_BYTES, end))
+        if not block:
+            return
+        offset = start
+        lines = block.split(b"\n")
+        for i, line in enumerate(lines):
+            if i == len(lines) - 1 and start + len(block) < end:
+                # Incomplete last line: re-read it with the next block.
+                break
+            if skip_partial:
+                skip_partial = False
+            else:
+                ts = parse_timestamp(line[:64].decode("utf-8", errors="replace"))
+                if ts is not None:
+                    yield offset, ts
+            offset += len(line) + 1
+        if offset == start:
+            # A single line longer than the probe window.
+            offset = start + len(block)
+            skip_partial = True
+        start = offset
+
+
+def seek_time(source, target: float, lo: int, hi: int) -> int:
+    """Return the offset of the first line in ``[lo, hi)`` stamped ``>= target``.
+
+    Assumes timestamps are non-decreasing, which holds for any single log
+    file.  Lines without a timestamp (tracebacks, continuation lines) are
+    treated as part of the entry before them.  Returns *hi* if no such line
+    exists.  Only ``O(log n)`` probes of a few KB each are read.
+    """
+    answer = hi
+    end = hi
+    while end - lo > _PROBE_BYTES:
+        mid = (lo + end) // 2
+        hit = next(_timestamped_lines(source, mid, end), None)
+        if hit is None:
+            end = mid
+        elif hit[1] >= target:
+            answer = hit[0]
+            end = mid
+        else:
+            lo = hit[0] + 1
+    for offset, ts in _timestamped_lines(source, lo, end):
+        if ts >= target:
+            return offset
+    return answer
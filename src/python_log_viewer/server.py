@@ -0,0 +1,572 @@
+"""
+Standalone HTTP server for hosts without a web application to embed into.
+
+::
+
+    python -m python_log_viewer serve --dir /var/log/app --port 8000
+
+or from Python::
+
+    from python_log_viewer.server import LogViewerServer, serve
+
+    serve(LogViewerServer("/var/log/app", username="admin", password="secret"), port=8000)
+
+The server speaks HTTP/1.1 with keep-alive on :mod:`asyncio` and offers the
+same routes as the framework integrations (page, ``/api/files``,
+``/api/content``, ``/api/merged``, ``/api/context``, ``/api/patterns``,
+``/api/entry``, ``/api/metrics``, ``/api/file`` and ``/api/clear``) behind
+the same optional Basic Auth.  Reader calls block, so they run on a thread
+pool and the event loop only parses requests and writes responses; a query
+is cancelled when its client disconnects or a newer request arrives with
+the same ``supersede`` key.
+
+``uvloop`` is used as the event loop when it is installed.  With
+``workers > 1`` that many forked processes accept connections from one
+shared listening socket (POSIX only); each has its own reader caches and
+its own ``/api/metrics`` totals.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from python_log_viewer import cancel as _cancel
+from python_log_viewer import stats as _stats
+from python_log_viewer._html import render_html
+from python_log_viewer.auth import check_credentials
+from python_log_viewer.core import LogDirectory, LogReader
+from python_log_viewer.params import int_param
+
+_ALLOWED_DEFAULT_LINES = {0, 100, 250, 500, 1000}
+_MAX_HEADER_BYTES = 64 * 1024
+_MAX_BODY_BYTES = 1024 * 1024
+
+
+def _normalize_default_lines(value: int) -> int:
+    try:
+        value_int = int(value)
+    except (TypeError, ValueError):
+        return 100
+    return value_int if value_int in _ALLOWED_DEFAULT_LINES else 100
+
+
+# ---------------------------------------------------------------------------
+# Requests and responses
+# ---------------------------------------------------------------------------
+
+
+class _Request:
+    __slots__ = ("method", "path", "args", "headers", "version", "stream")
+
+    def __init__(self, method, path, args, headers, version, stream) -> None:
+        self.method = method
+        self.path = path
+        self.args: Dict[str, str] = args
+        self.headers: Dict[str, str] = headers
+        self.version = version
+        self.stream: asyncio.StreamReader = stream
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class _Response:
+    """A response with either a complete *body* or a blocking iterator of
+    byte *chunks*, which is sent with chunked transfer encoding."""
+
+    __slots__ = ("status", "body", "content_type", "headers", "chunks")
+
+    def __init__(
+        self,
+        status: int = 200,
+        body: bytes = b"",
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+        chunks: Optional[Iterator[bytes]] = None,
+    ) -> None:
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.chunks = chunks
+
+
+def _parse_request(head: bytes, stream: asyncio.StreamReader) -> _Request:
+    """Parse a request line and headers; raises :class:`ValueError` if malformed."""
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, version = lines[0].split(" ")
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise ValueError(f"Unsupported protocol: {version}")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise ValueError(f"Malformed header: {line!r}")
+            headers[name.strip().lower()] = value.strip()
+    url = urlsplit(target)
+    args: Dict[str, str] = {}
+    for name, value in parse_qsl(url.query, keep_blank_values=True):
+        args.setdefault(name, value)  # the first value wins, as in the integrations
+    return _Request(method.upper(), unquote(url.path), args, headers, version, stream)
+
+
+def _json_response(result: dict, status: Optional[int] = None) -> _Response:
+    """JSON-encode a reader result, honouring a planner refusal status."""
+    status = result.pop("status", 200) if status is None else status
+    headers = {}
+    if "retry_after" in result:
+        headers["Retry-After"] = str(result.pop("retry_after"))
+    with _stats.phase("serialize"):
+        body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _Response(status, body, headers=headers)
+
+
+def _flag(args: Dict[str, str], name: str) -> bool:
+    return args.get(name, "") in ("1", "true")
+
+
+# ---------------------------------------------------------------------------
+# Application
+# ---------------------------------------------------------------------------
+
+
+class LogViewerServer:
+    """The log viewer as a standalone asyncio HTTP application.
+
+    Parameters
+    ----------
+    log_dir:
+        Path to the directory containing log files.
+    prefix:
+        URL prefix to serve the viewer under (e.g. ``/logs``; default: the
+        site root).
+    username / password:
+        Enable HTTP Basic Auth when both are provided.
+    auto_refresh / refresh_timer / auto_scroll / colorize / default_lines:
+        UI defaults.
+    parallel_workers / scan_worker / planner / formats:
+        As for :class:`~python_log_viewer.core.LogReader` and
+        :class:`~python_log_viewer.core.LogDirectory`.
+    federation:
+        Optional :class:`~python_log_viewer.federation.Federation`; file
+        lists and content then cover the peer viewers too.
+    threads:
+        Size of the thread pool running reader calls.
+    keepalive:
+        Seconds an idle keep-alive connection is kept open.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = "./logs",
+        prefix: str = "",
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        auto_refresh: bool = True,
+        refresh_timer: int = 5000,
+        auto_scroll: bool = True,
+        colorize: bool = True,
+        default_lines: int = 100,
+        parallel_workers: int = 0,
+        scan_worker=None,
+        planner=None,
+        formats=None,
+        federation=None,
+        threads: int = 8,
+        keepalive: float = 5.0,
+    ) -> None:
+        self.directory = LogDirectory(log_dir, formats=formats)
+        self.reader = LogReader(
+            self.directory, parallel_workers=parallel_workers, scan_worker=scan_worker, planner=planner
+        )
+        self.federation = federation
+        self.prefix = "/" + prefix.strip("/") if prefix.strip("/") else ""
+        self.username = username
+        self.password = password
+        self.default_lines = _normalize_default_lines(default_lines)
+        self.threads = max(1, threads)
+        self.keepalive = keepalive
+        self._html_page = render_html(
+            base_url=self.prefix,
+            auto_refresh=auto_refresh,
+            refresh_timer=refresh_timer,
+            auto_scroll=auto_scroll,
+            colorize=colorize,
+            default_lines=self.default_lines,
+        ).encode("utf-8")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # path -> (method, stats name, handler, cancellable)
+        self._routes: Dict[str, Tuple[str, str, Callable, bool]] = {
+            "/api/files": ("GET", "files", self._files, False),
+            "/api/content": ("GET", "content", self._content, True),
+            "/api/merged": ("GET", "merged", self._merged, True),
+            "/api/context": ("GET", "context", self._context, False),
+            "/api/patterns": ("GET", "patterns", self._patterns, True),
+            "/api/entry": ("GET", "entry", self._entry, False),
+            "/api/metrics": ("GET", "", self._metrics, False),
+            "/api/file": ("DELETE", "", self._delete, False),
+            "/api/clear": ("POST", "", self._clear, False),
+        }
+
+    # ---- routes (run on the thread pool) --------------------------------
+
+    def _federated(self, args) -> bool:
+        # peers query each other with local=1
+        return self.federation is not None and not _flag(args, "local")
+
+    def _files(self, args, cancel) -> _Response:
+        if self._federated(args):
+            return _json_response(self.federation.list_files(self.reader))
+        return _json_response({"files": [f.to_dict() for f in self.directory.list_files()]})
+
+    def _content(self, args, cancel) -> _Response:
+        read = functools.partial(self.federation.read, self.reader) if self._federated(args) else self.reader.read
+        return _json_response(read(
+            file=args.get("file", "app.log"),
+            lines=int_param(args, "lines", self.default_lines),
+            level=args.get("level", ""),
+            search=args.get("search", ""),
+            page=int_param(args, "page", 1),
+            rotated=_flag(args, "rotated"),
+            since=args.get("since", ""),
+            until=args.get("until", ""),
+            before=args.get("before", ""),
+            after=args.get("after", ""),
+            estimate=_flag(args, "estimate"),
+            max_entry_bytes=int_param(args, "max_entry_bytes", 0),
+            fields=args.get("fields", ""),
+            query=args.get("query", ""),
+            columns=args.get("columns", ""),
+            sort=args.get("sort", ""),
+            collapse=args.get("collapse", ""),
+            cancel=cancel,
+        ))
+
+    def _merged(self, args, cancel) -> _Response:
+        return _json_response(self.reader.read_merged(
+            args.get("files", ""),
+            lines=int_param(args, "lines", self.default_lines),
+            level=args.get("level", ""),
+            search=args.get("search", ""),
+            page=int_param(args, "page", 1),
+            after=args.get("after", ""),
+            max_entry_bytes=int_param(args, "max_entry_bytes", 0),
+            fields=args.get("fields", ""),
+            query=args.get("query", ""),
+            columns=args.get("columns", ""),
+            cancel=cancel,
+        ))
+
+    def _context(self, args, cancel) -> _Response:
+        return _json_response(self.reader.context(
+            args.get("file", "app.log"),
+            args.get("offset", ""),
+            before=int_param(args, "before", 10),
+            after=int_param(args, "after", 10),
+            max_entry_bytes=int_param(args, "max_entry_bytes", 0),
+        ))
+
+    def _patterns(self, args, cancel) -> _Response:
+        return _json_response(self.reader.patterns(
+            args.get("file", "app.log"),
+            top=int_param(args, "top", 20),
+            level=args.get("level", ""),
+            cancel=cancel,
+        ))
+
+    def _entry(self, args, cancel) -> _Response:
+        result = self.reader.entry(
+            args.get("file", "app.log"), args.get("offset", ""), pretty=args.get("format", "") == "json"
+        )
+        if "error" in result:
+            return _json_response(result)
+        return _Response(content_type="text/plain; charset=utf-8", chunks=result["chunks"])
+
+    def _metrics(self, args, cancel) -> _Response:
+        return _Response(body=_stats.render_metrics().encode("utf-8"), content_type=_stats.METRICS_CONTENT_TYPE)
+
+    def _delete(self, args, cancel) -> _Response:
+        file_param = args.get("file", "")
+        if self.directory.delete_file(file_param):
+            return _json_response({"success": True, "message": f"{os.path.basename(file_param)} deleted"})
+        return _json_response({"success": False, "error": "Invalid or missing file"}, 404)
+
+    def _clear(self, args, cancel) -> _Response:
+        file_param = args.get("file", "")
+        if self.directory.clear_file(file_param):
+            return _json_response({"success": True, "message": f"{os.path.basename(file_param)} cleared"})
+        return _json_response({"success": False, "error": "Invalid or missing file"}, 404)
+
+    @staticmethod
+    def _call(handler: Callable, args: Dict[str, str], cancel) -> _Response:
+        try:
+            return handler(args, cancel)
+        except ValueError as exc:  # malformed query parameters
+            return _json_response({"error": str(exc)}, 400)
+        except Exception as exc:
+            return _json_response({"error": str(exc)}, 500)
+
+    # ---- dispatch -------------------------------------------------------
+
+    async def handle(self, request: _Request) -> _Response:
+        """Route *request* and return its response."""
+        path = request.path
+        if self.prefix:
+            if path != self.prefix and not path.startswith(self.prefix + "/"):
+                return _json_response({"error": "Not found"}, 404)
+            path = path[len(self.prefix):] or "/"
+        if self.username and self.password:
+            if not check_credentials(request.headers.get("authorization", ""), self.username, self.password):
+                return _Response(
+                    401, b"Authentication required", "text/plain; charset=utf-8",
+                    {"WWW-Authenticate": 'Basic realm="Log Viewer"'},
+                )
+        route = self._routes.get(path)
+        if route is None:
+            if path.startswith("/api/"):
+                return _json_response({"error": "Not found"}, 404)
+            # the page, and the catch-all for deep links (e.g. /workers/celery.log)
+            if request.method not in ("GET", "HEAD"):
+                return _json_response({"error": "Method not allowed"}, 405)
+            return _Response(body=self._html_page, content_type="text/html; charset=utf-8")
+        method, name, handler, cancellable = route
+        if request.method != method and not (method == "GET" and request.method == "HEAD"):
+            return _json_response({"error": "Method not allowed"}, 405)
+        if not name:
+            return await self._run(handler, request.args, None)
+        with _stats.collect(name) as stats:
+            if not cancellable:
+                response = await self._run(handler, request.args, None)
+            else:
+                key = request.args.get("supersede", "")
+                token = _cancel.supersede(key)
+                watcher = asyncio.ensure_future(self._watch_disconnect(request.stream, token))
+                try:
+                    response = await self._run(handler, request.args, token)
+                finally:
+                    watcher.cancel()
+                    _cancel.release(key, token)
+            response.headers["Server-Timing"] = stats.server_timing()
+        return response
+
+    async def _run(self, handler: Callable, args: Dict[str, str], cancel) -> _Response:
+        call = _stats.propagate(functools.partial(self._call, handler, args, cancel))
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    @staticmethod
+    async def _watch_disconnect(stream: asyncio.StreamReader, token) -> None:
+        while not token.cancelled:
+            if stream.at_eof():
+                token.cancel()
+                return
+            await asyncio.sleep(0.25)
+
+    # ---- connections ----------------------------------------------------
+
+    async def _connection(self, stream: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(stream.readuntil(b"\r\n\r\n"), self.keepalive)
+                except asyncio.LimitOverrunError:
+                    await self._write_simple(writer, 431, "Request header fields too large")
+                    return
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                try:
+                    request = _parse_request(head, stream)
+                    length = int(request.headers.get("content-length") or 0)
+                except ValueError:
+                    await self._write_simple(writer, 400, "Bad request")
+                    return
+                if "transfer-encoding" in request.headers or length > _MAX_BODY_BYTES:
+                    # no route takes a request body
+                    await self._write_simple(writer, 413, "Request body not accepted")
+                    return
+                if length:
+                    await stream.readexactly(length)
+                response = await self.handle(request)
+                keep_alive = request.keep_alive and not (response.chunks is not None and request.version == "HTTP/1.0")
+                await self._write(writer, request, response, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, request: _Request, response: _Response, keep_alive: bool) -> None:
+        status = HTTPStatus(response.status)
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {response.content_type}"]
+        head.extend(f"{name}: {value}" for name, value in response.headers.items())
+        chunked = response.chunks is not None and request.version == "HTTP/1.1"
+        if response.chunks is None:
+            head.append(f"Content-Length: {len(response.body)}")
+        elif chunked:
+            head.append("Transfer-Encoding: chunked")
+        head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        body = b"" if request.method == "HEAD" or response.chunks is not None else response.body
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        if response.chunks is None or request.method == "HEAD":
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(self._executor, next, response.chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+
+    @staticmethod
+    async def _write_simple(writer: asyncio.StreamWriter, status: int, message: str) -> None:
+        body = message.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: text/plain; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def serve_socket(self, sock: socket.socket) -> None:
+        """Serve connections accepted on the listening socket *sock* until cancelled."""
+        self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="log-viewer")
+        try:
+            server = await asyncio.start_server(self._connection, sock=sock, limit=_MAX_HEADER_BYTES)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+# ---------------------------------------------------------------------------
+# Processes
+# ---------------------------------------------------------------------------
+
+
+def _run(main, loop: str) -> None:
+    """Run the coroutine *main* on ``uvloop`` (when installed, or required
+    with ``loop="uvloop"``) or the default :mod:`asyncio` loop."""
+    if loop != "asyncio":
+        try:
+            import uvloop
+        except ImportError:
+            if loop == "uvloop":
+                raise
+        else:
+            if sys.version_info >= (3, 11):
+                with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                    runner.run(main)
+                return
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main)
+
+
+def _serve_process(app: LogViewerServer, sock: socket.socket, loop: str) -> None:
+    async def main():
+        task = asyncio.current_task()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except (NotImplementedError, AttributeError):  # Windows
+            pass
+        try:
+            await app.serve_socket(sock)
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        _run(main(), loop)
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(
+    app: LogViewerServer,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    *,
+    workers: int = 1,
+    loop: str = "auto",
+    backlog: int = 1024,
+) -> None:
+    """Serve *app* on *host*:*port* until interrupted.
+
+    Parameters
+    ----------
+    workers:
+        Processes accepting connections.  More than one forks that many
+        children sharing the listening socket (POSIX only) and restarts any
+        that die.
+    loop:
+        ``"auto"`` (``uvloop`` when installed), ``"uvloop"`` or
+        ``"asyncio"``.
+    """
+    sock = socket.create_server((host, port), backlog=backlog)
+    try:
+        if workers <= 1 or not hasattr(os, "fork"):
+            _serve_process(app, sock, loop)
+            return
+        _supervise(app, sock, loop, workers)
+    finally:
+        sock.close()
+
+
+def _supervise(app: LogViewerServer, sock: socket.socket, loop: str, workers: int) -> None:
+    children: Dict[int, float] = {}  # pid -> start time
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _serve_process(app, sock, loop)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is not None and not stopping:
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # do not spin on a worker that dies at startup
+            spawn()
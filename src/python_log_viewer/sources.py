@@ -0,0 +1,469 @@
+"""
+Byte sources backing :class:`~python_log_viewer.core.LogReader`.
+
+A *source* exposes the (uncompressed) contents of a log file as a flat byte
+range: ``source.size`` and ``source.read(start, end)``.  Plain files map
+directly onto ``seek``/``read``; rotated archives compressed by ``logrotate``
+(``.gz``, ``.bz2``, ``.xz``) are decompressed on the fly.
+
+gzip files get a checkpoint index in the spirit of zlib's ``zran.c``: a
+single streaming pass records the decompressor state every *span* bytes of
+output, so later reads resume from the nearest access point instead of
+inflating the whole file again.  bzip2 and xz decompressor objects cannot be
+snapshotted, so those are streamed from the start (their uncompressed size is
+remembered after the first pass).
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import bisect
+import bz2
+import lzma
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from python_log_viewer import stats as _stats
+
+_COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".lzma": "xz",
+}
+
+_CHUNK_SIZE = 64 * 1024
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Return ``"gzip"``, ``"bz2"``, ``"xz"`` or ``None`` based on *path*'s suffix."""
+    return _COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+# ---------------------------------------------------------------------------
+# Plain files
+# ---------------------------------------------------------------------------
+
+
+class PlainSource:
+    """An uncompressed file; the size is re-read on every access."""
+
+    compression: Optional[str] = None
+    seekable = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def read(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        started = time.perf_counter()
+        with open(self.path, "rb") as fh:
+            fh.seek(start)
+            data = fh.read(end - start)
+        _stats.io(len(data), time.perf_counter() - started)
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Compressed files
+# ---------------------------------------------------------------------------
+
+
+def _inflate(
+    fh,
+    decomp,
+    new_decomp: Callable[[], object],
+    on_chunk: Optional[Callable[[int, object], None]] = None,
+):
+    """Yield decompressed blocks from *fh*, following concatenated members.
+
+    *on_chunk* is called with ``(compressed_bytes_consumed, decompressor)``
+    after every input chunk has been fully consumed, which is the only point
+    at which a decompressor snapshot is a valid resume point.
+    """
+    consumed = 0
+    while True:
+        chunk = fh.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        consumed += len(chunk)
+        data = chunk
+        while data:
+            out = decomp.decompress(data)
+            if out:
+                yield out
+            if not decomp.eof:
+                break
+            data = decomp.unused_data
+            if data and not data.strip(b"\x00"):
+                # Trailing zero padding after the last member.
+                return
+            decomp = new_decomp()
+        if on_chunk is not None:
+            on_chunk(consumed, decomp)
+
+
+def _slice_blocks(blocks, pos: int, start: int, end: int) -> bytes:
+    """Collect the ``[start, end)`` window from *blocks* that begin at *pos*."""
+    parts: List[bytes] = []
+    for block in blocks:
+        block_end = pos + len(block)
+        if block_end > start:
+            parts.append(block[max(0, start - pos):max(0, end - pos)])
+        pos = block_end
+        if pos >= end:
+            break
+    return b"".join(parts)
+
+
+class GzipSource:
+    """A gzip file with a lazily built access-point index.
+
+    Parameters
+    ----------
+    path:
+        Path to the ``.gz`` file.
+    span:
+        Minimum distance (in uncompressed bytes) between access points.
+    max_points:
+        Upper bound on the number of stored access points.  Each point keeps
+        a copy of the 32 KB inflate window, so the span is widened for very
+        large files to keep the index memory bounded.
+    """
+
+    compression = "gzip"
+    seekable = True
+
+    def __init__(self, path: str, span: int = 1024 * 1024, max_points: int = 256) -> None:
+        self.path = path
+        self.span = span
+        self.max_points = max_points
+        self._points: Optional[List[Tuple[int, int, object]]] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_decomp():
+        return zlib.decompressobj(_GZIP_WBITS)
+
+    def _build(self) -> None:
+        # Guess the output size from the trailer so the span can be widened
+        # up-front for huge files; the guess only affects index density.
+        span = self.span
+        estimate = gzip_trailer_size(self.path) or 0
+        if estimate // span > self.max_points:
+            span = estimate // self.max_points + 1
+
+        decomp = self._new_decomp()
+        points = [(0, 0, decomp.copy())]
+        total = 0
+
+        def checkpoint(consumed: int, current) -> None:
+            if total - points[-1][1] >= span:
+                points.append((consumed, total, current.copy()))
+
+        with open(self.path, "rb") as fh:
+            for block in _inflate(fh, decomp, self._new_decomp, checkpoint):
+                total += len(block)
+        self._points = points
+        self._size = total
+
+    def _ensure_index(self) -> List[Tuple[int, int, object]]:
+        with self._lock:
+            if self._points is None:
+                self._build()
+            return self._points  # type: ignore[return-value]
+
+    @property
+    def size(self) -> int:
+        self._ensure_index()
+        return self._size
+
+    @property
+    def indexed(self) -> bool:
+        return self._points is not None
+
+    def read(self, start: int, end: int) -> bytes:
+        started = time.perf_counter()
+        points = self._ensure_index()
+        end = min(end, self._size)
+        if end <= start:
+            return b""
+        idx = bisect.bisect_right([p[1] for p in points], start) - 1
+        comp_offset, out_offset, state = points[idx]
+        with open(self.path, "rb") as fh:
+            fh.seek(comp_offset)
+            blocks = _inflate(fh, state.copy(), self._new_decomp)
+            data = _slice_blocks(blocks, out_offset, start, end)
+        _stats.io(len(data), time.perf_counter() - started)
+        return data
+
+
+class StreamSource:
+    """A bzip2 or xz file, decompressed from the start on every read.
+
+    Scans over a range use :meth:`stream`, a single pass.
+    """
+
+    # Random reads cost a pass from the start of the stream, so callers
+    # should not bisect over it.
+    seekable = False
+
+    def __init__(self, path: str, compression: str) -> None:
+        self.path = path
+        self.compression = compression
+        self._size: Optional[int] = None
+
+    def _new_decomp(self):
+        if self.compression == "bz2":
+            return bz2.BZ2Decompressor()
+        return lzma.LZMADecompressor()
+
+    def _blocks(self):
+        with open(self.path, "rb") as fh:
+            yield from _inflate(fh, self._new_decomp(), self._new_decomp)
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(len(b) for b in self._blocks())
+        return self._size
+
+    @property
+    def indexed(self) -> bool:
+        return self._size is not None
+
+    def read(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        started = time.perf_counter()
+        data = _slice_blocks(self._blocks(), 0, start, end)
+        if self._size is None and len(data) < end - start:
+            # Short read: the stream ended inside the window, so its end
+            # is now known for free.
+            self._size = start + len(data)
+        _stats.io(len(data), time.perf_counter() - started)
+        return data
+
+
+    def stream(self, start: int, end: int) -> Iterator[bytes]:
+        """Yield ``[start, end)`` in blocks, decompressing the file once.
+
+        Sequential scans use this instead of :meth:`read`, each call of
+        which decompresses from the start again.
+        """
+        pos = 0
+        blocks = self._blocks()
+        while pos < end:
+            started = time.perf_counter()
+            block = next(blocks, None)
+            if block is None:
+                self._size = pos  # the whole stream was decompressed
+                return
+            block_end = pos + len(block)
+            if block_end > start:
+                data = block[max(0, start - pos):end - pos]
+                _stats.io(len(data), time.perf_counter() - started)
+                yield data
+            pos = block_end
+        blocks.close()
+
+
+class BufferSource:
+    """A window of another source already read into memory.
+
+    Offsets stay those of the original file; *data* holds the bytes from
+    offset *base* on.  Used to scan around a position of a stream-only
+    source after a single decompression pass.
+    """
+
+    seekable = True
+
+    def __init__(self, data: bytes, base: int = 0, compression: Optional[str] = None) -> None:
+        self.data = data
+        self.base = base
+        self.compression = compression
+
+    @property
+    def size(self) -> int:
+        return self.base + len(self.data)
+
+    def read(self, start: int, end: int) -> bytes:
+        start = max(start, self.base)
+        if end <= start:
+            return b""
+        return self.data[start - self.base:end - self.base]
+
+
+# ---------------------------------------------------------------------------
+# Size probes (used by LogDirectory.list_files without decompressing)
+# ---------------------------------------------------------------------------
+
+
+def gzip_trailer_size(path: str) -> Optional[int]:
+    """Return the ISIZE field of the last gzip member.
+
+    Exact for single-member files smaller than 4 GiB; a lower bound otherwise.
+    """
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            if fh.tell() < 18:
+                return None
+            fh.seek(-4, os.SEEK_END)
+            return struct.unpack("<I", fh.read(4))[0]
+    except OSError:
+        return None
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def xz_index_size(path: str) -> Optional[int]:
+    """Sum the uncompressed sizes recorded in the xz stream indexes."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            pos = fh.tell()
+            total = 0
+            while pos > 0:
+                # Skip stream padding (multiples of four zero bytes).
+                fh.seek(pos - 4)
+                if fh.read(4) == b"\x00\x00\x00\x00":
+                    pos -= 4
+                    continue
+                fh.seek(pos - 12)
+                footer = fh.read(12)
+                if footer[10:12] != b"YZ":
+                    return None
+                index_size = (struct.unpack("<I", footer[4:8])[0] + 1) * 4
+                fh.seek(pos - 12 - index_size)
+                index = fh.read(index_size)
+                if not index or index[0] != 0:
+                    return None
+                count, i = _read_varint(index, 1)
+                blocks = 0
+                for _ in range(count):
+                    unpadded, i = _read_varint(index, i)
+                    uncompressed, i = _read_varint(index, i)
+                    blocks += (unpadded + 3) & ~3
+                    total += uncompressed
+                pos -= 12 + index_size + blocks + 12
+            return total if pos == 0 else None
+    except (OSError, IndexError, struct.error):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Source cache
+# ---------------------------------------------------------------------------
+
+_MAX_CACHED_SOURCES = 16
+_cache: "OrderedDict[str, Tuple[int, int, object]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached_source(path: str):
+    """Return the cached compressed source for *path*, if still valid."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _cache_lock:
+        hit = _cache.get(path)
+        if hit is not None and hit[:2] == key:
+            _cache.move_to_end(path)
+            return hit[2], key
+    return None, key
+
+
+def open_source(path: str):
+    """Return a source object for *path* (plain or compressed).
+
+    Compressed sources – and therefore their checkpoint indexes – are cached
+    per path and invalidated when the file's size or mtime changes.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return PlainSource(path)
+
+    source, key = _cached_source(path)
+    _stats.cache("source", source is not None)
+    if source is not None:
+        return source
+    if compression == "gzip":
+        source = GzipSource(path)
+    else:
+        source = StreamSource(path, compression)
+    if key is not None:
+        with _cache_lock:
+            _cache[path] = (key[0], key[1], source)
+            _cache.move_to_end(path)
+            while len(_cache) > _MAX_CACHED_SOURCES:
+                _cache.popitem(last=False)
+    return source
+
+
+def uncompressed_size(path: str) -> Optional[int]:
+    """Cheaply determine the uncompressed size of a compressed file.
+
+    Uses an already built index when available, otherwise the gzip trailer or
+    the xz stream index.  Returns ``None`` when the size is unknown without a
+    full decompression pass (e.g. bzip2 files that were never read).
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return None
+    source, _key = _cached_source(path)
+    if source is not None and source.indexed:
+        return source.size
+    if compression == "gzip":
+        return gzip_trailer_size(path)
+    if compression == "xz":
+        return xz_index_size(path)
+    return None
+
+
+# Assumed compression ratio for files whose uncompressed size is unknown.
+_ASSUMED_RATIO = 8
+
+
+def read_cost(path: str) -> Tuple[int, bool]:
+    """Describe what reading *path* will cost without touching its contents.
+
+    Returns ``(size, cheap_tail)`` where *size* is the (possibly estimated)
+    uncompressed size and *cheap_tail* tells whether reading only the end
+    of the file costs only that much: true for plain files and for gzip
+    files whose checkpoint index is already built, false when the first
+    read has to inflate everything.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return os.path.getsize(path), True
+    size = uncompressed_size(path)
+    if size is None:
+        size = os.path.getsize(path) * _ASSUMED_RATIO
+    source, _key = _cached_source(path)
+    return size, compression == "gzip" and source is not None and source.indexed
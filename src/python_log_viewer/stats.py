@@ -0,0 +1,343 @@
+"""
+Per-request performance statistics and Prometheus metrics.
+
+Every public :class:`~python_log_viewer.core.LogReader` and
+:class:`~python_log_viewer.core.LogDirectory` operation (and every API
+request of the framework integrations) is measured in a
+:class:`RequestStats`.  It records:
+
+* counters – bytes read, physical lines scanned, entries grouped, entries
+  matched, blocks skipped (by archive block summaries and zone maps);
+* the time spent in each phase – ``io`` (reading and decompressing),
+  ``group`` (joining lines into entries), ``filter`` (level, search, field
+  and query filters), ``scan`` (streaming reads that group and filter as
+  they go, I/O excluded) and ``serialize`` (encoding the response);
+* hits and misses of the caches and indexes (``source``, ``segment``,
+  ``rotation``, ``field``, ``pattern``, ``index``, ``archive``, ``zone``).
+
+The stats of the running request are held in a context variable, so the
+code doing the work records into them without passing them around::
+
+    with stats.collect("read") as request_stats:
+        reader.read("app.log", search="timeout")
+    print(request_stats.to_dict())
+
+When a request finishes its stats are added to :data:`REGISTRY` (rendered
+by the ``/api/metrics`` endpoints in the Prometheus text format) and passed
+to the hooks registered with :func:`add_hook`, e.g. to forward them to
+another telemetry system.  The integrations also return them as a
+``Server-Timing`` header.  Scans in sidecar processes
+(:mod:`~python_log_viewer.worker`) report back their stats; the parallel
+search's worker processes only report the bytes they scanned and the
+matches they found.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+COUNTERS = ("bytes_read", "lines_scanned", "entries_grouped", "entries_matched", "blocks_skipped")
+PHASES = ("io", "group", "filter", "scan", "serialize")
+CACHES = ("source", "segment", "rotation", "field", "pattern", "index", "archive", "zone")
+
+# Upper bounds (seconds) of the request duration histogram buckets
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestStats:
+    """Counters, phase timings and cache hits of one request.
+
+    Attributes
+    ----------
+    name:
+        The operation (``"read"``, ``"list_files"`` …) or API endpoint
+        (``"content"``, ``"files"`` …).
+    counters / timings:
+        ``{name: count}`` for :data:`COUNTERS` and ``{phase: seconds}``
+        for :data:`PHASES`.
+    caches:
+        ``{cache: [hits, misses]}``.
+    duration:
+        Seconds from start to :meth:`finish` (so far, before that).
+    """
+
+    __slots__ = ("name", "counters", "timings", "caches", "started", "finished")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.timings: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.caches: Dict[str, List[int]] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def cache(self, name: str, hit: bool) -> None:
+        counts = self.caches.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def merge(self, other: dict) -> None:
+        """Add the counts of *other* (a :meth:`to_dict`, e.g. from a sidecar process)."""
+        for name, value in other.get("counters", {}).items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for phase, value in other.get("timings", {}).items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + value
+        for name, (hits, misses) in other.get("caches", {}).items():
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "duration": self.duration,
+            "counters": dict(self.counters),
+            "timings": dict(self.timings),
+            "caches": {name: list(counts) for name, counts in self.caches.items()},
+        }
+
+    def server_timing(self) -> str:
+        """Return the stats as a ``Server-Timing`` header value.
+
+        Phases that took time are given as durations (milliseconds), the
+        counters and cache hit counts as descriptions.
+        """
+        parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.timings.items() if seconds]
+        parts.append(f"total;dur={self.duration * 1000:.2f}")
+        parts.extend(f'{name};desc="{value}"' for name, value in self.counters.items() if value)
+        parts.extend(
+            f'cache-{name};desc="{hits} hit, {misses} miss"' for name, (hits, misses) in self.caches.items()
+        )
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("log_viewer_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    """Return the stats of the running request, if any."""
+    return _current.get()
+
+
+@contextmanager
+def collect(name: str) -> Iterator[RequestStats]:
+    """Measure the enclosed block as request *name*.
+
+    Nested inside another ``collect`` the outer request's stats are yielded
+    and nothing is recorded twice: an API endpoint and the reader method it
+    calls are one request.  When the outermost block exits the stats are
+    added to :data:`REGISTRY` and passed to the hooks.
+    """
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestStats(name)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        stats.finish()
+        REGISTRY.record(stats)
+        for hook in list(_hooks):
+            try:
+                hook(stats)
+            except Exception:  # telemetry must not fail the request
+                pass
+
+
+def collected(name: str):
+    """Decorator running the function inside :func:`collect` (*name*)."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with collect(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def propagate(fn: Callable) -> Callable:
+    """Bind *fn* to the current request's stats, for running it in another thread."""
+    stats = _current.get()
+    if stats is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current.set(stats)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Recording (no-ops outside a request)
+# ---------------------------------------------------------------------------
+
+
+def add(counter: str, value: int) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.counters[counter] += value
+
+
+def io(nbytes: int, seconds: float) -> None:
+    """Record *nbytes* read in *seconds*."""
+    stats = _current.get()
+    if stats is not None:
+        stats.counters["bytes_read"] += nbytes
+        stats.timings["io"] += seconds
+
+
+def cache(name: str, hit: bool) -> None:
+    """Record a hit (or miss) of the cache or index *name*."""
+    stats = _current.get()
+    if stats is not None:
+        stats.cache(name, hit)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as phase *name*, minus any I/O recorded in it."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    io_before = stats.timings["io"]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if name != "io":
+            elapsed -= stats.timings["io"] - io_before
+        stats.timings[name] += max(0.0, elapsed)
+
+
+# ---------------------------------------------------------------------------
+# Aggregation and hooks
+# ---------------------------------------------------------------------------
+
+
+class MetricsRegistry:
+    """Process-wide totals of all finished requests, by request name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: Dict[str, List[float]] = {}  # name -> [count, seconds, *bucket counts]
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._timings: Dict[Tuple[str, str], float] = {}
+        self._caches: Dict[Tuple[str, str], int] = {}
+
+    def record(self, stats: RequestStats) -> None:
+        duration = stats.duration
+        with self._lock:
+            totals = self._requests.setdefault(stats.name, [0, 0.0] + [0] * len(_BUCKETS))
+            totals[0] += 1
+            totals[1] += duration
+            for i, bound in enumerate(_BUCKETS):
+                if duration <= bound:
+                    totals[2 + i] += 1
+            for name, value in stats.counters.items():
+                if value:
+                    key = (stats.name, name)
+                    self._counters[key] = self._counters.get(key, 0) + value
+            for name, seconds in stats.timings.items():
+                if seconds:
+                    key = (stats.name, name)
+                    self._timings[key] = self._timings.get(key, 0.0) + seconds
+            for name, (hits, misses) in stats.caches.items():
+                for result, value in (("hit", hits), ("miss", misses)):
+                    self._caches[(name, result)] = self._caches.get((name, result), 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._counters.clear()
+            self._timings.clear()
+            self._caches.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            requests = {name: list(totals) for name, totals in self._requests.items()}
+            counters = dict(self._counters)
+            timings = dict(self._timings)
+            caches = dict(self._caches)
+        lines = [
+            "# HELP log_viewer_request_duration_seconds Duration of log viewer requests.",
+            "# TYPE log_viewer_request_duration_seconds histogram",
+        ]
+        for name, totals in sorted(requests.items()):
+            for bound, count in zip(_BUCKETS, totals[2:]):
+                lines.append(f'log_viewer_request_duration_seconds_bucket{{op="{name}",le="{bound:g}"}} {count}')
+            lines.append(f'log_viewer_request_duration_seconds_bucket{{op="{name}",le="+Inf"}} {totals[0]:g}')
+            lines.append(f'log_viewer_request_duration_seconds_sum{{op="{name}"}} {totals[1]:.6f}')
+            lines.append(f'log_viewer_request_duration_seconds_count{{op="{name}"}} {totals[0]:g}')
+        for counter in COUNTERS:
+            lines.append(f"# HELP log_viewer_{counter}_total Total {counter.replace('_', ' ')}.")
+            lines.append(f"# TYPE log_viewer_{counter}_total counter")
+            for (name, key), value in sorted(counters.items()):
+                if key == counter:
+                    lines.append(f'log_viewer_{counter}_total{{op="{name}"}} {value}')
+        lines.append("# HELP log_viewer_phase_seconds_total Time spent per phase.")
+        lines.append("# TYPE log_viewer_phase_seconds_total counter")
+        for (name, key), seconds in sorted(timings.items()):
+            lines.append(f'log_viewer_phase_seconds_total{{op="{name}",phase="{key}"}} {seconds:.6f}')
+        lines.append("# HELP log_viewer_cache_requests_total Cache and index lookups.")
+        lines.append("# TYPE log_viewer_cache_requests_total counter")
+        for (name, result), value in sorted(caches.items()):
+            lines.append(f'log_viewer_cache_requests_total{{cache="{name}",result="{result}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+#: Content type of :func:`render_metrics` output.
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_hooks: List[Callable[[RequestStats], None]] = []
+
+
+def render_metrics() -> str:
+    """Return :data:`REGISTRY` in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+def add_hook(hook: Callable[[RequestStats], None]) -> None:
+    """Call *hook* with the :class:`RequestStats` of every finished request.
+
+    Hooks run on the thread that served the request, so they should be
+    quick (e.g. hand the stats to a queue); exceptions they raise are
+    ignored.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[RequestStats], None]) -> None:
+    try:
+        _hooks.remove(hook)
+    except ValueError:
+        pass
@@ -0,0 +1,317 @@
+"""
+Field filters and columns for structured (JSON-lines) log entries.
+
+Services that log one JSON object per line can be filtered on their fields
+instead of on substrings::
+
+    reader.read("api.log", fields="level=error, duration_ms>500", columns="user_id")
+
+Entries are parsed only when a field filter or column needs them, with
+``orjson`` when it is installed and :mod:`json` otherwise.  The values read
+from a file are kept in a per-segment :class:`FieldIndex` keyed by entry
+offset, so paging through the same filter does not parse the entries again.
+
+Filter syntax: ``field OP value`` with ``OP`` one of ``=``, ``!=``, ``>``,
+``>=``, ``<``, ``<=`` and ``~`` (case-insensitive substring); several filters
+are separated by commas and must all match.  Dotted names reach into nested
+objects (``http.status>=500``).  Numbers compare numerically, everything else
+as case-insensitive text, so ``level=error`` matches ``"ERROR"``.
+
+Only the Python standard library is required; ``orjson`` is optional.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.filecache import FileCache
+
+try:  # optional, several times faster than json
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+_FILTER_RE = re.compile(r"^\s*([^\s=!<>~]+)\s*(>=|<=|!=|=|>|<|~)\s*(.*?)\s*$")
+_MAX_INDEXED_ENTRIES = 100_000  # per segment
+_JSON_PROBE_BYTES = 16 * 1024
+_MAX_CACHED_INDEXES = 32
+
+MISSING = object()  # value of a field an entry does not have
+
+
+def loads(text: str) -> Any:
+    """Decode JSON with ``orjson`` when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def parse_record(entry: str) -> Optional[dict]:
+    """Return the JSON object *entry* holds, or ``None`` for other entries."""
+    text = entry.strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        record = loads(text)
+    except ValueError:  # orjson.JSONDecodeError is a ValueError as well
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def json_lines(source) -> Optional[bool]:
+    """Return whether *source* is a JSON-lines file (``None`` while it is empty).
+
+    A file is JSON-lines when its first non-blank line is a JSON object; a
+    first line longer than the probe counts when it starts with ``{"``.  Only
+    in such a file does a line starting with ``{`` begin a new entry –
+    elsewhere it is a dict or a payload printed inside a multi-line entry.
+    """
+    head = source.read(0, _JSON_PROBE_BYTES)
+    lines = head.split(b"\n")
+    for i, line in enumerate(lines):
+        text = line.strip()
+        if not text:
+            continue
+        if i == len(lines) - 1 and len(head) == _JSON_PROBE_BYTES:
+            return text.startswith(b'{"')  # cut by the probe
+        return parse_record(text.decode("utf-8", errors="replace")) is not None
+    return None
+
+
+def has_level(entry: str, upper: str) -> bool:
+    """Return whether the JSON-lines *entry* passes the level filter *upper*.
+
+    The filter (upper-cased) is looked for in the entry's ``level`` (or
+    ``levelname``) field without regard to case, so ``"level": "error"``
+    matches ``error`` while an ``ERROR`` in the message of an ``info``
+    entry does not.  Entries without the field are tested like text
+    entries: *upper* must be a substring.
+    """
+    if upper not in entry.upper():  # cheap: the field is part of the entry
+        return False
+    record = parse_record(entry)
+    value = record.get("level", record.get("levelname")) if record else None
+    return upper in (entry if value is None else str(value).upper())
+
+
+def get_field(record: Optional[dict], name: str) -> Any:
+    """Look up a dotted *name* in *record*; :data:`MISSING` when absent."""
+    value: Any = record
+    for part in name.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+Parser = Callable[[str], Optional[dict]]
+
+
+def record_values(entry: str, names: Sequence[str], parse: Parser = parse_record) -> Dict[str, Any]:
+    """Parse *entry* and return the values of the fields *names*.
+
+    *parse* turns an entry into a dict of fields: JSON by default, or the
+    named groups of a plain-text format (see :mod:`python_log_viewer.formats`).
+    """
+    record = parse(entry)
+    return {name: get_field(record, name) for name in names}
+
+
+# ---------------------------------------------------------------------------
+# Filters
+# ---------------------------------------------------------------------------
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value).lower()
+    return str(value).lower()
+
+
+@dataclass(frozen=True)
+class FieldFilter:
+    """One ``field OP value`` condition."""
+
+    field: str
+    op: str
+    value: str
+
+    def __str__(self) -> str:
+        return f"{self.field}{self.op}{self.value}"
+
+    def matches(self, values: Dict[str, Any]) -> bool:
+        actual = values.get(self.field, MISSING)
+        if actual is MISSING:
+            return self.op == "!="
+        if self.op == "~":
+            return self.value.lower() in _text(actual)
+        wanted_num, actual_num = _number(self.value), _number(actual)
+        if wanted_num is not None and actual_num is not None:
+            left, right = actual_num, wanted_num
+        else:
+            left, right = _text(actual), self.value.lower()
+        if self.op == "=":
+            return left == right
+        if self.op == "!=":
+            return left != right
+        if self.op == ">":
+            return left > right
+        if self.op == ">=":
+            return left >= right
+        if self.op == "<":
+            return left < right
+        return left <= right
+
+
+def parse_field_filters(spec: Union[str, Sequence[str], None]) -> List[FieldFilter]:
+    """Parse ``"a=1, b>2"`` (or ``["a=1", "b>2"]``) into filters.
+
+    Raises
+    ------
+    ValueError
+        If a filter has no operator or field name.
+    """
+    if not spec:
+        return []
+    parts = spec.split(",") if isinstance(spec, str) else list(spec)
+    filters = []
+    for part in parts:
+        if isinstance(part, FieldFilter):
+            filters.append(part)
+            continue
+        if not part.strip():
+            continue
+        match = _FILTER_RE.match(part)
+        if match is None:
+            raise ValueError(f"Invalid field filter: {part.strip()!r}")
+        filters.append(FieldFilter(*match.groups()))
+    return filters
+
+
+def parse_columns(spec: Union[str, Sequence[str], None]) -> List[str]:
+    """Parse ``"user_id,duration_ms"`` (or a list) into field names."""
+    if not spec:
+        return []
+    parts = spec.split(",") if isinstance(spec, str) else spec
+    return [name.strip() for name in parts if name.strip()]
+
+
+def match_fields(filters: Sequence[FieldFilter], values: Dict[str, Any]) -> bool:
+    return all(f.matches(values) for f in filters)
+
+
+def filter_fields(filters: Sequence[FieldFilter]) -> List[str]:
+    """Return the distinct field names *filters* look at."""
+    return list(dict.fromkeys(f.field for f in filters))
+
+
+def sort_entries(
+    entries: List[Any], sort: str, parse: Parser = parse_record, values: Optional[Callable] = None
+) -> List[Any]:
+    """Order *entries* by the field *sort* (``"-field"`` for descending).
+
+    Numbers sort numerically and before text; entries without the field
+    come first in either direction, i.e. furthest from the last page end,
+    which is what page 1 of :meth:`~python_log_viewer.core.LogReader.read`
+    shows.  *values* (``values(entry, names, parse)``, default
+    :func:`record_values`) extracts the fields of entries that are not
+    plain text.
+    """
+    name = sort.lstrip("-")
+    values = values or record_values
+    keyed = []
+    missing = []
+    for entry in entries:
+        value = values(entry, [name], parse)[name]
+        if value is MISSING or value is None:
+            missing.append(entry)
+            continue
+        number = _number(value)
+        keyed.append(((0, number, "") if number is not None else (1, 0.0, _text(value)), entry))
+    keyed.sort(key=lambda pair: pair[0], reverse=sort.startswith("-"))
+    return missing + [entry for _key, entry in keyed]
+
+
+# ---------------------------------------------------------------------------
+# Per-segment field index
+# ---------------------------------------------------------------------------
+
+
+class FieldIndex:
+    """Field values of one segment's entries, keyed by entry offset.
+
+    Log files only grow at the end, so an entry's offset identifies it; the
+    entry length is stored as well to notice the last entry gaining
+    continuation lines.  At most ``_MAX_INDEXED_ENTRIES`` entries are kept,
+    least recently used first out.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[int, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def values(
+        self, offset: int, entry: str, names: Sequence[str], parse: Parser = parse_record
+    ) -> Dict[str, Any]:
+        """Return the values of *names* for the entry at *offset*.
+
+        Only fields not indexed yet cause *entry* to be parsed (with
+        *parse*); the parsed values are added to the index.
+        """
+        with self._lock:
+            hit = self._entries.get(offset)
+            if hit is not None and hit[0] == len(entry):
+                self._entries.move_to_end(offset)
+                known = hit[1]
+                if all(name in known for name in names):
+                    _stats.cache("field", True)
+                    return known
+        _stats.cache("field", False)
+        parsed = record_values(entry, names, parse)
+        with self._lock:
+            hit = self._entries.get(offset)
+            if hit is not None and hit[0] == len(entry):
+                hit[1].update(parsed)
+                parsed = hit[1]
+            else:
+                self._entries[offset] = (len(entry), parsed)
+            self._entries.move_to_end(offset)
+            while len(self._entries) > _MAX_INDEXED_ENTRIES:
+                self._entries.popitem(last=False)
+        return parsed
+
+
+_indexes: FileCache[FieldIndex] = FileCache(FieldIndex, _MAX_CACHED_INDEXES)
+
+
+def field_index(path: str) -> FieldIndex:
+    """Return the cached :class:`FieldIndex` of the segment at *path*.
+
+    The index is dropped when the file is replaced (rotated), truncated or
+    rewritten (see :class:`~python_log_viewer.filecache.FileCache`), since
+    its offsets then point at other entries.
+    """
+    return _indexes.get(path)
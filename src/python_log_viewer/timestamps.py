@@ -0,0 +1,106 @@
+"""
+Timestamp parsing for log entries and time-range query bounds.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+# ISO-8601-ish prefix as written by ``logging`` (``%(asctime)s``) and most
+# structured loggers, optionally wrapped in brackets:
+#   2026-02-18 08:00:01,123 - ...
+#   [2026-02-18T08:00:01.123Z] ...
+_ENTRY_TS_RE = re.compile(
+    r"\[?(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})"
+    r"(?:[.,](\d{1,9}))?\s?(Z|[+-]\d{2}:?\d{2})?"
+)
+_BOUND_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})$")
+_RELATIVE_RE = re.compile(r"-?(\d+(?:\.\d+)?)\s*([smhdw])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _to_epoch(match: "re.Match[str]") -> Optional[float]:
+    year, month, day, hour, minute, second, frac, tz = match.groups()
+    try:
+        dt = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+    if tz:
+        if tz == "Z":
+            offset = timedelta(0)
+        else:
+            sign = -1 if tz[0] == "-" else 1
+            digits = tz[1:].replace(":", "")
+            offset = sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+        dt = dt.replace(tzinfo=timezone(offset))
+    # Naive timestamps are interpreted in local time, the ``logging`` default.
+    epoch = dt.timestamp()
+    if frac:
+        epoch += int(frac) / 10 ** len(frac)
+    return epoch
+
+
+def parse_timestamp(text: str) -> Optional[float]:
+    """Return the epoch seconds of the timestamp *text* starts with, if any."""
+    if not text or not (text[0].isdigit() or text[0] == "["):
+        return None
+    match = _ENTRY_TS_RE.match(text)
+    if match is None:
+        return None
+    return _to_epoch(match)
+
+
+def timestamp_text(text: str) -> Optional[str]:
+    """Return the timestamp *text* starts with, as written (without brackets)."""
+    if not text or not (text[0].isdigit() or text[0] == "["):
+        return None
+    match = _ENTRY_TS_RE.match(text)
+    if match is None:
+        return None
+    return match.group(0).lstrip("[").rstrip()
+
+
+def strip_timestamp(text: str) -> str:
+    """Return *text* without the timestamp it starts with."""
+    if not text or not (text[0].isdigit() or text[0] == "["):
+        return text
+    match = _ENTRY_TS_RE.match(text)
+    return text if match is None else text[match.end():]
+
+
+def parse_time_bound(value: Union[str, float, int, None]) -> Optional[float]:
+    """Parse a ``since``/``until`` query bound into epoch seconds.
+
+    Accepts epoch numbers, ISO timestamps (``2026-02-18T08:00:00``), plain
+    dates (``2026-02-18``) and durations relative to now (``15m``, ``-6h``,
+    ``2d``).  Empty values return ``None``; anything else raises
+    :class:`ValueError`.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = value.strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    relative = _RELATIVE_RE.match(text)
+    if relative:
+        return time.time() - float(relative.group(1)) * _UNIT_SECONDS[relative.group(2)]
+    date = _BOUND_DATE_RE.match(text)
+    if date:
+        return datetime(*(int(g) for g in date.groups())).timestamp()
+    match = _ENTRY_TS_RE.match(text)
+    if match is not None and match.end() == len(text):
+        epoch = _to_epoch(match)
+        if epoch is not None:
+            return epoch
+    raise ValueError(f"Invalid time bound: {value!r}")
@@ -0,0 +1,268 @@
+"""
+Run heavy log scans in isolated sidecar processes.
+
+When the viewer is embedded in a production application, a ``lines=0``
+search over a multi-GB file competes with request handlers for the same CPU
+and GIL.  A :class:`ScanWorker` keeps one or more long-lived child processes
+that own their own :class:`~python_log_viewer.core.LogReader`; the host only
+sends a small request over a pipe and receives the result streamed back in
+chunks.  Children can be niced, pinned to CPUs and given an address-space
+limit, and a scan that exceeds *timeout* kills and replaces its child.
+The result the host collects is bounded by *max_result_bytes*.
+
+Usage::
+
+    from python_log_viewer.core import LogDirectory, LogReader
+    from python_log_viewer.worker import ScanWorker
+
+    worker = ScanWorker(processes=2, memory_limit=512 * 1024 * 1024, nice=10)
+    reader = LogReader(LogDirectory("/var/log/app"), scan_worker=worker)
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from python_log_viewer import stats as _stats
+
+try:  # POSIX only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+_STREAM_CHUNK = 500  # entries per message when streaming results back
+_MAX_RESULT_BYTES = 64 * 1024 * 1024
+_ALLOWED_METHODS = frozenset({"read", "read_merged"})
+_POLL_SECONDS = 0.1
+
+
+# ---------------------------------------------------------------------------
+# Child process
+# ---------------------------------------------------------------------------
+
+
+def _apply_limits(memory_limit: Optional[int], nice: int, cpu_affinity: Optional[Tuple[int, ...]]) -> None:
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    if nice:
+        os.nice(nice)
+    if cpu_affinity and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_affinity)
+
+
+def _worker_main(conn, cancel_event, memory_limit, nice, cpu_affinity) -> None:
+    """Serve scan requests from *conn* until the parent goes away.
+
+    *cancel_event* is set by the parent to cancel the running scan.
+    """
+    from python_log_viewer import stats
+    from python_log_viewer.cancel import CancelToken
+    from python_log_viewer.core import LogDirectory, LogReader
+
+    _apply_limits(memory_limit, nice, cpu_affinity)
+    cancel = CancelToken(cancel_event)
+    readers: Dict[tuple, LogReader] = {}
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        method, dir_path, rotation_patterns, formats, parallel_workers, kwargs = request
+        try:
+            key = (dir_path, rotation_patterns, formats, parallel_workers)
+            reader = readers.get(key)
+            if reader is None:
+                reader = LogReader(
+                    LogDirectory(dir_path, rotation_patterns=rotation_patterns, formats=dict(formats)),
+                    parallel_workers=parallel_workers,
+                )
+                readers[key] = reader
+            with stats.collect(method) as scan_stats:
+                result = getattr(reader, method)(cancel=cancel, **kwargs)
+            # Stream the entries in chunks so neither side has to pickle one
+            # huge message for ``lines=0`` reads.
+            entries = result.pop("lines", [])
+            for i in range(0, len(entries), _STREAM_CHUNK):
+                conn.send(("lines", entries[i:i + _STREAM_CHUNK]))
+            conn.send(("stats", scan_stats.to_dict()))
+            conn.send(("result", result))
+        except MemoryError:
+            conn.send(("error", "Scan exceeded the worker memory limit"))
+        except Exception as exc:
+            conn.send(("error", f"Error reading log file: {exc}"))
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+
+class _Child:
+    def __init__(self, ctx, options: tuple) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.cancel_event = ctx.Event()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.cancel_event, *options),
+            name="log-viewer-scan",
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class ScanWorker:
+    """A pool of long-lived sidecar processes that execute ``LogReader`` scans.
+
+    Parameters
+    ----------
+    processes:
+        Number of child processes, i.e. how many scans can run at once.
+        Further requests wait for a free child.
+    memory_limit:
+        Address-space limit per child in bytes (``RLIMIT_AS``); a scan that
+        exceeds it fails with an error result instead of growing the host.
+    nice:
+        Niceness added to each child so the host's request handlers win
+        CPU contention.
+    cpu_affinity:
+        Optional CPU ids the children are pinned to (Linux only).
+    timeout:
+        Seconds a single scan may take before its child is killed and
+        replaced; ``None`` waits forever.
+    max_result_bytes:
+        Bound on the entry text one result brings into the host (``0``: no
+        bound).  ``lines=0`` reads only scan the newest *max_result_bytes*
+        of the files (the result carries ``"partial": True``); a result
+        still larger than that (e.g. a page of huge entries without
+        ``max_entry_bytes``) kills its child and fails with an error.
+    """
+
+    def __init__(
+        self,
+        processes: int = 1,
+        *,
+        memory_limit: Optional[int] = None,
+        nice: int = 10,
+        cpu_affinity: Optional[Iterable[int]] = None,
+        timeout: Optional[float] = 60.0,
+        max_result_bytes: int = _MAX_RESULT_BYTES,
+    ) -> None:
+        self.processes = max(1, processes)
+        self.timeout = timeout
+        self.max_result_bytes = max(0, max_result_bytes)
+        self._options = (
+            memory_limit,
+            nice,
+            tuple(cpu_affinity) if cpu_affinity is not None else None,
+        )
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[Optional[_Child]]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        with self._lock:
+            if not self._started:
+                # Children are spawned lazily on first use.
+                for _ in range(self.processes):
+                    self._idle.put(None)
+                self._started = True
+
+    def call(self, method: str, log_dir, parallel_workers: int = 0, cancel=None, **kwargs) -> dict:
+        """Run ``LogReader(log_dir).<method>(**kwargs)`` in a child process.
+
+        When the optional *cancel* token is cancelled the child is told to
+        stop at its next check point; the child itself is kept.  The result
+        is bounded by :attr:`max_result_bytes`.
+        """
+        if method not in _ALLOWED_METHODS:
+            raise ValueError(f"Unsupported scan method: {method}")
+        limit = self.max_result_bytes
+        if limit and kwargs.get("lines", 100) <= 0:
+            max_bytes = kwargs.get("max_bytes") or 0
+            kwargs["max_bytes"] = min(max_bytes, limit) if max_bytes else limit
+        self._start()
+        child = self._idle.get()
+        try:
+            if child is None or not child.process.is_alive():
+                child = _Child(self._ctx, self._options)
+            child.cancel_event.clear()
+            child.conn.send(
+                (
+                    method, log_dir.path, log_dir.rotation_patterns, log_dir.formats.spec,
+                    parallel_workers, kwargs,
+                )
+            )
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            entries: list = []
+            received = 0  # characters, at most as many as bytes
+            while True:
+                while not child.conn.poll(_POLL_SECONDS):
+                    if cancel is not None and cancel.cancelled:
+                        child.cancel_event.set()
+                    if deadline is not None and time.monotonic() > deadline:
+                        child.process.kill()
+                        child.process.join()
+                        child = None
+                        return {"lines": [], "total": 0, "page": 1, "total_pages": 1,
+                                "error": "Scan timed out"}
+                kind, payload = child.conn.recv()
+                if kind == "lines":
+                    received += sum(map(len, payload))
+                    if limit and received > limit:
+                        # Do not drain the rest: the child is replaced.
+                        child.process.kill()
+                        child.process.join()
+                        child = None
+                        return {"lines": [], "total": 0, "page": 1, "total_pages": 1,
+                                "error": "Scan result exceeded the worker result limit"}
+                    entries.extend(payload)
+                elif kind == "stats":
+                    request_stats = _stats.current()
+                    if request_stats is not None:
+                        request_stats.merge(payload)
+                elif kind == "result":
+                    return {"lines": entries, **payload}
+                else:
+                    return {"lines": [], "total": 0, "page": 1, "total_pages": 1, "error": payload}
+        except (EOFError, OSError):
+            # The child died mid-scan (e.g. killed by the kernel).
+            child = None
+            return {"lines": [], "total": 0, "page": 1, "total_pages": 1,
+                    "error": "Scan worker exited unexpectedly"}
+        finally:
+            self._idle.put(child)
+
+    def close(self) -> None:
+        """Stop all idle children; busy ones are stopped when returned."""
+        with self._lock:
+            self._started = False
+        while True:
+            try:
+                child = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if child is not None:
+                child.stop()
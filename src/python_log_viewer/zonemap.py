@@ -0,0 +1,267 @@
+"""
+Zone maps: per-block summaries of plain log files.
+
+A file is cut into zones of about :data:`ZONE_BYTES`: zone ``i`` holds the
+entries that start in ``[i * ZONE_BYTES, (i + 1) * ZONE_BYTES)``, so every
+zone begins at an entry start and can be read on its own.  A :class:`Zone`
+records the first and last timestamp in it, a bitmap of the level keywords
+it contains and its entry count.
+
+Zones are summarised the first time a scan reaches them and cached per
+file.  A zone is only summarised once the entry after it has been written,
+so appends never invalidate a summary – they just complete the next zone –
+and the newest, still growing part of a file is always scanned.  The map
+starts over when the file is replaced (rotated), truncated or rewritten
+in place.
+
+Level-filtered and time-bounded scans of
+:meth:`LogReader.read <python_log_viewer.core.LogReader.read>` ask a
+:class:`ZoneFilter` which parts of their window can hold a match::
+
+    zones = zone_filter("ERROR")
+    for start, end in zones.ranges(source, 0, source.size):
+        ...  # newest first; zones without "ERROR" are left out
+
+so "ERRORs from the last 6 hours" of a chatty INFO log only reads the
+zones that contain errors.
+
+No external dependencies – only the Python standard library.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from python_log_viewer import stats as _stats
+from python_log_viewer.filecache import FileCache
+from python_log_viewer.sources import PlainSource
+from python_log_viewer.structured import json_lines
+from python_log_viewer.timestamps import parse_timestamp
+
+ZONE_BYTES = 1024 * 1024  # 1 MB
+
+# Keywords tracked in the level bitmap, bit i for LEVELS[i].  Presence is
+# a byte-substring test, like the level filter's ``level in entry`` (of the
+# upper-cased bytes in JSON-lines files).
+LEVELS = ("TRACE", "DEBUG", "INFO", "NOTICE", "WARN", "WARNING", "ERROR", "CRITICAL", "FATAL")
+_LEVEL_BYTES = tuple((1 << bit, name.encode()) for bit, name in enumerate(LEVELS))
+
+# A line starting a new entry (an approximation of
+# ``LogReader._is_new_entry_start`` used only to count entries); "{" starts
+# one only in JSON-lines files.
+_KEYWORD_START = rb"[ \t]*(?:(?:INFO|WARNING|ERROR|DEBUG|CRITICAL)|\[(?:INFO|WARNING|ERROR|DEBUG|CRITICAL)\])(?:\s|$)"
+_ENTRY_RE = re.compile(rb"\n(?=[0-9]|" + _KEYWORD_START + rb")")
+_JSON_ENTRY_RE = re.compile(rb"\n(?=[0-9{]|" + _KEYWORD_START + rb")")
+
+_PROBE_BYTES = 64 * 1024
+_MAX_CACHED_MAPS = 64
+
+
+class Zone(NamedTuple):
+    """The summary of the entries in ``[start, end)``."""
+
+    start: int
+    end: int
+    first_ts: Optional[float]  # of the first timestamped line (None: none found)
+    last_ts: Optional[float]  # of the last timestamped line
+    stamped: bool  # the first entry carries its own timestamp
+    levels: int  # bitmap of the LEVELS keywords present
+    entries: int  # approximate
+    lines: int
+
+
+def level_bits(level: str) -> int:
+    """Return the bitmap of the keywords a ``level`` filter implies.
+
+    An entry matching *level* contains every keyword that *level* itself
+    contains (``"WARN"`` for ``"warning"``), so a zone missing one of them
+    cannot hold a match.
+    """
+    upper = level.upper()
+    return sum(1 << bit for bit, name in enumerate(LEVELS) if name in upper)
+
+
+def summarize(data: bytes, start: int, json_lines: bool = False) -> Zone:
+    """Return the :class:`Zone` of *data*, the entries starting at *start*."""
+    levels = 0
+    # JSON-lines levels are matched without regard to case (``"error"``).
+    keywords = data.upper() if json_lines else data
+    for bit, name in _LEVEL_BYTES:
+        if name in keywords:
+            levels |= bit
+    head = data[:_PROBE_BYTES].decode("utf-8", errors="replace").split("\n")
+    tail = data[-_PROBE_BYTES:].decode("utf-8", errors="replace").split("\n")
+    if len(data) > _PROBE_BYTES:
+        head, tail = head[:-1], tail[1:]  # cut lines
+    first_ts = next((ts for ts in map(parse_timestamp, head) if ts is not None), None)
+    last_ts = next((ts for ts in map(parse_timestamp, reversed(tail)) if ts is not None), None)
+    return Zone(
+        start=start,
+        end=start + len(data),
+        first_ts=first_ts,
+        last_ts=last_ts,
+        stamped=bool(head) and parse_timestamp(head[0]) is not None,
+        levels=levels,
+        entries=len((_JSON_ENTRY_RE if json_lines else _ENTRY_RE).findall(b"\n" + data)),
+        lines=data.count(b"\n"),
+    )
+
+
+class ZoneMap:
+    """The zones of one file, summarised as scans reach them.
+
+    Summaries are immutable, so concurrent scans at worst compute one twice.
+    """
+
+    def __init__(self, zone_bytes: int = ZONE_BYTES) -> None:
+        self.zone_bytes = zone_bytes
+        self.json_lines: Optional[bool] = None  # detected from the first line
+        self._starts: Dict[int, int] = {0: 0}
+        self._zones: Dict[int, Zone] = {}
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def start(self, source, i: int) -> Optional[int]:
+        """Return the offset zone *i* starts at (``None``: not written yet)."""
+        offset = self._starts.get(i)
+        if offset is None:
+            offset = self._boundary(source, i * self.zone_bytes)
+            if offset is not None:
+                self._starts[i] = offset
+        return offset
+
+    def zone(self, source, i: int) -> Optional[Zone]:
+        """Return the summary of zone *i*, or ``None`` while it is incomplete."""
+        zone = self._zones.get(i)
+        if zone is None:
+            start = self.start(source, i)
+            end = self.start(source, i + 1)
+            if start is None or end is None:
+                return None
+            zone = summarize(source.read(start, end), start, bool(self.json_lines))
+            self._zones[i] = zone
+        return zone
+
+    def _boundary(self, source, pos: int) -> Optional[int]:
+        """Return the first entry start at or after *pos* on a complete line."""
+        from python_log_viewer.core import LogReader  # core imports this module
+
+        if self.json_lines is None:
+            self.json_lines = json_lines(source)
+        is_start = LogReader._is_new_entry_start
+        is_json = bool(self.json_lines)
+        size = source.size
+        # A line starts at *pos* only if the preceding byte is a newline.
+        skip_partial = pos > 0 and source.read(pos - 1, pos) != b"\n"
+        while pos < size:
+            block = source.read(pos, min(size, pos + _PROBE_BYTES))
+            offset = pos
+            for line in block.split(b"\n")[:-1]:  # the last one may be incomplete
+                if skip_partial:
+                    skip_partial = False
+                elif is_start(line.decode("utf-8", errors="replace").rstrip(), is_json):
+                    return offset
+                offset += len(line) + 1
+            if offset == pos:
+                # A single line longer than the probe window.
+                offset = pos + len(block)
+                skip_partial = True
+            pos = offset
+        return None
+
+
+_maps: FileCache[ZoneMap] = FileCache(ZoneMap, _MAX_CACHED_MAPS, "zone")
+
+
+def zone_map(path: str) -> ZoneMap:
+    """Return the cached :class:`ZoneMap` of the file at *path*.
+
+    The map starts over when the file is replaced (rotated), truncated or
+    rewritten (see :class:`~python_log_viewer.filecache.FileCache`).
+    """
+    return _maps.get(path)
+
+
+# ---------------------------------------------------------------------------
+# Skipping
+# ---------------------------------------------------------------------------
+
+
+class ZoneFilter:
+    """Which zones of a scan window can hold entries matching a query.
+
+    A zone is skipped when it lacks a level keyword the ``level`` filter
+    implies, or when its entries are all stamped before *since* or after
+    *until* (timestamps are assumed ascending, as for time seeking).
+    ``lines_skipped`` counts the physical lines left out, for callers that
+    size their window in lines.
+    """
+
+    def __init__(self, level: str = "", since: Optional[float] = None, until: Optional[float] = None) -> None:
+        self.bits = level_bits(level)
+        self.since = since
+        self.until = until
+        self.lines_skipped = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.bits) or self.since is not None or self.until is not None
+
+    def _skips(self, zone: Zone, newer: Optional[Zone]) -> bool:
+        if zone.levels & self.bits != self.bits:
+            return True
+        # Untimed entries inherit the timestamp before them, so a zone is
+        # only dropped for its times when it and the zone after it both
+        # start with a timestamp of their own.
+        if not (zone.stamped and newer is not None and newer.stamped):
+            return False
+        if self.since is not None and zone.last_ts is not None and zone.last_ts < self.since:
+            return True
+        return self.until is not None and zone.first_ts is not None and zone.first_ts > self.until
+
+    def ranges(self, source, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yield the parts of ``[start, end)`` of *source* to scan, newest first.
+
+        Zones are summarised lazily, so a scan that stops early reads no
+        further.  Sources without a zone map (compressed or in-memory ones)
+        are yielded whole.
+        """
+        if not isinstance(source, PlainSource) or end <= start:
+            if end > start:
+                yield start, end
+            return
+        zones = zone_map(source.path)
+        pending: Optional[List[int]] = None  # [start, end) to scan
+        upper = end
+        newer: Optional[Zone] = None
+        i = (end - 1) // zones.zone_bytes
+        while upper > start and i >= 0:
+            zone_start = zones.start(source, i)
+            if zone_start is None or zone_start >= upper:
+                i -= 1
+                continue  # no entry starts in this part of the file yet
+            lo = max(start, zone_start)
+            zone = zones.zone(source, i)
+            if zone is not None and self._skips(zone, newer):
+                _stats.add("blocks_skipped", 1)
+                if zone.end > zone.start:
+                    self.lines_skipped += zone.lines * (upper - lo) // (zone.end - zone.start)
+                if pending is not None:
+                    yield pending[0], pending[1]
+                    pending = None
+            elif pending is not None:
+                pending[0] = lo
+            else:
+                pending = [lo, upper]
+            newer = zone
+            upper = zone_start
+            i -= 1
+        if pending is not None:
+            yield pending[0], pending[1]
+
+
+def zone_filter(level: str = "", since: Optional[float] = None, until: Optional[float] = None) -> Optional[ZoneFilter]:
+    """Return a :class:`ZoneFilter` for the query, or ``None`` if it cannot skip anything."""
+    zones = ZoneFilter(level, since, until)
+    return zones if zones else None
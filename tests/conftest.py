@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from python_log_viewer.core import LogDirectory, LogReader
+
+_LEVEL_KEYWORDS = {"INFO", "WARNING", "ERROR", "DEBUG", "CRITICAL"}
+
+
+def _baseline_is_entry_start(line: str) -> bool:
+    if not line:
+        return False
+    if line[0].isdigit():
+        return True
+    token = line.split()[0]
+    if token in _LEVEL_KEYWORDS:
+        return True
+    return token.startswith("[") and token.endswith("]") and token[1:-1] in _LEVEL_KEYWORDS
+
+
+def baseline_read(path: str, *, level: str = "", search: str = "") -> list:
+    """All entries of *path* as the original line-by-line reader grouped them."""
+    entries: list = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh.readlines():
+            stripped = line.rstrip()
+            if _baseline_is_entry_start(stripped) or not entries:
+                entries.append(stripped)
+            else:
+                entries[-1] += "\n" + stripped
+    if level:
+        entries = [e for e in entries if level.upper() in e]
+    if search:
+        entries = [e for e in entries if search.lower() in e.lower()]
+    return entries
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return LogDirectory(str(tmp_path))
+
+
+@pytest.fixture
+def reader(log_dir):
+    return LogReader(log_dir)
+
+
+@pytest.fixture
+def write_log(tmp_path):
+    def write(name: str, text: str) -> str:
+        path = os.path.join(str(tmp_path), name)
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        return path
+
+    return write
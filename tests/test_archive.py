@@ -0,0 +1,67 @@
+"""Columnar archives: written from (compressed) logs, read back with block skipping."""
+
+import pytest
+
+from python_log_viewer import stats
+from python_log_viewer.archive import ARCHIVE_SUFFIX, write_archive
+from tests.test_compressed import passes, write_compressed  # noqa: F401 (fixture)
+
+
+def _log(count: int) -> str:
+    # One entry per second; ERRORs (with a traceback) only in entries 1000-1099.
+    lines = []
+    for i in range(count):
+        stamp = f"2024-01-01 {i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d},000"
+        if 1000 <= i < 1100:
+            lines.append(f"{stamp} ERROR app.db: query {i} failed\nTraceback (most recent call last):\nValueError: {i}\n")
+        else:
+            lines.append(f"{stamp} INFO app.web: request {i} served\n")
+    return "".join(lines)
+
+
+def _read(reader, file, **kwargs):
+    with stats.collect("test") as scan_stats:
+        result = reader.read(file, lines=0, **kwargs)
+    return result, scan_stats.counters["blocks_skipped"]
+
+
+@pytest.fixture
+def archived(tmp_path, write_log):
+    path = write_log("app.log", _log(3000))
+    write_archive([path], str(tmp_path / ("app" + ARCHIVE_SUFFIX)), block_entries=100)
+    return "app" + ARCHIVE_SUFFIX
+
+
+def test_roundtrip(reader, archived):
+    assert reader.read(archived, lines=0)["lines"] == reader.read("app.log", lines=0)["lines"]
+    page = reader.read(archived, lines=50, page=3)
+    assert page["lines"] == reader.read("app.log", lines=50, page=3)["lines"]
+    assert page["total"] == 3000
+
+
+def test_level_filter_skips_blocks(reader, archived):
+    result, skipped = _read(reader, archived, level="error")
+    assert result["lines"] == reader.read("app.log", lines=0, level="error")["lines"]
+    assert result["total"] == 100
+    assert skipped >= 28  # only the blocks of entries 1000-1099 hold errors
+
+
+def test_time_range_skips_blocks(reader, archived):
+    bounds = {"since": "2024-01-01T00:20:00", "until": "2024-01-01T00:25:00"}
+    result, skipped = _read(reader, archived, **bounds)
+    assert result["lines"] == reader.read("app.log", lines=0, **bounds)["lines"]
+    assert result["total"] == 301
+    assert skipped >= 25
+
+
+@pytest.mark.parametrize("suffix", [".xz", ".bz2"])
+def test_write_from_compressed_logs_decompresses_once(tmp_path, reader, write_log, passes, suffix):
+    text = _log(30000)
+    path = write_compressed(tmp_path, "app.log.1" + suffix, text)
+    summary = write_archive([path], str(tmp_path / ("old" + ARCHIVE_SUFFIX)), block_entries=1000)
+    assert passes["passes"] <= 3
+    assert summary["entries"] == 30000
+    write_log("plain.log", text)
+    for query in ({}, {"level": "error"}):
+        archived = reader.read("old" + ARCHIVE_SUFFIX, lines=0, **query)["lines"]
+        assert archived == reader.read("plain.log", lines=0, **query)["lines"]
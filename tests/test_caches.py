@@ -0,0 +1,77 @@
+"""Per-file indexes must start over when a file is rewritten in place."""
+
+import json
+import os
+
+from python_log_viewer.filecache import FileCache
+
+
+def _rewrite(path: str, text: str) -> None:
+    """Truncate *path* and write *text*, keeping the inode (``copytruncate``)."""
+    inode = os.stat(path).st_ino
+    with open(path, "r+", newline="") as fh:
+        fh.truncate(0)
+        fh.write(text)
+    assert os.stat(path).st_ino == inode
+
+
+def _log(message: str, count: int) -> str:
+    return "".join(f"2024-01-01 00:00:{i % 60:02d} ERROR {message} {i}\n" for i in range(count))
+
+
+def test_file_cache_keeps_appended_files(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(_log("first", 10))
+    cache = FileCache(dict, 4)
+    value = cache.get(str(path))
+    with open(path, "a") as fh:
+        fh.write(_log("more", 10))
+    assert cache.get(str(path)) is value
+
+
+def test_file_cache_drops_regrown_files(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(_log("first", 10))
+    cache = FileCache(dict, 4)
+    value = cache.get(str(path))
+    _rewrite(str(path), _log("second", 40))
+    assert cache.get(str(path)) is not value
+
+
+def test_patterns_after_truncate_and_regrow(reader, write_log):
+    path = write_log("app.log", _log("Connection refused", 50))
+    templates = [p["template"] for p in reader.patterns("app.log")["patterns"]]
+    assert any("Connection refused" in t for t in templates)
+
+    _rewrite(path, _log("Disk full on", 200))
+    result = reader.patterns("app.log")
+    templates = [p["template"] for p in result["patterns"]]
+    assert result["entries"] == 200
+    assert any("Disk full on" in t for t in templates)
+    assert not any("Connection refused" in t for t in templates)
+
+
+def test_fields_after_truncate_and_regrow(reader, write_log):
+    def records(user: str, count: int) -> str:
+        return "".join(json.dumps({"n": i % 10, "level": "ERROR", "user": user}) + "\n" for i in range(count))
+
+    def page(user: str) -> list:
+        return reader.read("api.log", lines=50, before=10**12, fields=f"user={user}")["lines"]
+
+    path = write_log("api.log", records("alice", 20))
+    assert len(page("alice")) == 20
+
+    # Same entry lengths at the same offsets, different values.
+    _rewrite(path, records("bobby", 30))
+    assert page("alice") == []
+    assert len(page("bobby")) == 30
+
+
+def test_zone_skipping_after_truncate_and_regrow(reader, write_log):
+    # Several 1 MB zones without an ERROR, summarised by the first read.
+    info = "".join(f"2024-01-01 00:00:{i % 60:02d} INFO request {i} served in 12 ms\n" for i in range(60000))
+    path = write_log("app.log", info)
+    assert reader.read("app.log", lines=0, level="ERROR")["lines"] == []
+
+    _rewrite(path, _log("Disk full on", 60000) + info)
+    assert len(reader.read("app.log", lines=0, level="ERROR")["lines"]) == 60000
@@ -0,0 +1,158 @@
+"""Compressed logs: gzip checkpoints, and stream-only archives decompressed once per scan."""
+
+import bz2
+import gzip
+import lzma
+import os
+import random
+
+import pytest
+
+from python_log_viewer import sources
+
+COMPRESSORS = {".xz": lzma.compress, ".bz2": bz2.compress}
+
+
+def _log(count: int) -> str:
+    return "".join(
+        f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d},000 {'ERROR' if i % 10 == 0 else 'INFO'} "
+        f"app.worker: request {i} from 10.0.0.{i % 250} took {i % 97} ms\n"
+        for i in range(count)
+    )
+
+
+def write_compressed(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_bytes(COMPRESSORS[path.suffix](text.encode()))
+    return str(path)
+
+
+@pytest.fixture
+def passes(monkeypatch):
+    """Count the decompression passes over stream-only sources."""
+    counter = {"passes": 0}
+    blocks = sources.StreamSource._blocks
+
+    def counting(self):
+        counter["passes"] += 1
+        return blocks(self)
+
+    monkeypatch.setattr(sources.StreamSource, "_blocks", counting)
+    return counter
+
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+def test_patterns_decompress_once(tmp_path, reader, passes, suffix):
+    # Several MB uncompressed: many scan blocks.
+    text = _log(40000)
+    write_compressed(tmp_path, "app.log.1" + suffix, text)
+    (tmp_path / "app.log").write_text(text)
+    expected = reader.patterns("app.log")
+    result = reader.patterns("app.log.1" + suffix)
+    assert passes["passes"] <= 3
+    assert result["entries"] == expected["entries"] == 40000
+    assert result["patterns"] == expected["patterns"]
+
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+def test_cursor_pages_decompress_once(tmp_path, reader, passes, suffix):
+    # A sparse filter: the page is filled from all over the file.
+    text = _log(40000)
+    write_compressed(tmp_path, "app.log.1" + suffix, text)
+    (tmp_path / "app.log").write_text(text)
+    query = {"lines": 20, "level": "error", "search": "took 96 ms"}
+    before = len(text.encode()) - 1000
+    expected = reader.read("app.log", before=before, **query)
+    result = reader.read("app.log.1" + suffix, before=before, **query)
+    assert passes["passes"] <= 3
+    assert len(result["lines"]) == 20
+    assert result["lines"] == expected["lines"]
+    assert result["offsets"] == expected["offsets"]
+    older = reader.read("app.log.1" + suffix, before=result["cursor"]["older"], **query)
+    assert older["lines"] == reader.read("app.log", before=expected["cursor"]["older"], **query)["lines"]
+
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+def test_merged_reads_decompress_once(tmp_path, reader, passes, suffix):
+    write_compressed(tmp_path, "app.log.1" + suffix, _log(40000))
+    (tmp_path / "app.log").write_text(_log(100))
+    result = reader.read_merged(["app.log", "app.log.1" + suffix], lines=20, level="error", search="took 96 ms")
+    assert passes["passes"] <= 3
+    assert len(result["lines"]) == 20
+    assert result["sources"].count("app.log.1" + suffix) == 20
+
+
+# ---------------------------------------------------------------------------
+# gzip checkpoint index
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def inflated(monkeypatch):
+    """Count the bytes gzip reads decompress."""
+    counter = {"bytes": 0}
+    inflate = sources._inflate
+
+    def counting(*args, **kwargs):
+        for block in inflate(*args, **kwargs):
+            counter["bytes"] += len(block)
+            yield block
+
+    monkeypatch.setattr(sources, "_inflate", counting)
+    return counter
+
+
+def test_gzip_reads_resume_from_checkpoints(tmp_path, inflated):
+    data = _log(40000).encode()
+    path = tmp_path / "app.log.1.gz"
+    path.write_bytes(gzip.compress(data))
+    source = sources.GzipSource(str(path), span=64 * 1024)
+    assert not source.indexed
+    assert source.size == len(data)
+    outputs = [out for _comp, out, _state in source._points]
+    assert source.indexed and len(outputs) > 4
+    gap = max(b - a for a, b in zip(outputs, outputs[1:] + [len(data)]))
+    rng = random.Random(7)
+    for _ in range(50):
+        start = rng.randrange(len(data))
+        end = start + rng.randrange(1, 200_000)
+        inflated["bytes"] = 0
+        assert source.read(start, end) == data[start:end]
+        # From the nearest checkpoint, not from the start of the file.
+        assert inflated["bytes"] <= min(end, len(data)) - start + 2 * gap
+    assert source.read(len(data) - 10, len(data) + 10) == data[-10:]
+    assert source.read(len(data), len(data) + 10) == b""
+
+
+def test_gzip_multi_member_with_padding(tmp_path):
+    members = [_log(n).encode() for n in (15000, 1, 20000)]
+    data = b"".join(members)
+    path = tmp_path / "app.log.1.gz"
+    path.write_bytes(b"".join(map(gzip.compress, members)) + b"\0" * 512)
+    source = sources.GzipSource(str(path), span=32 * 1024)
+    assert source.size == len(data)
+    boundary = len(members[0])
+    assert source.read(boundary - 100, boundary + 200) == data[boundary - 100:boundary + 200]
+    rng = random.Random(11)
+    for _ in range(30):
+        start = rng.randrange(len(data))
+        end = start + rng.randrange(1, 300_000)
+        assert source.read(start, end) == data[start:end]
+
+
+def test_gzip_index_rebuilt_after_append(tmp_path, reader):
+    path = tmp_path / "app.log.1.gz"
+    path.write_bytes(gzip.compress(_log(20000).encode()))
+    first = sources.open_source(str(path))
+    assert first.size == len(_log(20000).encode())
+    assert sources.open_source(str(path)) is first  # cached with its index
+    old = reader.read("app.log.1.gz", lines=5)
+    with open(path, "ab") as fh:  # a second member, as ``gzip >>`` writes
+        fh.write(gzip.compress(b"2024-01-02 00:00:00,000 ERROR app.worker: appended\n"))
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    second = sources.open_source(str(path))
+    assert second is not first
+    assert second.size == first.size + len("2024-01-02 00:00:00,000 ERROR app.worker: appended\n")
+    new = reader.read("app.log.1.gz", lines=5)
+    assert new["lines"] == old["lines"][1:] + ["2024-01-02 00:00:00,000 ERROR app.worker: appended"]
+    assert new["total"] == old["total"] + 1
@@ -0,0 +1,110 @@
+"""IndexedRotatingFileHandler: sidecars follow the logs, readers trust them only when they apply."""
+
+import logging
+
+import pytest
+
+from python_log_viewer.core import LogReader
+from python_log_viewer.handlers import IndexedRotatingFileHandler, open_index
+from tests.conftest import baseline_read
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """Count the entries read through sidecar indexes."""
+    counter = {"entries": 0}
+    read = LogReader._read_indexed_entries
+
+    def counting(path, records):
+        counter["entries"] += len(records)
+        return read(path, records)
+
+    monkeypatch.setattr(LogReader, "_read_indexed_entries", staticmethod(counting))
+    return counter
+
+
+@pytest.fixture
+def logger(tmp_path):
+    handlers = []
+
+    def make(**kwargs):
+        handler = IndexedRotatingFileHandler(str(tmp_path / "app.log"), **kwargs)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        log = logging.getLogger(f"indexed.{len(handlers)}")
+        log.propagate = False
+        log.setLevel(logging.DEBUG)
+        log.addHandler(handler)
+        handlers.append((log, handler))
+        return log
+
+    yield make
+    for log, handler in handlers:
+        log.removeHandler(handler)
+        handler.close()
+
+
+def _emit(log, count, start=0):
+    for i in range(start, start + count):
+        if i % 4 == 0:
+            log.error("job %d failed\nTraceback (most recent call last):\nValueError: %d", i, i)
+        else:
+            log.info("job %d done", i)
+
+
+def test_sidecars_rotate_with_their_logs(tmp_path, reader, logger, indexed):
+    log = logger(maxBytes=4096, backupCount=3)
+    _emit(log, 200)
+    names = ["app.log", "app.log.1", "app.log.2", "app.log.3"]
+    for name in names:
+        index = open_index(str(tmp_path / name))
+        assert index is not None, name
+        with index:
+            assert index.count == len(baseline_read(str(tmp_path / name)))
+            assert index.end == (tmp_path / name).stat().st_size
+    assert not (tmp_path / "app.log.4.lvidx").exists()
+
+    expected = [e for name in reversed(names) for e in baseline_read(str(tmp_path / name))]
+    assert reader.read("app.log", lines=0, rotated=True)["lines"] == expected
+    errors = reader.read("app.log", lines=10, rotated=True, level="error")
+    assert errors["lines"] == [e for e in expected if "ERROR" in e][-10:]
+    assert indexed["entries"] == len(expected) + 10
+
+
+def test_log_with_earlier_content_is_scanned(tmp_path, reader, write_log, logger, indexed):
+    write_log("app.log", "2024-01-01 00:00:00,000 INFO old: before the handler\n")
+    log = logger(maxBytes=1024 * 1024, backupCount=1)
+    _emit(log, 10)
+    assert open_index(str(tmp_path / "app.log")) is None  # does not start at byte 0
+    result = reader.read("app.log", lines=0)
+    assert result["lines"] == baseline_read(str(tmp_path / "app.log"))
+    assert result["lines"][0].endswith("before the handler") and len(result["lines"]) == 11
+    assert indexed["entries"] == 0
+
+
+def test_entries_appended_by_another_writer(tmp_path, reader, logger, indexed):
+    log = logger(maxBytes=1024 * 1024, backupCount=1)
+    _emit(log, 12)
+    path = tmp_path / "app.log"
+    with open(path, "a") as fh:  # e.g. a second process with a plain FileHandler
+        fh.write("2030-01-01 00:00:00,000 ERROR other: foreign 1\n  detail\n")
+        fh.write("2030-01-01 00:00:01,000 INFO other: foreign 2\n")
+        fh.write("2030-01-01 00:00:02,000 ERROR other: half written")
+    expected = baseline_read(str(path))[:-1]
+    complete = path.stat().st_size - len("2030-01-01 00:00:02,000 ERROR other: half written")
+
+    result = reader.read("app.log", lines=0)
+    assert result["lines"] == expected
+    assert result["end"] == complete
+    assert indexed["entries"] == 12  # the sidecar still served its part
+    assert reader.read("app.log", lines=5, level="error")["lines"] == [e for e in expected if "ERROR" in e][-5:]
+    older = reader.read("app.log", lines=2, before=result["end"])
+    assert older["lines"] == expected[-2:]
+    assert reader.read("app.log", lines=3, before=older["cursor"]["older"])["lines"] == expected[-5:-2]
+    assert reader.read("app.log", lines=0, since="2029-12-31T00:00:00")["lines"] == [
+        e for e in expected if "foreign" in e
+    ]
+
+    # The handler notices the foreign bytes and starts its sidecar over.
+    _emit(log, 1, start=12)
+    assert open_index(str(path)) is None
+    assert reader.read("app.log", lines=0)["lines"] == baseline_read(str(path))
@@ -0,0 +1,104 @@
+"""Integrations: malformed integer parameters are answered with 400; optional features load lazily."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BAD_PARAMETERS = [
+    ("/api/content", {"file": "app.log", "lines": "many"}, "lines"),
+    ("/api/content", {"file": "app.log", "max_entry_bytes": "1k"}, "max_entry_bytes"),
+    ("/api/merged", {"files": "app.log", "page": "two"}, "page"),
+    ("/api/context", {"file": "app.log", "offset": "0", "before": "x"}, "before"),
+    ("/api/context", {"file": "app.log", "offset": "0", "after": "x"}, "after"),
+    ("/api/patterns", {"file": "app.log", "top": "x"}, "top"),
+]
+
+
+@pytest.fixture
+def app_log(write_log):
+    return write_log("app.log", "2024-01-01 00:00:00 ERROR boom\n")
+
+
+@pytest.mark.parametrize("path, args, name", BAD_PARAMETERS)
+def test_stdlib_server(tmp_path, app_log, path, args, name):
+    from python_log_viewer.server import LogViewerServer, _Request
+
+    server = LogViewerServer(log_dir=str(tmp_path))
+    response = asyncio.run(server.handle(_Request("GET", path, args, {}, "HTTP/1.1", None)))
+    assert response.status == 400
+    assert json.loads(response.body) == {"error": f"{name} must be an integer"}
+
+
+@pytest.mark.parametrize("path, args, name", BAD_PARAMETERS)
+def test_flask(tmp_path, app_log, path, args, name):
+    flask = pytest.importorskip("flask")
+    from python_log_viewer.contrib.flask import create_log_viewer_blueprint
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(create_log_viewer_blueprint(log_dir=str(tmp_path)))
+    response = app.test_client().get("/logs" + path, query_string=args)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": f"{name} must be an integer"}
+
+
+@pytest.mark.parametrize("path, args, name", BAD_PARAMETERS)
+def test_django(tmp_path, app_log, monkeypatch, path, args, name):
+    pytest.importorskip("django")
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(ALLOWED_HOSTS=["*"], BASE_DIR=str(tmp_path))
+        django.setup()
+    from django.test import RequestFactory
+
+    from python_log_viewer.contrib.django import urls, views
+
+    monkeypatch.setattr(settings, "LOG_VIEWER_DIR", str(tmp_path), raising=False)
+    monkeypatch.setattr(views, "_log_dir", None)
+    monkeypatch.setattr(views, "_reader", None)
+    view = next(p.callback for p in urls.urlpatterns if str(p.pattern) == path.lstrip("/"))
+    response = view(RequestFactory().get(path, args))
+    assert response.status_code == 400
+    assert json.loads(response.content) == {"error": f"{name} must be an integer"}
+
+
+def test_django_imports_optional_features_lazily(tmp_path):
+    pytest.importorskip("django")
+    script = (
+        "import sys, django\n"
+        "from django.conf import settings\n"
+        f"settings.configure(ALLOWED_HOSTS=['*'], BASE_DIR={str(tmp_path)!r})\n"
+        "django.setup()\n"
+        "from python_log_viewer.contrib.django import views\n"
+        "print(sorted(m for m in ('worker', 'planner', 'federation') if 'python_log_viewer.' + m in sys.modules))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env).stdout
+    assert output.strip() == "[]"
+
+
+@pytest.mark.parametrize(
+    "path, args",
+    [
+        ("/api/content", {"file": "app.log"}),
+        ("/api/merged", {"files": "app.log"}),
+        ("/api/patterns", {"file": "app.log"}),
+    ],
+)
+def test_fastapi_endpoints_taking_the_request(tmp_path, app_log, path, args):
+    fastapi = pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from python_log_viewer.contrib.fastapi import create_log_viewer_router
+
+    app = fastapi.FastAPI()
+    app.include_router(create_log_viewer_router(log_dir=str(tmp_path)))
+    response = TestClient(app).get("/logs" + path, params=args)
+    assert response.status_code == 200
+    assert "error" not in response.json()
@@ -0,0 +1,75 @@
+"""Boolean queries: parsing, precedence and evaluation."""
+
+import pytest
+
+from python_log_viewer.query import compile_query
+
+ENTRIES = [
+    "2024-01-01 00:00:00,000 ERROR app.db: Timeout talking to db-primary",
+    "2024-01-01 00:00:01,000 INFO app.web: GET /health from 10.0.0.7 (healthcheck)",
+    "2024-01-01 00:00:02,000 WARNING app.db.pool: connection refused by db-replica",
+    "2024-01-01 00:00:03,000 ERROR payments: charge failed (code 402)",
+    '{"level": "error", "logger": "app.db", "message": "timeout"}',
+]
+
+
+def matching(query):
+    compiled = compile_query(query)
+    return [i for i, entry in enumerate(ENTRIES) if compiled.matches(entry)]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("timeout", [0, 4]),
+        ("TIMEOUT", [0, 4]),
+        ('"connection refused"', [2]),
+        ("10.0.0.7", [1]),
+        ("ERROR timeout", [0, 4]),  # adjacent terms are ANDed
+        ("refused timeout", []),
+        ("refused OR payments AND timeout", [2]),  # AND binds tighter than OR
+        ("(refused OR payments) AND timeout", []),
+        ("NOT timeout AND error", [3]),  # NOT binds tightest
+        ("NOT (timeout AND error)", [1, 2, 3]),
+        ("NOT NOT timeout", [0, 4]),
+        ("NOT (timeout OR refused)", [1, 3]),
+        (r"re:db-\w+", [0, 2]),
+        ("(payments OR re:db-(primary|replica))", [0, 2, 3]),
+        ("(health OR re:\\(code)", [1, 3]),
+        ('re:"charge failed \\(code \\d+\\)"', [3]),
+        ("level:error", [0, 3, 4]),
+        ("level:warning OR logger:payments", [2, 3]),
+        ("logger:app.db", [0, 2, 4]),  # children match too
+        ("logger:app.d", [0, 2]),  # a substring where no logger is parsed
+    ],
+)
+def test_matches(query, expected):
+    assert matching(query) == expected
+
+
+def test_needle():
+    assert compile_query('ERROR AND "connection refused"').needle == "connection refused"
+    assert compile_query("timeout OR refused").needle == ""
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("", "Empty query"),
+        ("(timeout", "Missing ')'"),
+        ("timeout)", "Unexpected ')'"),
+        ("timeout AND", "ends unexpectedly"),
+        ("OR timeout", "Unexpected 'OR'"),
+        ('"unterminated', "Invalid query"),
+        ("re:(unbalanced", "Invalid regular expression"),
+    ],
+)
+def test_malformed(query, message):
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        compile_query(query)
+
+
+def test_read_rejects_malformed_query(reader, write_log):
+    write_log("app.log", ENTRIES[0] + "\n")
+    result = reader.read("app.log", query="(timeout")
+    assert result["lines"] == [] and "Missing" in result["error"]
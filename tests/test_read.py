@@ -0,0 +1,262 @@
+import json
+
+import pytest
+
+from tests.conftest import baseline_read
+
+TRACEBACK_LOG = "".join(
+    f"2026-01-01 00:00:{i % 60:02d},000 ERROR app.worker: job {i} failed\n"
+    "Traceback (most recent call last):\n"
+    '  File "worker.py", line 12, in run\n'
+    "    raise ValueError(payload)\n"
+    f"ValueError: bad VALUE {i}\n"
+    if i % 3 == 0
+    else f"2026-01-01 00:00:{i % 60:02d},000 INFO app.worker: job {i} done\n"
+    for i in range(300)
+)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{}, {"level": "error"}, {"search": "VALUE"}, {"level": "error", "search": "VALUE"}],
+)
+def test_read_all_matches_baseline(reader, write_log, query):
+    path = write_log("app.log", TRACEBACK_LOG)
+    result = reader.read("app.log", lines=0, **query)
+    expected = baseline_read(path, **query)
+    assert result["lines"] == expected
+    assert result["total"] == len(expected)
+
+
+def test_pages_match_baseline(reader, write_log):
+    path = write_log("app.log", TRACEBACK_LOG)
+    expected = baseline_read(path, level="error")
+    first = reader.read("app.log", lines=25, level="error")
+    second = reader.read("app.log", lines=25, level="error", page=2)
+    assert first["lines"] == expected[-25:]
+    assert second["lines"] == expected[-50:-25]
+    assert first["total"] == len(expected)
+
+
+@pytest.mark.parametrize("separator", ["\x0b", "\x0c", "\x1c", "\x1e", "\x85", "\u2028", "\u2029"])
+def test_only_newlines_split_entries(reader, write_log, separator):
+    message = f"before{separator}after"
+    text = (
+        f"2026-01-01 00:00:00,000 INFO one {message}\n"
+        f"2026-01-01 00:00:01,000 INFO {json.dumps({'msg': message}, ensure_ascii=False)}\n"
+        "2026-01-01 00:00:02,000 INFO three\n"
+    )
+    path = write_log("app.log", text)
+    result = reader.read("app.log", lines=0)
+    assert result["lines"] == baseline_read(path)
+    assert len(result["lines"]) == 3
+    assert message in result["lines"][0]
+    paged = reader.read("app.log", lines=2)
+    assert paged["lines"] == result["lines"][-2:]
+
+
+def _payload_traceback_log(count: int) -> str:
+    parts = []
+    for i in range(count):
+        parts.append(f"2026-01-01 00:00:{i % 60:02d},000 INFO app.api: request {i} ok {'x' * 80}\n")
+        if i % 7 == 0:
+            parts.append(
+                f"2026-01-01 00:00:{i % 60:02d},000 ERROR app.api: request {i} failed\n"
+                "Traceback (most recent call last):\n"
+                '  File "api.py", line 40, in handle\n'
+                f"{{'user': {i}, 'retry': True}}\n"
+                f'{{"detail": "bad VALUE", "request": {i}}}\n'
+                f"ValueError: bad VALUE {i}\n"
+            )
+    return "".join(parts)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{}, {"level": "error"}, {"search": "VALUE"}, {"level": "error", "search": "VALUE"}],
+)
+def test_brace_lines_continue_text_entries(reader, write_log, query):
+    path = write_log("app.log", _payload_traceback_log(400))
+    expected = baseline_read(path, **query)
+    assert reader.read("app.log", lines=0, **query)["lines"] == expected
+    assert reader.read("app.log", lines=20, **query)["lines"] == expected[-20:]
+    estimated = reader.read("app.log", lines=20, estimate=True, **query)
+    assert estimated["lines"] == expected[-20:]
+
+
+def test_brace_lines_with_cursor_and_context(reader, write_log):
+    path = write_log("app.log", _payload_traceback_log(400))
+    expected = baseline_read(path, level="error")
+    first = reader.read("app.log", lines=10, level="error", before=10**12)
+    assert first["lines"] == expected[-10:]
+    older = reader.read("app.log", lines=10, level="error", before=first["cursor"]["older"])
+    assert older["lines"] == expected[-20:-10]
+    newer = reader.read("app.log", lines=10, level="error", after=older["cursor"]["newer"])
+    assert newer["lines"] == expected[-10:]
+    around = reader.context("app.log", first["offsets"][-1], before=1, after=0)
+    assert around["lines"][-1] == expected[-1]
+
+
+def test_brace_lines_in_parallel_and_zoned_scans(log_dir, write_log):
+    from python_log_viewer.core import LogReader
+
+    # Large enough for several zones (1 MB) and parallel ranges.
+    path = write_log("app.log", _payload_traceback_log(20000))
+    expected = baseline_read(path, level="error", search="VALUE")
+    parallel = LogReader(log_dir, parallel_workers=2)
+    parallel._PARALLEL_MIN_BYTES = 0
+    assert parallel.read("app.log", lines=0, level="error", search="VALUE")["lines"] == expected
+    zoned = LogReader(log_dir)
+    assert zoned.read("app.log", lines=0, level="error", search="VALUE")["lines"] == expected
+    assert zoned.read("app.log", lines=0, level="CRITICAL")["lines"] == []
+
+
+def test_json_lines_records_are_entries(reader, write_log):
+    records = [{"ts": i, "level": "ERROR" if i % 5 == 0 else "INFO", "msg": f"event {i}"} for i in range(200)]
+    write_log("api.log", "".join(json.dumps(r) + "\n" for r in records))
+    result = reader.read("api.log", lines=0)
+    assert result["lines"] == [json.dumps(r) for r in records]
+    errors = reader.read("api.log", lines=10, level="error")
+    assert errors["lines"] == [json.dumps(r) for r in records if r["level"] == "ERROR"][-10:]
+    page = reader.read("api.log", lines=10, before=result["end"], page=2)
+    assert page["lines"] == result["lines"][-20:-10]
+    assert reader.read("api.log", lines=0, fields="level=error")["total"] == 40
+
+
+def test_json_lines_level_filter_reads_the_level_field(log_dir, write_log):
+    from python_log_viewer.core import LogReader
+
+    levels = ["error", "Warning", "info", "ERROR"]
+    records = [
+        {"level": levels[i % 4], "msg": "retrying after ERROR" if i % 4 == 2 else f"event {i}"}
+        for i in range(30000)  # several zones
+    ]
+    write_log("api.log", "".join(json.dumps(r) + "\n" for r in records))
+    errors = [json.dumps(r) for r in records if r["level"].upper() == "ERROR"]
+    warnings = [json.dumps(r) for r in records if r["level"] == "Warning"]
+    parallel = LogReader(log_dir, parallel_workers=2)
+    parallel._PARALLEL_MIN_BYTES = 0
+    for reader in (LogReader(log_dir), parallel):
+        assert reader.read("api.log", lines=0, level="error")["lines"] == errors
+        assert reader.read("api.log", lines=0, level="warn")["lines"] == warnings
+        assert reader.read("api.log", lines=0, level="critical")["lines"] == []
+    reader = LogReader(log_dir)
+    end = reader.read("api.log", lines=1)["end"]
+    assert reader.read("api.log", lines=10, level="error", before=end)["lines"] == errors[-10:]
+    assert reader.read("api.log", lines=10, level="error", estimate=True)["lines"] == errors[-10:]
+
+
+def test_max_entry_bytes_caps_columns(reader, write_log):
+    records = [{"level": "INFO", "msg": f"small {i}"} for i in range(5)]
+    records[2] = {"level": "ERROR", "msg": "x" * 5000, "payload": {"blob": "y" * 5000}}
+    write_log("api.log", "".join(json.dumps(r) + "\n" for r in records))
+    result = reader.read("api.log", lines=10, columns="level,msg,payload", max_entry_bytes=1000)
+    assert all(len(line.encode()) <= 1000 for line in result["lines"])
+    for values in result["columns"].values():
+        assert all(value is None or len(str(value).encode()) <= 1000 for value in values)
+    assert result["columns"]["level"][2] == "ERROR"
+    assert result["columns"]["msg"][0] == "small 0"
+    assert result["truncated"] == [
+        {
+            "index": 2,
+            "length": len(json.dumps(records[2])),
+            "offset": sum(len(json.dumps(r)) + 1 for r in records[:2]),
+            "columns": ["msg", "payload"],
+        }
+    ]
+
+
+def _assert_located(path, lines, offsets):
+    """Each entry of *lines* starts at its offset in the file at *path*."""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    assert len(offsets) == len(lines)
+    for line, offset in zip(lines, offsets):
+        assert data[offset:].decode("utf-8").startswith(line.split("\n")[0])
+
+
+# Non-ASCII text: offsets count bytes, not characters.
+JSON_LOG = "".join(
+    json.dumps(
+        {"level": "ERROR" if i % 4 == 0 else "INFO", "msg": f"café {i % 3} – {i}", "ms": i % 7},
+        ensure_ascii=False,
+    )
+    + "\n"
+    for i in range(200)
+)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"lines": 25},
+        {"lines": 25, "page": 3, "level": "error"},
+        {"lines": 0, "search": "VALUE"},
+        {"lines": 20, "since": "2026-01-01 00:00:30", "until": "2026-01-01 00:00:40"},
+        {"lines": 10, "collapse": "numbers"},
+    ],
+)
+def test_tail_reads_return_offsets(reader, write_log, query):
+    path = write_log("app.log", "Prologue without a timestamp\n" + TRACEBACK_LOG.replace("done", "done ✓"))
+    result = reader.read("app.log", **query)
+    assert result["lines"]
+    _assert_located(path, result["lines"], result["offsets"])
+    context = reader.context("app.log", result["offsets"][-1], before=0, after=0)
+    assert context["lines"] == [result["lines"][-1]] or "collapse" in query
+
+
+def test_sorted_reads_return_offsets(reader, write_log):
+    path = write_log("api.log", JSON_LOG)
+    result = reader.read("api.log", lines=30, sort="-ms")
+    assert [json.loads(line)["ms"] for line in result["lines"]] == sorted(
+        (json.loads(line)["ms"] for line in result["lines"]), reverse=True
+    )
+    _assert_located(path, result["lines"], result["offsets"])
+
+
+def test_rotated_reads_return_segment_offsets(reader, write_log, tmp_path):
+    import gzip
+
+    entries = TRACEBACK_LOG.replace("done", "done ✓").replace("\n2026", "\n\x002026").split("\x00")
+    (tmp_path / "app.log.2.gz").write_bytes(gzip.compress("".join(entries[:100]).encode()))
+    write_log("app.log.1", "".join(entries[100:200]))
+    write_log("app.log", "".join(entries[200:]))
+    result = reader.read("app.log", lines=0, rotated=True, level="error")
+    segments = {segment for segment, _offset in result["offsets"]}
+    assert segments == {"app.log", "app.log.1", "app.log.2.gz"}
+    for line, (segment, offset) in zip(result["lines"], result["offsets"]):
+        context = reader.context(segment, offset, before=0, after=0)
+        assert context["lines"] == [line]
+    for segment in ("app.log", "app.log.1"):
+        picked = [(line, offset) for line, (name, offset) in zip(result["lines"], result["offsets"]) if name == segment]
+        _assert_located(tmp_path / segment, *zip(*picked))
+
+
+def test_archive_sorted_and_collapsed_reads_return_entry_numbers(reader, write_log, tmp_path):
+    from python_log_viewer.archive import write_archive
+
+    write_archive([write_log("api.log", JSON_LOG)], str(tmp_path / "api.lva"), block_entries=50)
+    every = reader.read("api.lva", lines=0)
+    by_number = dict(zip(every["offsets"], every["lines"]))
+    for query in ({"sort": "ms"}, {"collapse": "numbers"}):
+        result = reader.read("api.lva", lines=40, **query)
+        assert [by_number[number] for number in result["offsets"]] == result["lines"]
+
+
+def test_collapse_numbers_keeps_loggers_apart(reader, write_log):
+    storm = "".join(
+        f"2026-01-01 00:00:{i % 60:02d},000 {level} app.worker{worker}: retry {i} after {i * 10} ms\n"
+        for i in range(40)
+        for worker, level in [(1 + i // 20, "WARNING"), (3, "INFO")]
+    )
+    write_log("app.log", storm)
+    result = reader.read("app.log", lines=0, collapse="numbers", level="warning")
+    assert [line.split(" ", 3)[3].split(":")[0] for line in result["lines"]] == ["app.worker1", "app.worker2"]
+    assert [(run["index"], run["count"]) for run in result["repeats"]] == [(0, 20), (1, 20)]
+    assert result["repeats"][0]["first"] == "2026-01-01 00:00:00,000"
+    assert reader.read("app.log", lines=0, collapse="numbers")["total"] == 80  # interleaved
+
+    records = [{"logger": f"app.worker{1 + i // 5}", "msg": f"retry {i}", "ts": i} for i in range(10)]
+    write_log("api.log", "".join(json.dumps(r) + "\n" for r in records))
+    result = reader.read("api.log", lines=0, collapse="numbers")
+    assert result["lines"] == [json.dumps(records[4]), json.dumps(records[9])]
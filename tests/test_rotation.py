@@ -0,0 +1,39 @@
+"""Rotated siblings are ordered by their suffix, not by modification time."""
+
+import os
+import shutil
+
+
+def _create(tmp_path, names):
+    for name in names:
+        (tmp_path / name).write_text(f"2024-01-01 00:00:00,000 INFO {name}\n")
+
+
+def _touch_in_order(tmp_path, names):
+    """Give *names* increasing modification times, the first one oldest."""
+    for i, name in enumerate(names):
+        os.utime(tmp_path / name, (1_700_000_000 + i, 1_700_000_000 + i))
+
+
+def test_numbered_siblings_ignore_mtime(tmp_path, log_dir):
+    _create(tmp_path, ["app.log", "app.log.1", "app.log.2.gz", "app.log.10"])
+    # A restore from backup: the oldest segment was copied last.
+    shutil.copy(tmp_path / "app.log.10", tmp_path / "app.log.3")
+    _touch_in_order(tmp_path, ["app.log.1", "app.log.2.gz", "app.log", "app.log.3", "app.log.10"])
+    assert log_dir.rotation_chain("app.log") == [
+        "app.log", "app.log.1", "app.log.2.gz", "app.log.3", "app.log.10",
+    ]
+
+
+def test_dated_siblings_newest_date_first(tmp_path, log_dir):
+    dateext = ["web.log", "web.log-20260216.gz", "web.log-20260217", "web.log-2026021812"]
+    timed = ["job.log", "job.log.2026-02-17", "job.log.2026-02-18_09", "job.log.2026-02-18_13-05"]
+    _create(tmp_path, dateext + timed)
+    _touch_in_order(tmp_path, ["web.log-2026021812", "web.log-20260217", "web.log-20260216.gz"])
+    _touch_in_order(tmp_path, timed[::-1])
+    assert log_dir.rotation_chain("web.log") == [
+        "web.log", "web.log-2026021812", "web.log-20260217", "web.log-20260216.gz",
+    ]
+    assert log_dir.rotation_chain("job.log") == [
+        "job.log", "job.log.2026-02-18_13-05", "job.log.2026-02-18_09", "job.log.2026-02-17",
+    ]
@@ -0,0 +1,32 @@
+"""The scan worker bounds what a result brings into the host."""
+
+import pytest
+
+from python_log_viewer.core import LogReader
+from python_log_viewer.worker import ScanWorker
+
+
+@pytest.fixture
+def worker():
+    worker = ScanWorker(max_result_bytes=10_000, timeout=30)
+    yield worker
+    worker.close()
+
+
+def _log(count: int) -> str:
+    return "".join(f"2024-01-01 00:00:{i % 60:02d} ERROR job {i} failed\n" for i in range(count))
+
+
+def test_whole_file_reads_keep_the_newest_bytes(log_dir, write_log, worker):
+    write_log("app.log", _log(2000))
+    result = LogReader(log_dir, scan_worker=worker).read("app.log", lines=0)
+    assert result["partial"] is True
+    assert sum(map(len, result["lines"])) <= 10_000
+    assert result["lines"][-1].endswith("job 1999 failed")
+
+
+def test_oversized_results_fail(log_dir, write_log, worker):
+    write_log("app.log", "".join(f"2024-01-01 00:00:00 ERROR {'x' * 2000} {i}\n" for i in range(20)))
+    result = LogReader(log_dir, scan_worker=worker).read("app.log", lines=20, level="error")
+    assert result["lines"] == []
+    assert "limit" in result["error"]